@@ -1,9 +0,0 @@
-from gather_all import run_adreal_pipeline, get_correct_period
-from google.cloud import secretmanager
-
-def access_secret(secret_id, version_id="latest"):
-    client = secretmanager.SecretManagerServiceClient()
-    project_id = "ums-adreal-471711"  # your actual project id
-    name = f"projects/{project_id}/secrets/{secret_id}/versions/{version_id}"
-    response = client.access_secret_version(name=name)
-    return response.payload.data.decode("UTF-8")
\ No newline at end of file
@@ -0,0 +1,493 @@
+"""
+Local stand-in for the AdReal API (https://adreal.gemius.com/api), for offline
+benchmarks and fetch-layer regression runs:
+
+    python -m benchmarks.fake_adreal --owners 200 --latency 0.05 --error-rate 0.01
+
+or in-process:
+
+    with FakeAdRealServer(FakeAdRealConfig(owners=50)) as server:
+        session = AdRealSession("user", "pass", base_url=server.base_url)
+
+It serves the login flow (CSRF cookie + form POST, session expiry redirects),
+/brands/, /publishers/, /platforms/ and /stats/ (limit / offset / total_count,
+segments, brands, industries) from a synthetic catalogue generated from a
+seed, and can inject latency, error statuses and connections cut mid-body.
+"""
+import argparse
+import json
+import random
+import secrets
+import threading
+import time
+from collections import Counter, OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+SEGMENT_SUMMARY = "Segment summary"
+
+# Well-known sites first so every content type shows up in small catalogues
+KNOWN_SITES = ("google.ro", "bing.com", "facebook.com", "instagram.com", "youtube.com", "tiktok.com")
+
+PLATFORMS = [
+    {"id": 1, "code": "pc", "label": "PC"},
+    {"id": 2, "code": "mobile", "label": "Mobile"},
+]
+
+
+class FakeAdRealConfig:
+    """
+    Scale, behaviour and fault injection of a FakeAdRealServer.
+
+    Catalogue: `owners` top-level brand owners with `brands_per_owner` brands each,
+    `products_per_brand` products under every brand, plus an 'Other' root;
+    `publishers` websites; brands spread over `industries` industries.
+    Stats: every brand appears on `websites_per_brand` websites (one entry per
+    product when 'product' is segmented), plus a 'Segment summary' row;
+    `duplicate_rate` repeats entries like overlapping shards do.
+
+    Faults: `latency` (+ `latency_per_item` per result, +- `jitter`) is slept
+    before every API response; `error_rate` answers with one of `error_statuses`
+    (429 carries Retry-After: 0); `truncate_rate` cuts the connection halfway
+    through a /stats/ body; `max_page_size` caps `limit` like the real server;
+    `session_ttl` expires a session after that many API requests;
+    `login_redirect` answers a successful login with a 302 to its `next` page,
+    as the real Django login view does, instead of a 200.
+    """
+
+    def __init__(self, owners=20, brands_per_owner=5, products_per_brand=3, publishers=500,
+                 websites_per_brand=40, industries=10, duplicate_rate=0.0, seed=1,
+                 latency=0.0, latency_per_item=0.0, jitter=0.0, error_rate=0.0,
+                 error_statuses=(502, 503, 429), truncate_rate=0.0, max_page_size=None,
+                 session_ttl=None, login_redirect=False, username=None, password=None):
+        self.owners = owners
+        self.brands_per_owner = brands_per_owner
+        self.products_per_brand = products_per_brand
+        self.publishers = publishers
+        self.websites_per_brand = websites_per_brand
+        self.industries = industries
+        self.duplicate_rate = duplicate_rate
+        self.seed = seed
+        self.latency = latency
+        self.latency_per_item = latency_per_item
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.truncate_rate = truncate_rate
+        self.max_page_size = max_page_size
+        self.session_ttl = session_ttl
+        self.login_redirect = login_redirect
+        # None accepts any credentials
+        self.username = username
+        self.password = password
+
+
+# ---------------- SYNTHETIC DATA ----------------
+class SyntheticCatalogue:
+    """Brands, publishers and stats generated deterministically from a config."""
+
+    def __init__(self, config):
+        self.config = config
+        self.brands = []
+        self.children = {}  # brand id -> child ids
+        self.industry_brands = {}
+        self.brand_ids = []
+
+        next_id = 1
+        other_id = next_id
+        self._add_brand(other_id, "Other", None)
+        next_id += 1
+        for o in range(config.owners):
+            owner_id = next_id
+            next_id += 1
+            self._add_brand(owner_id, f"Owner {o}", None)
+            for b in range(config.brands_per_owner):
+                brand_id = next_id
+                next_id += 1
+                # every tenth brand sits under the 'Other' bucket instead of its owner
+                parent = other_id if b % 10 == 9 else owner_id
+                self._add_brand(brand_id, f"Brand {o}-{b}", parent)
+                self.brand_ids.append(brand_id)
+                industry = len(self.brand_ids) % max(1, config.industries) + 1
+                self.industry_brands.setdefault(industry, []).append(brand_id)
+                for p in range(config.products_per_brand):
+                    self._add_brand(next_id, f"Product {o}-{b}-{p}", brand_id)
+                    next_id += 1
+
+        names = list(KNOWN_SITES) + [f"site{i}.ro" for i in range(max(0, config.publishers - len(KNOWN_SITES)))]
+        self.publishers = [{"id": 1000 + i, "name": name} for i, name in enumerate(names[:config.publishers])]
+        self.summary_id = 999
+        self.publishers.append({"id": self.summary_id, "name": SEGMENT_SUMMARY})
+        self.website_ids = [p["id"] for p in self.publishers if p["id"] != self.summary_id]
+        self.website_names = {p["id"]: p["name"] for p in self.publishers}
+
+    def _add_brand(self, brand_id, name, parent_id):
+        self.brands.append({"id": brand_id, "name": name, "parent_id": parent_id})
+        if parent_id is not None:
+            self.children.setdefault(parent_id, []).append(brand_id)
+
+    def select_brands(self, brand_ids=None, industries=None):
+        """Brands a /stats/ query covers: owners expand to their brands; no filter means all."""
+        if industries:
+            selected = [b for i in industries for b in self.industry_brands.get(i, [])]
+        elif brand_ids:
+            brand_set = set(self.brand_ids)
+            selected = []
+            for brand_id in brand_ids:
+                if brand_id in brand_set:
+                    selected.append(brand_id)
+                else:
+                    selected.extend(c for c in self.children.get(brand_id, []) if c in brand_set)
+        else:
+            selected = list(self.brand_ids)
+        return list(dict.fromkeys(selected))
+
+    def stats(self, brand_ids, segments, period, metrics, platform="pc"):
+        """The /stats/ result items for a selection, in a stable order."""
+        config = self.config
+        items = []
+        for brand_id in brand_ids:
+            rng = random.Random(config.seed * 1000003 + brand_id)
+            websites = rng.sample(self.website_ids, min(config.websites_per_brand, len(self.website_ids)))
+            products = self.children.get(brand_id, []) if "product" in segments else [None]
+            for website in websites + [self.summary_id]:
+                for product in products or [None]:
+                    segment = self._segment(brand_id, product, website, segments, platform)
+                    item = {"segment": segment, "stats": [self._stat(rng, period, metrics)]}
+                    items.append(item)
+                    if config.duplicate_rate and rng.random() < config.duplicate_rate:
+                        items.append(item)
+        return items
+
+    def _segment(self, brand_id, product, website, segments, platform):
+        segment = {}
+        if "brand" in segments:
+            segment["brand"] = brand_id
+        if "product" in segments:
+            segment["product"] = product
+        if "content_type" in segments:
+            name = self.website_names[website]
+            if name.startswith(("google.", "bing.")):
+                segment["content_type"] = "Search"
+            elif name.split(".")[0] in ("facebook", "instagram", "youtube", "tiktok"):
+                segment["content_type"] = "Social"
+            else:
+                segment["content_type"] = None
+        if "website" in segments:
+            segment["website"] = website
+        if "platform" in segments:
+            segment["platform"] = platform
+        return segment
+
+    @staticmethod
+    def _stat(rng, period, metrics):
+        values = {}
+        for metric in metrics:
+            if metric == "reach":
+                values[metric] = round(rng.random(), 4)
+            else:
+                values[metric] = rng.randint(0, 100000)
+        return {"period": period, "values": values, "uncertainty": {"ru": round(rng.random() / 10, 4)}}
+
+
+# ---------------- HTTP ----------------
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    @property
+    def fake(self):
+        return self.server.fake
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        parts = [p for p in url.path.split("/") if p]  # api, <market>, <endpoint>
+        if parts[:2] == ["api", "login"]:
+            return self._login_form()
+        if not parts or parts[0] != "api" or len(parts) not in (1, 3):
+            return self._send_json({"detail": "Not found."}, status=404)
+        if len(parts) == 1:
+            # API root, where the login redirects to (does not use up the session TTL)
+            return self._send_json({"markets": ["ro"]})
+        if not self.fake.check_session(self.headers.get("Cookie", "")):
+            return self._redirect_to_login()
+
+        endpoint = parts[2]
+        self.fake.count(endpoint)
+        if self._inject_error():
+            return
+        if endpoint == "brands":
+            return self._send_page(self.fake.catalogue.brands, query)
+        if endpoint == "publishers":
+            return self._send_page(self.fake.catalogue.publishers, query)
+        if endpoint == "platforms":
+            return self._send_page(PLATFORMS, query)
+        if endpoint == "stats":
+            return self._send_page(self.fake.stats_for(query), query, truncatable=True)
+        return self._send_json({"detail": "Not found."}, status=404)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode("utf-8")
+        if not url.path.startswith("/api/login/"):
+            return self._send_json({"detail": "Method not allowed."}, status=405)
+        form = {k: v[-1] for k, v in parse_qs(body).items()}
+        cookies = _parse_cookies(self.headers.get("Cookie", ""))
+        token = form.get("csrfmiddlewaretoken")
+        if not token or token != cookies.get("csrftoken") or token != self.headers.get("X-CSRFToken"):
+            return self._send_text("CSRF verification failed.", status=403)
+        if not self.fake.check_credentials(form.get("username"), form.get("password")):
+            return self._send_text("Invalid username or password.")
+        session_id = self.fake.new_session()
+        if self.fake.config.login_redirect:
+            location = parse_qs(url.query).get("next", ["/api/"])[-1]
+            return self._send_body(b"", "text/html", status=302, headers={"Location": location},
+                                   cookies={"sessionid": session_id})
+        self._send_text("Logged in.", cookies={"sessionid": session_id})
+
+    # ---------------- RESPONSES ----------------
+    def _login_form(self):
+        self._send_text("<form>login</form>", cookies={"csrftoken": secrets.token_hex(16)})
+
+    def _redirect_to_login(self):
+        self.send_response(302)
+        self.send_header("Location", f"/api/login/?next={self.path}")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _inject_error(self):
+        config = self.fake.config
+        if config.error_rate and self.fake.rng_random() < config.error_rate:
+            status = self.fake.rng_choice(config.error_statuses)
+            self.fake.count(f"error_{status}")
+            headers = {"Retry-After": "0"} if status == 429 else {}
+            self._send_json({"detail": "Injected error."}, status=status, headers=headers)
+            return True
+        return False
+
+    def _send_page(self, items, query, truncatable=False):
+        config = self.fake.config
+        limit = int(query.get("limit") or 100)
+        if config.max_page_size:
+            limit = min(limit, config.max_page_size)
+        offset = int(query.get("offset") or 0)
+        page = items[offset:offset + limit]
+        self.fake.sleep(len(page))
+        self.fake.count("items", len(page))
+        body = json.dumps({"total_count": len(items), "results": page}).encode("utf-8")
+        if truncatable and config.truncate_rate and self.fake.rng_random() < config.truncate_rate:
+            # promise the whole body, send half of it and drop the connection
+            self.fake.count("truncated")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self._send_body(body, "application/json")
+
+    def _send_json(self, data, status=200, headers=None):
+        self._send_body(json.dumps(data).encode("utf-8"), "application/json", status=status, headers=headers)
+
+    def _send_text(self, text, status=200, cookies=None):
+        self._send_body(text.encode("utf-8"), "text/html", status=status, cookies=cookies)
+
+    def _send_body(self, body, content_type, status=200, headers=None, cookies=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        for name, value in (cookies or {}).items():
+            self.send_header("Set-Cookie", f"{name}={value}; Path=/")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _parse_cookies(header):
+    cookies = {}
+    for part in header.split(";"):
+        name, _, value = part.strip().partition("=")
+        if name:
+            cookies[name] = value
+    return cookies
+
+
+class FakeAdRealServer:
+    """
+    The fake API on a background thread. `base_url` is what AdRealSession takes;
+    `counters` records requests per endpoint, logins, injected errors and items served.
+    """
+
+    def __init__(self, config=None, host="127.0.0.1", port=0, stats_cache_size=16):
+        self.config = config or FakeAdRealConfig()
+        self.catalogue = SyntheticCatalogue(self.config)
+        self.counters = Counter()
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.config.seed)
+        self._stats_cache = OrderedDict()
+        self._stats_cache_size = stats_cache_size
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    # ---------------- LIFECYCLE ----------------
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread = None
+        self._httpd.server_close()
+
+    def serve_forever(self):
+        print(f"Fake AdReal API on {self.base_url} ({len(self.catalogue.brands)} brands, "
+              f"{len(self.catalogue.publishers)} publishers)")
+        self._httpd.serve_forever()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ---------------- STATE ----------------
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def rng_random(self):
+        with self._lock:
+            return self._rng.random()
+
+    def rng_choice(self, values):
+        with self._lock:
+            return self._rng.choice(values)
+
+    def sleep(self, items):
+        config = self.config
+        delay = config.latency + config.latency_per_item * items
+        if config.jitter:
+            delay += self.rng_random() * config.jitter
+        if delay > 0:
+            time.sleep(delay)
+
+    def check_credentials(self, username, password):
+        config = self.config
+        return ((config.username is None or username == config.username)
+                and (config.password is None or password == config.password))
+
+    def new_session(self):
+        session_id = secrets.token_hex(16)
+        with self._lock:
+            self._sessions[session_id] = 0
+            self.counters["logins"] += 1
+        return session_id
+
+    def check_session(self, cookie_header):
+        """True if the request carries a live session (and uses up one request of its TTL)."""
+        session_id = _parse_cookies(cookie_header).get("sessionid")
+        with self._lock:
+            if session_id not in self._sessions:
+                return False
+            self._sessions[session_id] += 1
+            ttl = self.config.session_ttl
+            if ttl is not None and self._sessions[session_id] > ttl:
+                del self._sessions[session_id]
+                self.counters["expired_sessions"] += 1
+                return False
+            return True
+
+    def stats_for(self, query):
+        """Result items of a /stats/ query (generated once per distinct filter, then paged)."""
+        key = tuple(sorted((k, v) for k, v in query.items() if k not in ("limit", "offset")))
+        with self._lock:
+            if key in self._stats_cache:
+                self._stats_cache.move_to_end(key)
+                return self._stats_cache[key]
+
+        brand_ids = [int(b) for b in query.get("brands", "").split(",") if b.strip()]
+        industries = [int(i) for i in query.get("industries", "").split(",") if i.strip()]
+        segments = set(query.get("segments", "brand").split(","))
+        metrics = [m for m in query.get("metrics", "ru,ad_cont,reach").split(",") if m]
+        start, _, rest = query.get("periods_range", "20250801,20250831,month").partition(",")
+        period = f"{rest.rpartition(',')[2] or 'day'}_{start}"
+        platform = query.get("platforms", "pc").split(",")[0]
+
+        selected = self.catalogue.select_brands(brand_ids, industries)
+        items = self.catalogue.stats(selected, segments, period, metrics, platform)
+        with self._lock:
+            self._stats_cache[key] = items
+            while len(self._stats_cache) > self._stats_cache_size:
+                self._stats_cache.popitem(last=False)
+        return items
+
+
+# ---------------- MAIN ----------------
+def main():
+    parser = argparse.ArgumentParser(description="Serve a synthetic AdReal API locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--owners", type=int, default=20)
+    parser.add_argument("--brands-per-owner", type=int, default=5)
+    parser.add_argument("--products-per-brand", type=int, default=3)
+    parser.add_argument("--publishers", type=int, default=500)
+    parser.add_argument("--websites-per-brand", type=int, default=40)
+    parser.add_argument("--industries", type=int, default=10)
+    parser.add_argument("--duplicate-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every API response")
+    parser.add_argument("--latency-per-item", type=float, default=0.0, help="Seconds added per result item")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of API requests answered 502/503/429")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="Share of /stats/ bodies cut halfway")
+    parser.add_argument("--max-page-size", type=int, default=None, help="Server-side cap on limit")
+    parser.add_argument("--session-ttl", type=int, default=None, help="API requests per login session")
+    parser.add_argument("--login-redirect", action="store_true", help="Answer a successful login with a 302")
+    args = parser.parse_args()
+
+    config = FakeAdRealConfig(
+        owners=args.owners,
+        brands_per_owner=args.brands_per_owner,
+        products_per_brand=args.products_per_brand,
+        publishers=args.publishers,
+        websites_per_brand=args.websites_per_brand,
+        industries=args.industries,
+        duplicate_rate=args.duplicate_rate,
+        seed=args.seed,
+        latency=args.latency,
+        latency_per_item=args.latency_per_item,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        truncate_rate=args.truncate_rate,
+        max_page_size=args.max_page_size,
+        session_ttl=args.session_ttl,
+        login_redirect=args.login_redirect,
+    )
+    server = FakeAdRealServer(config, host=args.host, port=args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
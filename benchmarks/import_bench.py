@@ -0,0 +1,120 @@
+"""
+Import-time budget of the Cloud Function entry points and the fetch layer:
+
+    python -m benchmarks.import_bench
+    python -m benchmarks.import_bench --repeat 7 --top 15 main
+
+Each module is imported in a fresh interpreter with `python -X importtime`
+(best of --repeat runs). The check fails (exit status 1) when a module takes
+longer than its budget, or when it pulls in a module that must stay lazy
+(e.g. pandas or google-cloud-bigquery at `import main`).
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ("pandas", "numpy", "pyarrow", "google.cloud.bigquery", "google.cloud.secretmanager")
+
+# module: (budget in ms, modules it must not import)
+BUDGETS = {
+    # Cloud Function cold start: everything heavy is imported on first use
+    "main": (100, HEAVY + ("requests", "common.gather_all")),
+    # the fetch layer needs requests only
+    "common.adreal_session": (300, HEAVY),
+    "common.fetch_adreal": (350, HEAVY),
+    "common.brands_fetcher": (350, HEAVY),
+    "common.websites_fetcher": (350, HEAVY),
+    "common.registry": (50, HEAVY),
+    # the pipeline needs pandas, but not the BigQuery client until the push
+    "common.batch_runner": (1500, ("google.cloud.bigquery", "google.cloud.secretmanager")),
+}
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # the header line
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(parts[0]), int(parts[1]), depth))
+    return rows
+
+
+def measure(module, repeat=5):
+    """Best-of-repeat import of module in a fresh interpreter: (total_ms, rows of the fastest run)."""
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                              cwd=REPO_ROOT, capture_output=True, text=True, timeout=300)
+        if proc.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+        rows = parse_importtime(proc.stderr)
+        total = next(cumulative for name, _, cumulative, depth in reversed(rows) if name == module and depth == 0)
+        if best is None or total < best[0]:
+            best = (total, rows)
+    return best[0] / 1000, best[1]
+
+
+def check(module, budget_ms, forbidden, repeat=5, top=10):
+    """Print the import profile of one module; returns the list of budget violations."""
+    total_ms, rows = measure(module, repeat)
+    imported = {name for name, _, _, _ in rows}
+    problems = []
+    if total_ms > budget_ms:
+        problems.append(f"{total_ms:.1f} ms over the {budget_ms} ms budget")
+    for name in forbidden:
+        if name in imported:
+            problems.append(f"imports {name} at load time")
+
+    status = "FAIL" if problems else "ok"
+    print(f"{module:<26} {total_ms:8.1f} ms  (budget {budget_ms} ms)  {status}")
+    for problem in problems:
+        print(f"    {problem}")
+    for name, cumulative_us in direct_imports(rows, module)[:top]:
+        print(f"    {cumulative_us / 1000:8.1f} ms  {name}")
+    return problems
+
+
+def direct_imports(rows, module):
+    """[(name, cumulative_us)] of the imports made by module itself, heaviest first."""
+    # -X importtime prints children (depth 1) right before their parent's depth-0 line
+    end = max(i for i, row in enumerate(rows) if row[0] == module and row[3] == 0)
+    children = []
+    for name, _, cumulative, depth in reversed(rows[:end]):
+        if depth == 0:
+            break
+        if depth == 1:
+            children.append((name, cumulative))
+    return sorted(children, key=lambda child: child[1], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check import times against their budgets.")
+    parser.add_argument("modules", nargs="*", help=f"Modules to check (default: {', '.join(BUDGETS)})")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per module; the fastest counts")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest direct imports to list per module")
+    args = parser.parse_args()
+
+    unknown = set(args.modules) - set(BUDGETS)
+    if unknown:
+        raise ValueError(f"No import budget for: {', '.join(sorted(unknown))}")
+    failures = 0
+    for module in args.modules or BUDGETS:
+        budget_ms, forbidden = BUDGETS[module]
+        failures += bool(check(module, budget_ms, forbidden, repeat=args.repeat, top=args.top))
+    if failures:
+        print(f"\n{failures} module(s) over their import budget")
+        sys.exit(1)
+    print("\nAll imports within budget")
+
+
+if __name__ == "__main__":
+    main()
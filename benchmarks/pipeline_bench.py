@@ -0,0 +1,272 @@
+"""
+Stage-by-stage benchmark of the monthly pipeline against the fake AdReal API:
+
+    python -m benchmarks.pipeline_bench --scale 10k 100k
+    python -m benchmarks.pipeline_bench --scale 1m --compare benchmarks/results/<earlier>.json
+
+For every scale it starts benchmarks.fake_adreal in a separate process (so its
+CPU and memory are not counted), then times the stages run_adreal_pipeline goes
+through, reporting wall time, CPU time, peak RSS and rows/sec per stage.
+Results are written as JSON to benchmarks/results/ for run-to-run comparison.
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from common.adreal_session import AdRealSession
+from common.bigquery_loader import to_arrow
+from common.brand_hierarchy import BrandHierarchy
+from common.brands_fetcher import BrandFetcher
+from common.catalogue_snapshot import CatalogueSnapshot, write_snapshot
+from common.dedupe import StatsDeduplicator
+from common.fetch_adreal import AdRealFetcher
+from common.gather_all import DEFAULT_BATCH_SIZE, clean_data, concat_frames, iter_row_batches, merge_frame
+from common.websites_fetcher import PublisherFetcher
+
+from .fake_adreal import FakeAdRealConfig, FakeAdRealServer
+
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+PERIOD = "month_20250901"
+PERIOD_RANGE = "20250901,20250930,month"
+SEGMENTS = "brand,content_type,website"
+
+# Fake API scale per benchmark size: stats rows = brands x (websites_per_brand + 1 summary row)
+SCALES = {
+    "10k": dict(owners=25, brands_per_owner=4, products_per_brand=2, websites_per_brand=99, publishers=2000),
+    "100k": dict(owners=100, brands_per_owner=5, products_per_brand=5, websites_per_brand=199, publishers=5000),
+    # ~1M stats rows over a ~100k-brand catalogue
+    "1m": dict(owners=1000, brands_per_owner=5, products_per_brand=19, websites_per_brand=199, publishers=20000),
+}
+
+
+# ---------------- MEASUREMENT ----------------
+def current_rss():
+    """Resident set size of this process in bytes."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # no /proc: fall back to the lifetime peak (kilobytes on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class PeakRss:
+    """Samples RSS on a background thread while the block runs; .peak / .start in bytes."""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.start = 0
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def __enter__(self):
+        self.start = self.peak = current_rss()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+
+
+class StageTimer:
+    """Runs pipeline stages and records one measurement dict per stage."""
+
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+        self.stages = []
+
+    def run(self, name, fn, rows=len):
+        """Call fn(); `rows(result)` is the number of rows the stage produced."""
+        output = contextlib.nullcontext() if self.verbose else contextlib.redirect_stdout(io.StringIO())
+        with PeakRss() as rss:
+            wall = time.perf_counter()
+            cpu = time.process_time()
+            with output:
+                result = fn()
+            cpu = time.process_time() - cpu
+            wall = time.perf_counter() - wall
+        n = rows(result)
+        stage = {
+            "stage": name,
+            "rows": n,
+            "wall_s": round(wall, 4),
+            "cpu_s": round(cpu, 4),
+            "rows_per_s": round(n / wall, 1) if wall > 0 else None,
+            "peak_rss_mb": round(rss.peak / 2 ** 20, 1),
+            "rss_growth_mb": round((rss.peak - rss.start) / 2 ** 20, 1),
+        }
+        self.stages.append(stage)
+        print(f"  {name:<18} {n:>9} rows  {wall:8.3f}s wall  {cpu:8.3f}s cpu  "
+              f"{stage['rows_per_s'] or 0:>12,.0f} rows/s  {stage['peak_rss_mb']:8.1f} MB peak")
+        return result
+
+
+# ---------------- FAKE API PROCESS ----------------
+def _serve(config_kwargs, queue):
+    server = FakeAdRealServer(FakeAdRealConfig(**config_kwargs))
+    queue.put(server.base_url)
+    with contextlib.redirect_stdout(io.StringIO()):
+        server.serve_forever()
+
+
+@contextlib.contextmanager
+def fake_api(config_kwargs):
+    """Base URL of a fake AdReal API running in a child process."""
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_serve, args=(config_kwargs, queue), daemon=True)
+    process.start()
+    try:
+        yield queue.get(timeout=60)
+    finally:
+        process.terminate()
+        process.join()
+
+
+# ---------------- STAGES ----------------
+def _stats_rows(items):
+    return sum(len(item.get("stats", [])) for item in items)
+
+
+def _frame_rows(frames):
+    return sum(len(df) for df in frames)
+
+
+def _load_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def bench_scale(scale, config_kwargs, verbose=False, page_size=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Run every stage once at one scale; returns the JSON-ready result."""
+    print(f"\nScale {scale}: {config_kwargs}")
+    timer = StageTimer(verbose=verbose)
+    with fake_api(config_kwargs) as base_url:
+        session = AdRealSession("bench", "bench", base_url=base_url)
+        session.login()
+
+        brands = timer.run("fetch_brands", lambda: BrandFetcher(
+            "bench", "bench", session=session, limit=50000).fetch_brands(PERIOD))
+        websites = timer.run("fetch_publishers", lambda: PublisherFetcher(
+            "bench", "bench", session=session, limit=50000).fetch_publishers(PERIOD))
+        fetcher = AdRealFetcher("bench", "bench", period_range=PERIOD_RANGE, session=session)
+        fetch_kwargs = {"limit": page_size} if page_size else {}
+        items = timer.run("fetch_data", lambda: fetcher.fetch_data(
+            [], segments=SEGMENTS, **fetch_kwargs), rows=_stats_rows)
+
+    # Cold-start read of the brands catalogue: indented JSON (save_json) vs Arrow snapshot (save_snapshot)
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "brands.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(brands, f, indent=4, ensure_ascii=False)
+        snapshot_path = write_snapshot(brands, os.path.join(tmp, "brands.arrow"))
+        timer.run("catalogue_json", lambda: _load_json(json_path))
+        timer.run("catalogue_snapshot", lambda: CatalogueSnapshot.open(snapshot_path))
+
+    hierarchy = timer.run("brand_hierarchy", lambda: BrandHierarchy(brands))
+    items = timer.run("dedupe", lambda: StatsDeduplicator().filter_entries(items), rows=_stats_rows)
+    merged = timer.run("merge", lambda: [
+        merge_frame(batch, brands, websites, hierarchy=hierarchy)
+        for batch in iter_row_batches(items, batch_size)
+    ], rows=_frame_rows)
+    cleaned = timer.run("clean", lambda: [clean_data(df) for df in merged if not df.empty], rows=_frame_rows)
+    frame = timer.run("concat", lambda: concat_frames(cleaned))
+
+    def serialize():
+        table = to_arrow(frame)
+        buf = io.BytesIO()
+        pq.write_table(table, buf)
+        return table
+    timer.run("load_serialization", serialize, rows=lambda table: table.num_rows)
+
+    return {
+        "scale": scale,
+        "config": config_kwargs,
+        "stages": timer.stages,
+        "total_wall_s": round(sum(s["wall_s"] for s in timer.stages), 4),
+        "total_cpu_s": round(sum(s["cpu_s"] for s in timer.stages), 4),
+    }
+
+
+# ---------------- RESULTS ----------------
+def run_metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(__file__), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(previous, current):
+    """Print wall time / peak RSS per stage against an earlier results file."""
+    before = {(r["scale"], s["stage"]): s for r in previous["runs"] for s in r["stages"]}
+    print(f"\nCompared with {previous['meta'].get('commit')} ({previous['meta'].get('started_at')}):")
+    for run in current["runs"]:
+        for stage in run["stages"]:
+            old = before.get((run["scale"], stage["stage"]))
+            if old is None or not old["wall_s"]:
+                continue
+            print(f"  {run['scale']:>5} {stage['stage']:<18} {old['wall_s']:8.3f}s -> {stage['wall_s']:8.3f}s "
+                  f"({stage['wall_s'] / old['wall_s']:5.2f}x)  "
+                  f"{old['peak_rss_mb']:8.1f} -> {stage['peak_rss_mb']:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fetch -> merge -> clean -> load stages.")
+    parser.add_argument("--scale", nargs="+", default=["10k"], choices=sorted(SCALES), help="Sizes to run")
+    parser.add_argument("--output-dir", default=DEFAULT_RESULTS_DIR, help="Where the JSON results go")
+    parser.add_argument("--compare", default=None, help="Earlier results JSON to compare with")
+    parser.add_argument("--page-size", type=int, default=None, help="/stats/ page size (default: fetcher's)")
+    parser.add_argument("--verbose", action="store_true", help="Keep the pipeline's own output")
+    args = parser.parse_args()
+
+    results = {"meta": run_metadata(), "runs": []}
+    for scale in args.scale:
+        results["runs"].append(bench_scale(scale, SCALES[scale], verbose=args.verbose, page_size=args.page_size))
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(args.output_dir, f"{stamp}-{'-'.join(args.scale)}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nSaved results to {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
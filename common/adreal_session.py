@@ -0,0 +1,94 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .retry import HostLimiter, RetryPolicy, send_with_retry
+
+DEFAULT_BASE_URL = "https://adreal.gemius.com/api"
+
+
+class AdRealSession(requests.Session):
+    """
+    One authenticated AdReal session shared by BrandFetcher, PublisherFetcher
+    and AdRealFetcher.
+
+    Logs in lazily on the first API request, detects an expired session
+    (redirect back to /api/login/ or a 403) and logs in again transparently,
+    retrying the failed request once.
+
+    Every request also goes through `retry` (a RetryPolicy: backoff with jitter,
+    Retry-After, GET-only replays) and a per-host cap of max_per_host in-flight
+    requests, so a transient 502 or read timeout costs one page, not the run.
+    """
+
+    def __init__(self, username, password, market="ro", base_url=DEFAULT_BASE_URL,
+                 pool_connections=4, pool_maxsize=16, retry=None, max_per_host=8):
+        super().__init__()
+        self.base_url = base_url.rstrip("/")
+        self.login_url = f"{self.base_url}/login/?next=/api/"
+        self.username = username
+        self.password = password
+        self.market = market
+        self.logged_in = False
+        self.login_count = 0
+        self._login_lock = threading.Lock()
+        self.retry = retry or RetryPolicy()
+        self.limiter = HostLimiter(max_per_host)
+
+        # Pool sized for the fetchers' worker threads so pages don't queue on sockets
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    # ---------------- LOGIN ----------------
+    def login(self, force=False):
+        """Log in once; later calls are no-ops unless force=True."""
+        with self._login_lock:
+            if self.logged_in and not force:
+                return
+            self._post_credentials()
+
+    def _post_credentials(self):
+        self._send("GET", self.login_url)
+        csrftoken = self.cookies.get("csrftoken")
+        payload = {
+            "username": self.username,
+            "password": self.password,
+            "csrfmiddlewaretoken": csrftoken
+        }
+        headers = {"Referer": f"{self.base_url}/{self.market}/stats/", "X-CSRFToken": csrftoken}
+        resp = self._send("POST", self.login_url, data=payload, headers=headers)
+        resp.raise_for_status()
+        if "invalid" in resp.text.lower():
+            raise Exception("Login failed")
+        self.logged_in = True
+        self.login_count += 1
+        print("Login successful!")
+
+    def _relogin(self, seen_login_count):
+        """Log in again unless another thread already did since our request went out."""
+        with self._login_lock:
+            if self.login_count == seen_login_count:
+                print("AdReal session expired, logging in again.")
+                self._post_credentials()
+
+    def _is_expired(self, resp):
+        """True if the server bounced us back to the login page."""
+        if resp.status_code == 403:
+            return True
+        return bool(resp.history) and "/api/login/" in resp.url
+
+    # ---------------- REQUEST ----------------
+    def _send(self, method, url, **kwargs):
+        return send_with_retry(super().request, method, url, self.retry, self.limiter, **kwargs)
+
+    def request(self, method, url, **kwargs):
+        if not self.logged_in:
+            self.login()
+        seen_login_count = self.login_count
+        resp = self._send(method, url, **kwargs)
+        if self._is_expired(resp):
+            self._relogin(seen_login_count)
+            resp = self._send(method, url, **kwargs)
+        return resp
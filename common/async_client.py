@@ -0,0 +1,290 @@
+import asyncio
+import json
+
+try:
+    import httpx
+except ImportError:  # in requirements.txt; the constructor explains what is missing
+    httpx = None
+
+from .adreal_session import DEFAULT_BASE_URL
+from .fetch_adreal import DEFAULT_PAGE_SIZE
+from .retry import RetryPolicy
+
+
+def _http2_available():
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class AsyncAdRealClient:
+    """
+    asyncio AdReal client: many requests in flight over a small pool of
+    keep-alive (HTTP/2 when the h2 package is installed) connections.
+
+    At most `max_concurrency` requests run at once (a semaphore, like the
+    HostLimiter of AdRealSession). Login is lazy, an expired session (redirect to
+    /api/login/ or 403) logs in again once, and transient failures are retried
+    with the same RetryPolicy as the threaded session.
+
+    async with AsyncAdRealClient(user, password) as client:
+        brands = await client.fetch_brands("month_20250801")
+        items = await client.fetch_stats(period_range, brand_ids=[123, 456], segments="brand,website")
+
+    Needs httpx (pip install httpx, plus h2 for HTTP/2). For synchronous code
+    (the Cloud Function entry points) use AdRealClient.
+    """
+
+    def __init__(self, username, password, market="ro", base_url=DEFAULT_BASE_URL, max_concurrency=16,
+                 max_connections=8, http2=True, retry=None, timeout=120):
+        if httpx is None:
+            raise RuntimeError("AsyncAdRealClient needs httpx: pip install httpx (and h2 for HTTP/2)")
+        self.base_url = base_url.rstrip("/")
+        self.login_url = f"{self.base_url}/login/?next=/api/"
+        self.username = username
+        self.password = password
+        self.market = market
+        self.retry = retry or RetryPolicy()
+        self.max_concurrency = max_concurrency
+        self.logged_in = False
+        self.login_count = 0
+        self.http = httpx.AsyncClient(
+            http2=http2 and _http2_available(),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout,
+        )
+        # created on first use, inside the running event loop
+        self._login_lock = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.http.aclose()
+
+    # ---------------- LOGIN ----------------
+    def _locks(self):
+        if self._semaphore is None:
+            self._login_lock = asyncio.Lock()
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def login(self, force=False):
+        """Log in once; later calls are no-ops unless force=True."""
+        self._locks()
+        async with self._login_lock:
+            if self.logged_in and not force:
+                return
+            await self._post_credentials()
+
+    async def _post_credentials(self):
+        await self._send("GET", self.login_url)
+        csrftoken = self.http.cookies.get("csrftoken")
+        payload = {
+            "username": self.username,
+            "password": self.password,
+            "csrfmiddlewaretoken": csrftoken
+        }
+        headers = {"Referer": f"{self.base_url}/{self.market}/stats/", "X-CSRFToken": csrftoken}
+        # a successful Django login answers 302 to ?next=; httpx only follows it when asked
+        resp = await self._send("POST", self.login_url, data=payload, headers=headers, follow_redirects=True)
+        resp.raise_for_status()
+        if "invalid" in resp.text.lower() or (resp.history and "/api/login/" in resp.url.path):
+            raise Exception("Login failed")
+        self.logged_in = True
+        self.login_count += 1
+        print("Login successful!")
+
+    async def _relogin(self, seen_login_count):
+        async with self._login_lock:
+            if self.login_count == seen_login_count:
+                print("AdReal session expired, logging in again.")
+                await self._post_credentials()
+
+    @staticmethod
+    def _is_expired(resp):
+        """True if the server bounced us back to the login page."""
+        if resp.status_code == 403:
+            return True
+        return resp.is_redirect and "/api/login/" in resp.headers.get("Location", "")
+
+    # ---------------- REQUEST ----------------
+    async def _send(self, method, url, **kwargs):
+        """One request through the semaphore, retried like send_with_retry."""
+        self._locks()
+        policy = self.retry
+        attempt = 1
+        while True:
+            try:
+                async with self._semaphore:
+                    resp = await self.http.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if not policy.should_retry_exception(method, attempt):
+                    raise
+                wait = policy.delay(attempt)
+                policy.log_retry(attempt, f"{method} {url} failed ({type(e).__name__}), "
+                                          f"retry {attempt}/{policy.max_attempts - 1} in {wait:.1f}s")
+            else:
+                if not policy.should_retry_response(method, resp, attempt):
+                    return resp
+                wait = policy.delay(attempt, resp)
+                policy.log_retry(attempt, f"{method} {url} returned {resp.status_code}, "
+                                          f"retry {attempt}/{policy.max_attempts - 1} in {wait:.1f}s")
+            await asyncio.sleep(wait)
+            attempt += 1
+
+    async def get_json(self, endpoint, params=None):
+        """GET /<market>/<endpoint>/ as JSON, logging in (again) as needed."""
+        if not self.logged_in:
+            await self.login()
+        url = f"{self.base_url}/{self.market}/{endpoint}/"
+        seen_login_count = self.login_count
+        resp = await self._send("GET", url, params=params)
+        if self._is_expired(resp):
+            await self._relogin(seen_login_count)
+            resp = await self._send("GET", url, params=params)
+        resp.raise_for_status()
+        return resp.json()
+
+    # ---------------- PAGINATION ----------------
+    async def _fetch_pages(self, endpoint, params, page_size):
+        """
+        Every result of an offset-paginated endpoint, in offset order: the first
+        page gives total_count, the remaining pages are requested all at once
+        (the semaphore bounds how many are in flight).
+        """
+        params = dict(params, limit=page_size)
+        first = await self.get_json(endpoint, dict(params, offset=0))
+        results = list(first.get("results", []))
+        total_count = first.get("total_count", len(results))
+        # the server may cap limit below page_size: step by what it actually returns
+        step = min(page_size, len(results)) or page_size
+        offsets = range(len(results), total_count, step)
+        pages = await asyncio.gather(*(self.get_json(endpoint, dict(params, offset=o)) for o in offsets))
+        for page in pages:
+            results.extend(page.get("results", []))
+        if len(results) != total_count:
+            raise RuntimeError(f"/{endpoint}/ pagination returned {len(results)} items "
+                               f"but the server reported total_count={total_count}")
+        return results
+
+    # ---------------- FETCH ----------------
+    async def fetch_brands(self, period, limit=100000):
+        brands = await self._fetch_pages("brands", {"period": period}, limit)
+        print(f"Done! Fetched {len(brands)} brands for {period}")
+        return brands
+
+    async def fetch_publishers(self, period, limit=100000):
+        publishers = await self._fetch_pages("publishers", {"period": period}, limit)
+        print(f"Done! Fetched {len(publishers)} publishers for {period}")
+        return publishers
+
+    async def fetch_platforms(self):
+        data = await self.get_json("platforms")
+        return data.get("results", data)
+
+    async def fetch_stats(self, period_range, brand_ids=None, industries=None, platforms="pc",
+                          page_types="search,social,standard", metrics="ru,ad_cont,reach", segments="brand",
+                          page_size=DEFAULT_PAGE_SIZE):
+        """/stats/ result items for one selection (the same list AdRealFetcher.fetch_data returns)."""
+        params = {
+            "format": "json",
+            "metrics": metrics,
+            "periods_range": period_range,
+            "platforms": platforms,
+            "page_types": page_types,
+            "segments": segments,
+        }
+        if brand_ids:
+            params["brands"] = ",".join(map(str, brand_ids)) if isinstance(brand_ids, (list, tuple)) else str(brand_ids)
+        if industries:
+            params["industries"] = industries
+        return await self._fetch_pages("stats", params, page_size)
+
+    async def fetch_stats_sharded(self, period_range, brand_ids, shard_size=5, industries=None, **kwargs):
+        """
+        fetch_stats over groups of shard_size brand ids (or industries when no brand
+        ids are given), all shards in flight together; items repeated across
+        shards are kept once, in shard order (like AdRealFetcher.fetch_data_sharded).
+        """
+        if brand_ids:
+            brand_ids = list(brand_ids)
+            shards = [{"brand_ids": brand_ids[i:i + shard_size], "industries": industries}
+                      for i in range(0, len(brand_ids), shard_size)]
+        elif industries:
+            values = [i.strip() for i in str(industries).split(",") if i.strip()]
+            shards = [{"brand_ids": None, "industries": ",".join(values[i:i + shard_size])}
+                      for i in range(0, len(values), shard_size)]
+        else:
+            shards = [{"brand_ids": None, "industries": None}]
+        print(f"Fetching stats in {len(shards)} shard(s) of up to {shard_size}")
+
+        results = await asyncio.gather(*(self.fetch_stats(period_range, **shard, **kwargs) for shard in shards))
+        seen = set()
+        items = []
+        for shard_items in results:
+            for item in shard_items:
+                key = json.dumps(item.get("segment"), sort_keys=True)
+                if key in seen:
+                    continue
+                seen.add(key)
+                items.append(item)
+        print(f"Sharded stats: {sum(map(len, results))} items from shards, {len(items)} after de-duplication")
+        return items
+
+
+class AdRealClient:
+    """
+    Synchronous wrapper over AsyncAdRealClient with the same methods, for code
+    that is not async (Cloud Functions, batch_runner). It owns a private event
+    loop, so use one wrapper per thread.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self.client = self._loop.run_until_complete(self._create(args, kwargs))
+        except BaseException:
+            self._loop.close()
+            raise
+
+    @staticmethod
+    async def _create(args, kwargs):
+        # httpx binds its connection pool to the loop that first uses it
+        return AsyncAdRealClient(*args, **kwargs)
+
+    def _run(self, coro):
+        return self._loop.run_until_complete(coro)
+
+    def login(self, force=False):
+        return self._run(self.client.login(force=force))
+
+    def fetch_brands(self, period, limit=100000):
+        return self._run(self.client.fetch_brands(period, limit=limit))
+
+    def fetch_publishers(self, period, limit=100000):
+        return self._run(self.client.fetch_publishers(period, limit=limit))
+
+    def fetch_platforms(self):
+        return self._run(self.client.fetch_platforms())
+
+    def fetch_stats(self, period_range, **kwargs):
+        return self._run(self.client.fetch_stats(period_range, **kwargs))
+
+    def fetch_stats_sharded(self, period_range, brand_ids, **kwargs):
+        return self._run(self.client.fetch_stats_sharded(period_range, brand_ids, **kwargs))
+
+    def close(self):
+        self._run(self.client.aclose())
+        self._loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,155 @@
+import argparse
+import sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .adreal_session import AdRealSession
+from .brand_hierarchy import load_brand_hierarchy
+from .catalogue_sync import catalogue_sync_from_env
+from .checkpoint import checkpoint_from_env
+from .gather_all import (
+    fetch_reference_data,
+    get_correct_period,
+    get_previous_month_range,
+    run_client,
+)
+from .reference_cache import reference_cache_from_env
+from .registry import load_registry
+
+
+def run_batch(username, password, clients, max_workers=4, session=None, cache=None, checkpoint=None,
+              sync=None):
+    """
+    Run many clients in one process: one login, one brands/publishers download
+    per market, then each client's /stats/ query + merge + clean on a bounded
+    worker pool.
+
+    `clients` are registry entries (see common/registry.py).
+
+    `checkpoint` (default: checkpoint_from_env()) saves each stage so a rerun of
+    the same period resumes: reference data, sharded stats, cleaned frames and
+    finished BigQuery loads are not redone.
+
+    Returns {name: {"table_id", "df", "error", "checkpoint"}}; a failing client
+    only sets its own "error" and never affects the others.
+    """
+    period = get_correct_period()
+    period_range = get_previous_month_range()
+
+    markets = sorted({client["market"] for client in clients})
+    if session is None:
+        session = AdRealSession(username, password, markets[0] if markets else "ro")
+    if cache is None:
+        cache = reference_cache_from_env()
+    if checkpoint is None:
+        checkpoint = checkpoint_from_env(period)
+    if sync is None:
+        sync = catalogue_sync_from_env()
+
+    reference_data = {
+        market: fetch_reference_data(session, period, market=market, cache=cache, checkpoint=checkpoint,
+                                     sync=sync)
+        for market in markets
+    }
+    # Owner lookups are precomputed once per market and shared by every client
+    hierarchies = {
+        market: load_brand_hierarchy(reference_data[market][0], market, period, cache)
+        for market in markets
+    }
+    client_checkpoints = {
+        client["name"]: checkpoint.client(client["name"]) if checkpoint is not None else None
+        for client in clients
+    }
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(run_client, client, session, *reference_data[client["market"]], period_range,
+                            checkpoint=client_checkpoints[client["name"]],
+                            hierarchy=hierarchies[client["market"]]): client
+            for client in clients
+        }
+        for future in as_completed(futures):
+            client = futures[future]
+            result = {"table_id": client["table_id"], "df": None, "error": None,
+                      "checkpoint": client_checkpoints[client["name"]]}
+            try:
+                result["df"] = future.result()
+                print(f"[{client['name']}] fetched {len(result['df'])} rows")
+            except Exception as e:
+                print(f"[{client['name']}] failed:")
+                traceback.print_exc()
+                result["error"] = e
+            results[client["name"]] = result
+    return results
+
+
+def push_batch_results(results, bq_client=None, max_jobs=None):
+    """
+    Push every successful client frame to its own table; returns {name: message}.
+    The loads run together on a BigQuerySink (max_jobs tables at a time).
+    Clients whose load already completed in a checkpointed earlier attempt are skipped.
+    """
+    from .bigquery_loader import DEFAULT_LOAD_JOBS, BigQuerySink
+
+    messages = {}
+    sink = BigQuerySink(client=bq_client, max_jobs=max_jobs or DEFAULT_LOAD_JOBS)
+    for name, result in results.items():
+        if result["error"] is not None:
+            messages[name] = f"Error: {result['error']}"
+            continue
+        checkpoint = result.get("checkpoint")
+        loaded = checkpoint.done("load") if checkpoint is not None else None
+        if loaded is not None:
+            messages[name] = f"Already loaded: {loaded.get('message')}"
+            print(f"[{name}] {messages[name]}")
+            continue
+        sink.add(name, result["df"], result["table_id"])
+
+    for name, load in sink.run().items():
+        if load["error"] is not None:
+            messages[name] = f"Error: {load['error']}"
+            continue
+        messages[name] = load["message"]
+        checkpoint = results[name].get("checkpoint")
+        if checkpoint is not None:
+            checkpoint.mark_done("load", message=load["message"], job_ids=load["job_ids"])
+    # Keep the registry order of the clients
+    return {name: messages[name] for name in results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several AdReal clients in one process.")
+    parser.add_argument("clients", nargs="*", help="Client names from clients.json (default: all enabled)")
+    parser.add_argument("--registry", default=None, help="Path to the clients registry (default: clients.json)")
+    parser.add_argument("--max-workers", type=int, default=4, help="Concurrent /stats/ queries")
+    parser.add_argument("--push", action="store_true", help="Push results to BigQuery")
+    parser.add_argument("--load-jobs", type=int, default=None, help="Tables loaded into BigQuery at a time")
+    args = parser.parse_args()
+
+    from .run_pipeline import access_secret
+
+    clients = load_registry(args.registry, include_disabled=bool(args.clients))
+    if args.clients:
+        unknown = set(args.clients) - {client["name"] for client in clients}
+        if unknown:
+            parser.error(f"Unknown clients: {sorted(unknown)}")
+        clients = [client for client in clients if client["name"] in args.clients]
+
+    username = access_secret("adreal-username")
+    password = access_secret("adreal-password")
+    results = run_batch(username, password, clients, max_workers=args.max_workers)
+
+    if args.push:
+        push_batch_results(results, max_jobs=args.load_jobs)
+    else:
+        for name, result in results.items():
+            if result["error"] is None:
+                result["df"].to_csv(f"{name}_{get_correct_period()}_Adreal.csv", index=False)
+
+    if any(result["error"] is not None for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+import io
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from google.api_core.exceptions import NotFound
+from google.cloud import bigquery
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# Tables created by the loader: one partition per month of Date, clustered for the usual filters
+PARTITION_FIELD = "Date"
+CLUSTERING_FIELDS = ["BrandOwner", "Brand", "MediaChannel"]
+
+# Staging tables of the MERGE fallback expire on their own if a run dies before dropping them
+STAGING_TTL = timedelta(hours=6)
+
+# Tables loaded at the same time by a BigQuerySink
+DEFAULT_LOAD_JOBS = 8
+
+# Arrow type -> BigQuery type of the loaded columns
+BQ_TYPES = {pa.date32(): "DATE", pa.string(): "STRING", pa.int64(): "INTEGER"}
+
+# BigQuery type of an existing table's column -> Arrow type it is loaded as
+LOAD_TYPES = {"DATE": pa.date32(), "STRING": pa.string(), "INTEGER": pa.int64(), "INT64": pa.int64()}
+
+# BigQuery type of a table column the frame does not carry -> Arrow type its NULLs are loaded as
+NULL_TYPES = {
+    **LOAD_TYPES,
+    "FLOAT": pa.float64(), "FLOAT64": pa.float64(), "BOOLEAN": pa.bool_(), "BOOL": pa.bool_(),
+    "NUMERIC": pa.decimal128(38, 9), "BYTES": pa.binary(),
+    "TIMESTAMP": pa.timestamp("us", tz="UTC"), "DATETIME": pa.timestamp("us"),
+}
+
+
+def arrow_schema(include_product=False):
+    """The fixed Arrow schema of a client table (Product only for tables that have it)."""
+    fields = [
+        pa.field("Date", pa.date32()),
+        pa.field("BrandOwner", pa.string()),
+        pa.field("Brand", pa.string()),
+        pa.field("ContentType", pa.string()),
+        pa.field("MediaChannel", pa.string()),
+        pa.field("AdContacts", pa.int64()),
+    ]
+    if include_product:
+        fields.insert(3, pa.field("Product", pa.string()))
+    return pa.schema(fields)
+
+
+def table_schema(schema):
+    """BigQuery SchemaFields for an Arrow schema from arrow_schema()."""
+    return [bigquery.SchemaField(field.name, BQ_TYPES[field.type]) for field in schema]
+
+
+def load_schema(table, frame_schema):
+    """
+    Arrow schema of a load into an existing BigQuery table, in table order (a
+    partition load cannot add or drop columns): the frame's columns as they are
+    (see check_columns) and every other table column as NULL. Only the types of
+    the columns the frame lacks are checked here; they must be in NULL_TYPES.
+    """
+    fields = []
+    for field in table.schema:
+        if field.name in frame_schema.names:
+            fields.append(frame_schema.field(field.name))
+        elif field.field_type in NULL_TYPES:
+            fields.append(pa.field(field.name, NULL_TYPES[field.field_type]))
+        else:
+            raise ValueError(f"Column {field.name} of {table.table_id} is not in the frame and "
+                             f"{field.field_type} columns cannot be loaded as NULL")
+    return pa.schema(fields)
+
+
+def check_columns(frame_schema, table):
+    """
+    Raise ValueError when a frame with frame_schema's columns cannot replace
+    partitions of the existing table: a column the table does not have (it would
+    be dropped), a column of another type, or a REQUIRED column the frame lacks.
+    Other table columns the frame lacks are NULLABLE and load as NULL.
+    """
+    table_fields = {field.name: field for field in table.schema}
+    problems = []
+    for field in frame_schema:
+        table_field = table_fields.get(field.name)
+        if table_field is None:
+            problems.append(f"{field.name} is not a column of the table")
+        elif LOAD_TYPES.get(table_field.field_type) != field.type:
+            problems.append(f"{field.name} is {table_field.field_type} in the table, "
+                            f"{BQ_TYPES[field.type]} in the frame")
+    for name, table_field in table_fields.items():
+        if table_field.mode == "REQUIRED" and name not in frame_schema.names:
+            problems.append(f"REQUIRED column {name} is missing from the frame")
+    if problems:
+        raise ValueError(f"Frame does not match the schema of {table.table_id}: {'; '.join(problems)}")
+
+
+# ---------------- ARROW CONVERSION ----------------
+def _date_array(column):
+    """DATE column; the cleaned frames carry one 'YYYY-MM-01' string per batch, parsed once per distinct value."""
+    codes, uniques = pd.factorize(column.astype(object), use_na_sentinel=True)
+    dates = pd.to_datetime(pd.Series(uniques, dtype=object), errors="coerce").dt.date
+    days = pa.array(list(dates) + [None], type=pa.date32(), from_pandas=True)
+    return days.take(pa.array(np.where(codes == -1, len(uniques), codes)))
+
+
+def _string_array(column):
+    """STRING column; categoricals are converted per category, not per row."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        categories = pa.array([str(c) for c in column.cat.categories], type=pa.string())
+        codes = column.cat.codes.to_numpy()
+        return categories.take(pa.array(codes, mask=codes == -1))
+    values = column.astype(object)
+    values = values.where(values.isna(), values.map(str))
+    return pa.array(values, type=pa.string(), from_pandas=True)
+
+
+def _int_array(column):
+    """INTEGER column; missing / non-numeric counts load as 0 (like the old to_numeric + fillna(0))."""
+    if not pd.api.types.is_numeric_dtype(column.dtype):
+        column = pd.to_numeric(column, errors="coerce")
+    values = pa.array(column, from_pandas=True)
+    return values.fill_null(0).cast(pa.int64(), safe=False)
+
+
+def to_arrow(df, schema=None):
+    """
+    Arrow table of a cleaned frame with the fixed table schema (no type inference):
+    columns outside the schema (MediaOwner) are dropped, missing ones are all-null.
+    """
+    if schema is None:
+        schema = arrow_schema(include_product="Product" in df.columns)
+    arrays = []
+    for field in schema:
+        if field.name not in df.columns:
+            if field.type == pa.int64():
+                arrays.append(pa.array(np.zeros(len(df), dtype=np.int64)))
+            else:
+                arrays.append(pa.nulls(len(df), type=field.type))
+        elif field.type == pa.date32():
+            arrays.append(_date_array(df[field.name]))
+        elif field.type == pa.int64():
+            arrays.append(_int_array(df[field.name]))
+        else:
+            arrays.append(_string_array(df[field.name]))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def conform_arrow(table, schema):
+    """An Arrow table in the given schema, with missing columns filled like to_arrow does."""
+    arrays = []
+    for field in schema:
+        if field.name in table.column_names:
+            arrays.append(table.column(field.name).cast(field.type))
+        elif field.type == pa.int64():
+            arrays.append(pa.array(np.zeros(table.num_rows, dtype=np.int64)))
+        else:
+            arrays.append(pa.nulls(table.num_rows, type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _parquet_file(table):
+    buf = io.BytesIO()
+    pq.write_table(table, buf)
+    buf.seek(0)
+    return buf
+
+
+def _load_parquet(client, table, destination, schema, write_disposition, time_partitioning=None):
+    """One Parquet load job with an explicit schema, the destination's SchemaFields (nothing is inferred)."""
+    job_config = bigquery.LoadJobConfig(
+        source_format=bigquery.SourceFormat.PARQUET,
+        schema=schema,
+        write_disposition=write_disposition,
+    )
+    if time_partitioning is not None:
+        job_config.time_partitioning = time_partitioning
+    load_job = client.load_table_from_file(_parquet_file(table), destination, job_config=job_config)
+    load_job.result()
+    return load_job
+
+
+# ---------------- TABLES ----------------
+def ensure_table(client, table_id, schema):
+    """
+    The destination table, created DATE-partitioned by month and clustered when it
+    does not exist yet.
+    """
+    try:
+        table = client.get_table(table_id)
+    except NotFound:
+        table = bigquery.Table(table_id, schema=table_schema(schema))
+        table.time_partitioning = bigquery.TimePartitioning(
+            type_=bigquery.TimePartitioningType.MONTH, field=PARTITION_FIELD)
+        table.clustering_fields = [f for f in CLUSTERING_FIELDS if f in schema.names]
+        table = client.create_table(table, exists_ok=True)
+        print(f"Created {table_id} (partitioned by month of {PARTITION_FIELD})")
+    return table
+
+
+def partition_type(table):
+    """The table's time partitioning type (None unless it is partitioned on Date)."""
+    partitioning = table.time_partitioning
+    if partitioning is None or partitioning.field != PARTITION_FIELD:
+        return None
+    return partitioning.type_
+
+
+def partition_decorator(date, partition_type):
+    """$-suffix of the partition holding date (YYYYMM for MONTH, YYYYMMDD for DAY)."""
+    if partition_type == bigquery.TimePartitioningType.MONTH:
+        return date.strftime("%Y%m")
+    if partition_type == bigquery.TimePartitioningType.DAY:
+        return date.strftime("%Y%m%d")
+    raise ValueError(f"Unsupported partitioning for month replacement: {partition_type!r}")
+
+
+def bigquery_client_from_env():
+    """
+    BigQuery client for this process: a LocalBigQueryClient when ADREAL_BIGQUERY_DIR
+    is set (local runs and tests), else bigquery.Client().
+    """
+    local_dir = os.environ.get("ADREAL_BIGQUERY_DIR")
+    if local_dir:
+        from .local_bigquery import LocalBigQueryClient
+        return LocalBigQueryClient(local_dir)
+    return bigquery.Client()
+
+
+# ---------------- LOAD ----------------
+def push_to_bigquery(df, table_id, client=None, job_ids=None):
+    """
+    Load DataFrame into BigQuery, replacing only the current month(s).
+
+    The frame is converted once to an Arrow table with the schema of the
+    destination table (a new table gets the frame's arrow_schema() columns;
+    table columns the frame lacks load as NULL, like the old DataFrame loads)
+    and loaded as Parquet with that schema set on the job. Each month is one
+    load into its partition ("table$YYYYMM") with WRITE_TRUNCATE: the month
+    is swapped atomically, there is no DELETE scan and no window where the
+    month is missing. Tables that are not partitioned on Date get the same
+    guarantee from a staging table and one MERGE (see _merge_months). A frame that does not fit the existing table raises
+    ValueError before any month is touched (see check_columns).
+
+    `df` may also be an Arrow table with the arrow_schema() columns, which is
+    loaded without going through pandas.
+
+    The ids of the load jobs are appended to `job_ids` when a list is given.
+    """
+    client = client or bigquery_client_from_env()
+    job_ids = [] if job_ids is None else job_ids
+    columns = df.column_names if isinstance(df, pa.Table) else df.columns
+    frame_schema = arrow_schema(include_product="Product" in columns)
+    bq_table = ensure_table(client, table_id, frame_schema)
+    # checked before anything is truncated or deleted
+    check_columns(frame_schema, bq_table)
+    schema = load_schema(bq_table, frame_schema)
+    if isinstance(df, pa.Table):
+        table = conform_arrow(df, schema)
+    else:
+        table = to_arrow(df, schema)
+    dates = table.column("Date")
+    if dates.null_count:
+        raise ValueError(f"{dates.null_count} rows for {table_id} have no valid Date")
+
+    part_type = partition_type(bq_table)
+    if part_type is None:
+        print(f"{table_id} is not partitioned on {PARTITION_FIELD}: replacing months through a staging table")
+        return _merge_months(client, table, bq_table, table_id, job_ids)
+
+    # Partitions touched by the new data (one per month; per day on DAY-partitioned tables)
+    decorators = {}
+    for date in dates.unique().to_pylist():
+        if date is not None:
+            decorators.setdefault(partition_decorator(date, part_type), []).append(date)
+    for decorator, part_dates in sorted(decorators.items()):
+        part = table.filter(pc.is_in(dates, value_set=pa.array(part_dates, type=pa.date32())))
+        load_job = _load_parquet(client, part, f"{table_id}${decorator}", bq_table.schema,
+                                 bigquery.WriteDisposition.WRITE_TRUNCATE,
+                                 bigquery.TimePartitioning(type_=part_type, field=PARTITION_FIELD))
+        job_ids.append(load_job.job_id)
+
+    return f"Loaded {table.num_rows} rows into {table_id} (replaced partitions: {sorted(decorators)})"
+
+
+def _merge_months(client, table, bq_table, table_id, job_ids):
+    """
+    Replace months of a table that is not partitioned on Date: the new rows are
+    loaded into a staging table, then one MERGE deletes the old rows of those
+    months and inserts the new ones. The MERGE is a single atomic statement, so
+    readers never see the month missing or doubled. The staging table is
+    dropped afterwards (and expires after STAGING_TTL if the run dies first).
+    """
+    months = sorted({d.replace(day=1) for d in table.column("Date").unique().to_pylist()})
+    if not months:
+        return f"Nothing to load into {table_id}"
+
+    staging_id = f"{table_id}_staging_{uuid.uuid4().hex[:12]}"
+    staging = bigquery.Table(staging_id, schema=bq_table.schema)
+    staging.expires = datetime.now(timezone.utc) + STAGING_TTL
+    client.create_table(staging)
+    try:
+        load_job = _load_parquet(client, table, staging_id, bq_table.schema, bigquery.WriteDisposition.WRITE_TRUNCATE)
+        job_ids.append(load_job.job_id)
+
+        month_list = ", ".join(f"DATE '{month.isoformat()}'" for month in months)
+        merge_query = f"""
+        MERGE `{table_id}` T
+        USING `{staging_id}` S
+        ON FALSE
+        WHEN NOT MATCHED BY SOURCE AND DATE_TRUNC(T.Date, MONTH) IN ({month_list}) THEN DELETE
+        WHEN NOT MATCHED THEN INSERT ROW
+        """
+        merge_job = client.query(merge_query)
+        merge_job.result()
+        job_ids.append(merge_job.job_id)
+    finally:
+        client.delete_table(staging_id, not_found_ok=True)
+
+    return f"Loaded {table.num_rows} rows into {table_id} (replaced months: {months})"
+
+
+# ---------------- MULTI-CLIENT SINK ----------------
+class BigQuerySink:
+    """
+    Loads the frames of many clients in one run on a bounded pool of
+    max_jobs workers, so the total push takes about as long as the slowest
+    table instead of the sum of all of them. Frames for the same table are
+    loaded one after the other, in the order they were added.
+
+    sink = BigQuerySink()
+    sink.add("Mega", df, "Mega.DataImport")
+    results = sink.run()   # {name: {"table_id", "message", "job_ids", "error", "seconds"}}
+    """
+
+    def __init__(self, client=None, max_jobs=DEFAULT_LOAD_JOBS):
+        self.client = client
+        self.max_jobs = max_jobs
+        self._loads = []
+        self._lock = threading.Lock()
+
+    def add(self, name, df, table_id):
+        self._loads.append((name, df, table_id))
+
+    def _push(self, name, df, table_id):
+        result = {"table_id": table_id, "message": None, "job_ids": [], "error": None, "seconds": 0.0}
+        start = time.perf_counter()
+        try:
+            result["message"] = push_to_bigquery(df, table_id, client=self.client, job_ids=result["job_ids"])
+        except Exception as e:
+            with self._lock:
+                print(f"[{name}] load into {table_id} failed:")
+                traceback.print_exc()
+            result["error"] = e
+        result["seconds"] = time.perf_counter() - start
+        with self._lock:
+            print(f"[{name}] {result['message'] or 'Error: ' + str(result['error'])} "
+                  f"(jobs {result['job_ids']}, {result['seconds']:.1f}s)")
+        return name, result
+
+    def _push_table(self, loads):
+        return [self._push(*load) for load in loads]
+
+    def run(self):
+        """Run every added load; returns {name: result} (a failed load only sets its own "error")."""
+        if not self._loads:
+            return {}
+        if self.client is None:
+            self.client = bigquery_client_from_env()
+        by_table = {}
+        for load in self._loads:
+            by_table.setdefault(load[2], []).append(load)
+        self._loads = []
+
+        results = {}
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, self.max_jobs)) as executor:
+            for table_results in executor.map(self._push_table, by_table.values()):
+                results.update(table_results)
+        if results:
+            slowest = max(result["seconds"] for result in results.values())
+            print(f"Loaded {len(results)} tables in {time.perf_counter() - start:.1f}s "
+                  f"(slowest {slowest:.1f}s, sum {sum(r['seconds'] for r in results.values()):.1f}s)")
+        return results
@@ -0,0 +1,258 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# Position value for ids that are not in the hierarchy
+MISSING = -1
+
+
+def brands_fingerprint(brands):
+    """Cheap identity of a brands catalogue (ids, parents, names), to validate a cached hierarchy."""
+    from .catalogue_snapshot import CatalogueSnapshot
+    if isinstance(brands, CatalogueSnapshot):
+        # the same digest, read column by column instead of through record dicts
+        rows = zip(*(brands.table.column(field).to_pylist() for field in ("id", "parent_id", "name")))
+    else:
+        rows = ((b.get("id"), b.get("parent_id"), b.get("name")) for b in brands)
+    digest = hashlib.sha1()
+    for brand_id, parent_id, name in rows:
+        digest.update(f"{brand_id}\x1f{parent_id}\x1f{name}\x1e".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class BrandHierarchy:
+    """
+    The brands catalogue as flat NumPy arrays, built once per market and period.
+
+    For every brand id it precomputes:
+      parent_owner  one level up (what get_brand_owner returns)
+      root_owner    top of the parent chain (what get_owner_from_id returns)
+      depth         number of parents above the brand
+      ancestors     the chain brand -> ... -> root
+    so owner resolution for a whole batch of stats is one searchsorted plus
+    array gathers instead of a dict walk per row.
+
+    Parent cycles in the catalogue are broken at the node that closes the loop
+    (it is treated as a root) and recorded in `cycles`.
+    """
+
+    def __init__(self, brands):
+        # Last entry wins for duplicate ids, like return_lookup
+        by_id = {}
+        for b in brands:
+            if _is_id(b.get("id")):
+                by_id[int(b["id"])] = b
+        self.ids = np.array(sorted(by_id), dtype=np.int64)
+        position = {brand_id: pos for pos, brand_id in enumerate(self.ids.tolist())}
+        n = len(self.ids)
+
+        records = [by_id[brand_id] for brand_id in self.ids.tolist()]
+        self.names = np.array([b.get("name") for b in records] + [None], dtype=object)
+        self.fingerprint = brands_fingerprint(brands)
+
+        parent = np.full(n, MISSING, dtype=np.int64)
+        parent_owner = np.arange(n, dtype=np.int64)
+        top_other = np.zeros(n, dtype=bool)
+        for pos, b in enumerate(records):
+            parent_id = b.get("parent_id")
+            if not parent_id:
+                # top-level: owns itself; 'Other' roots are the API's catch-all bucket
+                top_other[pos] = parent_id is None and str(b.get("name", "")).strip().lower() == "other"
+                continue
+            parent_pos = position.get(parent_id, MISSING) if _is_id(parent_id) else MISSING
+            parent[pos] = parent_pos
+            parent_owner[pos] = parent_pos
+
+        root, depth, cycles = _climb(parent)
+        # Per-node arrays carry one trailing sentinel so gathering at MISSING (-1)
+        # yields "unknown" (no owner, depth -1, not 'Other') without masking
+        self.parent = np.append(parent, MISSING)
+        self.parent_owner = np.append(parent_owner, MISSING)
+        self.root = np.append(root, MISSING)
+        self.depth = np.append(depth, -1)
+        self.top_other = np.append(top_other, False)
+        self.cycles = [int(self.ids[pos]) for pos in cycles]
+        if self.cycles:
+            print(f"Brand hierarchy: parent cycles broken at ids {self.cycles}")
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ---------------- LOOKUPS ----------------
+    def positions(self, ids, skip_zero=False):
+        """
+        Array positions of ids (MISSING where the id is unknown or not an integer;
+        also for 0 with skip_zero, matching the `if brand_id` checks of the old walk).
+        """
+        ids, valid = _id_array(ids)
+        if skip_zero:
+            valid &= ids != 0
+        if not len(self.ids):
+            return np.full(len(ids), MISSING, dtype=np.int64)
+        pos = np.searchsorted(self.ids, ids)
+        pos = np.minimum(pos, len(self.ids) - 1)
+        found = valid & (self.ids[pos] == ids)
+        return np.where(found, pos, MISSING)
+
+    def parent_owner_names(self, ids):
+        return self.names[self.parent_owner[self.positions(ids)]]
+
+    def root_owner_names(self, ids):
+        return self.names[self.root[self.positions(ids)]]
+
+    def depths(self, ids):
+        """Depth per id (0 for roots, -1 for unknown ids)."""
+        return self.depth[self.positions(ids)]
+
+    def ancestors(self, brand_id):
+        """[brand_id, parent, ..., root] ids; empty if the id is unknown."""
+        pos = int(self.positions([brand_id])[0])
+        path = []
+        while pos != MISSING:
+            path.append(int(self.ids[pos]))
+            pos = MISSING if self.root[pos] == pos else int(self.parent[pos])
+        return path
+
+    def owner_names(self, brand_ids, owner_resolution="parent", product_ids=None, owner_ids=None):
+        """
+        Brand owner names for arrays of segment values, matching resolve_owner:
+
+        parent:    one level up from the brand
+        root:      top of the hierarchy
+        normalize: the API's brand_owner when known, else the brand's root, falling
+                   back to the product's root for top-level 'Other' / unknown brands
+        """
+        if owner_resolution == "parent":
+            return self.parent_owner_names(brand_ids)
+        if owner_resolution == "root":
+            return self.root_owner_names(brand_ids)
+        if owner_resolution != "normalize":
+            raise ValueError(f"Unknown owner_resolution: {owner_resolution!r}")
+
+        brand_pos = self.positions(brand_ids, skip_zero=True)
+        owners = self.names[self.root[brand_pos]]
+
+        if product_ids is not None:
+            need_product = pd.isna(owners) | self.top_other[brand_pos]
+            product_owners = self.names[self.root[self.positions(product_ids, skip_zero=True)]]
+            use_product = need_product & ~pd.isna(product_owners) & (product_owners != "")
+            owners = np.where(use_product, product_owners, owners)
+
+        if owner_ids is not None:
+            owner_pos = self.positions(owner_ids)
+            owners = np.where(owner_pos != MISSING, self.names[owner_pos], owners)
+        return owners
+
+    # ---------------- SERIALIZATION ----------------
+    def to_dict(self):
+        return {
+            "fingerprint": self.fingerprint,
+            "ids": self.ids.tolist(),
+            "names": self.names[:-1].tolist(),
+            "parent": self.parent[:-1].tolist(),
+            "parent_owner": self.parent_owner[:-1].tolist(),
+            "root": self.root[:-1].tolist(),
+            "depth": self.depth[:-1].tolist(),
+            "top_other": self.top_other[:-1].tolist(),
+            "cycles": self.cycles,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        hierarchy = cls.__new__(cls)
+        hierarchy.fingerprint = data["fingerprint"]
+        hierarchy.ids = np.array(data["ids"], dtype=np.int64)
+        hierarchy.names = np.array(list(data["names"]) + [None], dtype=object)
+        for field, sentinel in (("parent", MISSING), ("parent_owner", MISSING), ("root", MISSING), ("depth", -1)):
+            setattr(hierarchy, field, np.array(list(data[field]) + [sentinel], dtype=np.int64))
+        hierarchy.top_other = np.array(list(data["top_other"]) + [False], dtype=bool)
+        hierarchy.cycles = list(data["cycles"])
+        return hierarchy
+
+
+def load_brand_hierarchy(brands, market=None, period=None, cache=None):
+    """
+    BrandHierarchy for a brands catalogue, reusing the copy serialized in the
+    reference cache when it was built from the same catalogue.
+    """
+    fingerprint = brands_fingerprint(brands)
+    if cache is not None:
+        cached = cache.get(market, period, "brand_hierarchy")
+        if cached is not None and cached.get("fingerprint") == fingerprint:
+            print(f"Brand hierarchy for {market} {period}: loaded from cache")
+            return BrandHierarchy.from_dict(cached)
+
+    hierarchy = BrandHierarchy(brands)
+    if cache is not None:
+        cache.put(market, period, "brand_hierarchy", hierarchy.to_dict())
+    return hierarchy
+
+
+# ---------------- HELPERS ----------------
+def _is_id(value):
+    """Integer ids; integral floats count too (2.0 == 2 as a dict key, and pandas upcasts)."""
+    if isinstance(value, (bool, np.bool_)):
+        return False
+    if isinstance(value, (int, np.integer)):
+        return True
+    return isinstance(value, (float, np.floating)) and float(value).is_integer()
+
+
+def _id_array(values):
+    """(int64 ids, valid mask); non-integer values (None, NaN, dicts, strings) are invalid."""
+    if not isinstance(values, np.ndarray):
+        array = np.empty(len(values), dtype=object)
+        array[:] = values
+        values = array
+    if np.issubdtype(values.dtype, np.integer):
+        return values.astype(np.int64, copy=False), np.ones(len(values), dtype=bool)
+    if np.issubdtype(values.dtype, np.floating):
+        valid = np.isfinite(values) & (np.mod(values, 1) == 0)
+        return np.where(valid, values, 0).astype(np.int64), valid
+    if values.dtype == object and pd.api.types.infer_dtype(values, skipna=True) in ("integer", "empty"):
+        # the common case: ints with None / NaN gaps, converted in C
+        missing = pd.isna(values)
+        return np.where(missing, 0, values).astype(np.int64), ~missing
+    valid = np.fromiter((_is_id(v) for v in values), dtype=bool, count=len(values))
+    ids = np.fromiter((v if ok else 0 for v, ok in zip(values, valid)), dtype=np.int64, count=len(values))
+    return ids, valid
+
+
+def _climb(parent):
+    """
+    Root position, depth and cycle entry points for every node of a parent array.
+    A node whose parent is missing from the catalogue is its own root (the climb
+    stops at the last known name, like get_owner_from_id).
+    """
+    n = len(parent)
+    root = np.full(n, MISSING, dtype=np.int64)
+    depth = np.zeros(n, dtype=np.int64)
+    cycles = []
+    for start in range(n):
+        if root[start] != MISSING:
+            continue
+        path = []
+        on_path = set()
+        pos = start
+        while root[pos] == MISSING:
+            if pos in on_path:
+                # pos closes a loop: make it a root and unwind from there
+                cycles.append(pos)
+                root[pos] = pos
+                depth[pos] = 0
+                path = path[:path.index(pos)]
+                break
+            on_path.add(pos)
+            path.append(pos)
+            if parent[pos] == MISSING:
+                root[pos] = pos
+                depth[pos] = 0
+                path.pop()
+                break
+            pos = parent[pos]
+        for node in reversed(path):
+            above = parent[node]
+            root[node] = root[above]
+            depth[node] = depth[above] + 1
+    return root, depth, cycles
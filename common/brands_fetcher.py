@@ -1,87 +1,123 @@
-import requests
+from .adreal_session import AdRealSession
 import json
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 
 
 class BrandFetcher:
-    def __init__(self, username, password, market="ro", max_threads=5, limit=100000):
-        self.BASE_URL = "https://adreal.gemius.com/api"
-        self.LOGIN_URL = f"{self.BASE_URL}/login/?next=/api/"
+    def __init__(self, username, password, market="ro", max_threads=5, limit=100000, session=None,
+                 cache=None, sync=None):
+        # One session (and one login) can be shared across all fetchers
+        self.session = session or AdRealSession(username, password, market)
+        self.BASE_URL = self.session.base_url
+        self.LOGIN_URL = self.session.login_url
         self.username = username
         self.password = password
         self.market = market
         self.limit = limit
         self.max_threads = max_threads
-        self.session = requests.Session()
         self.all_brands = []
+        # Optional ReferenceCache shared by every client run for the same market/period
+        self.cache = cache
+        # Optional CatalogueSync: versioned catalogues with a changelog (and opt-in carry-over)
+        self.sync = sync
 
     # ---------------- LOGIN ----------------
     def login(self):
+        """Log in through the shared session (no-op if it is already authenticated)."""
         print('\nStarted getting Brands data.')
-        login_page = self.session.get(self.LOGIN_URL)
-        csrftoken = self.session.cookies.get("csrftoken")
-        payload = {
-            "username": self.username,
-            "password": self.password,
-            "csrfmiddlewaretoken": csrftoken
-        }
-        headers = {"Referer": f"{self.BASE_URL}/{self.market}/stats/", "X-CSRFToken": csrftoken}
-        resp = self.session.post(self.LOGIN_URL, data=payload, headers=headers)
-        resp.raise_for_status()
-        if "invalid" in resp.text.lower():
-            raise Exception("Login failed")
-        print("Login successful!")
+        self.session.login()
 
     # ---------------- FETCH ----------------
     def fetch_brands(self, period):
-        """Fetch all brands for a given period (handles pagination with threads)."""
-        # Initial request
-        resp = self.session.get(
+        """
+        Fetch all brands for a given period (handles pagination with threads).
+        A cache hit returns a CatalogueSnapshot, which reads like the list of records.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(self.market, period, "brands")
+            if cached is not None:
+                self.all_brands = cached
+                print(f"Loaded {len(cached)} brands for {period} from cache")
+                return cached
+
+        if self.sync is not None:
+            results = self.sync.sync(self.market, "brands", period,
+                                     lambda offset, limit: self._fetch_page(period, offset, limit),
+                                     lambda first_page: self._fetch_all(period, first_page))
+        else:
+            results = self._fetch_all(period)
+
+        self.all_brands = results
+        if self.cache is not None:
+            self.cache.put(self.market, period, "brands", results)
+        print(f"Done! Fetched {len(results)} brands for {period}")
+        return results
+
+    def _fetch_page(self, period, offset, limit):
+        """One raw /brands/ page ({"results", "total_count"})."""
+        r = self.session.get(
             f"{self.BASE_URL}/{self.market}/brands/",
-            params={"period": period, "limit": self.limit, "offset": 0},
+            params={"period": period, "limit": limit, "offset": offset},
+            timeout=30,
         )
-        resp.raise_for_status()
-        data = resp.json()
-        total_count = data.get("total_count", len(data.get("results", [])))
+        r.raise_for_status()
+        return r.json()
+
+    def _fetch_all(self, period, first_page=None):
+        """
+        Every brand of the period, in the API's order. `first_page` is a page at
+        offset 0 already downloaded (e.g. a CatalogueSync probe), which is not fetched again.
+        """
+        # Initial request
+        data = first_page if first_page is not None else self._fetch_page(period, 0, self.limit)
+        first = data.get("results", [])
+        total_count = data.get("total_count", len(first))
         print(f"Total brands to fetch for {period}: {total_count}")
 
-        # Prepare offsets
-        offsets = list(range(0, total_count, self.limit))
+        # Prepare offsets: the server may cap limit, so step by what a full page returns
+        results = list(first)
+        step = min(self.limit, len(first)) or self.limit
+        if first_page is not None and len(first) < total_count:
+            # a small probe page says nothing about the page size: the next page does
+            second = self._fetch_page(period, len(first), self.limit).get("results", [])
+            results.extend(second)
+            step = min(self.limit, len(second)) or self.limit
+        offsets = list(range(len(results), total_count, step))
 
         def fetch_page(offset):
-            params = {"period": period, "limit": self.limit, "offset": offset}
-            r = self.session.get(
-                f"{self.BASE_URL}/{self.market}/brands/", params=params, timeout=30
-            )
-            r.raise_for_status()
-            results = r.json().get("results", [])
+            results = self._fetch_page(period, offset, step).get("results", [])
             print(f"Fetched {len(results)} brands at offset {offset}")
             return results
 
-        # Fetch all concurrently
-        results = []
+        # Fetch the rest concurrently, keeping pages in offset order
         with ThreadPoolExecutor(max_workers=self.max_threads) as executor:
-            futures = [executor.submit(fetch_page, o) for o in offsets]
-            for future in as_completed(futures):
-                results.extend(future.result())
-
-        self.all_brands = results
-        print(f"Done! Fetched {len(results)} brands for {period}")
+            for page in executor.map(fetch_page, offsets):
+                results.extend(page)
+        if len(results) != total_count:
+            raise RuntimeError(f"/brands/ pagination returned {len(results)} items "
+                               f"but the server reported total_count={total_count}")
         return results
 
     # ---------------- SAVE ----------------
     def save_json(self, filename="brands.json"):
         with open(filename, "w", encoding="utf-8") as f:
-            json.dump(self.all_brands, f, indent=4, ensure_ascii=False)
+            json.dump(list(self.all_brands), f, indent=4, ensure_ascii=False)
         print(f"Saved JSON to {filename}")
 
+    def save_snapshot(self, filename="brands.arrow"):
+        """Compact Arrow IPC snapshot, memory-mapped by CatalogueSnapshot.open (no JSON parsing)."""
+        from .catalogue_snapshot import write_snapshot
+        write_snapshot(self.all_brands, filename)
+        print(f"Saved snapshot to {filename}")
+
     def save_csv(self, filename="brands.csv"):
-        pd.DataFrame(self.all_brands).to_csv(filename, index=False)
+        import pandas as pd
+        pd.DataFrame(list(self.all_brands)).to_csv(filename, index=False)
         print(f"Saved CSV to {filename}")
 
 
 # ---------------- MAIN ----------------
+# Run from the repository root as `python -m common.brands_fetcher` (the package uses relative imports)
 if __name__ == "__main__":
     fetcher = BrandFetcher(
         username = "",
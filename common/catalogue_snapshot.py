@@ -0,0 +1,178 @@
+import json
+import os
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .brand_hierarchy import MISSING, _id_array
+from .reference_cache import LocalDirectoryBackend
+
+# Columns of a snapshot; the source records may carry any subset of them
+SNAPSHOT_SCHEMA = pa.schema([
+    pa.field("id", pa.int64(), nullable=False),
+    pa.field("parent_id", pa.int64()),
+    pa.field("name", pa.string()),
+    pa.field("encrypted_id", pa.string()),
+])
+
+# JSON side column holding each record's fields outside SNAPSHOT_SCHEMA (null when it has none)
+EXTRA_COLUMN = "_extra"
+
+# Records rebuilt at a time when a snapshot is iterated
+ITER_BATCH_SIZE = 10000
+
+
+def catalogue_table(records):
+    """
+    Arrow table of brand / publisher records: the SNAPSHOT_SCHEMA columns plus
+    EXTRA_COLUMN, so fields the API adds later survive a round trip.
+    """
+    records = list(records)
+    present = list(dict.fromkeys(key for r in records for key in r))
+    arrays = []
+    for field in SNAPSHOT_SCHEMA:
+        values = [r.get(field.name) for r in records]
+        try:
+            arrays.append(pa.array(values, type=field.type))
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ValueError(f"Catalogue column {field.name} cannot be stored as {field.type}: {e}")
+    if arrays[0].null_count:
+        raise ValueError(f"{arrays[0].null_count} catalogue records have no id")
+    extra = []
+    for r in records:
+        fields = {key: value for key, value in r.items() if key not in SNAPSHOT_SCHEMA.names}
+        try:
+            extra.append(json.dumps(fields) if fields else None)
+        except TypeError as e:
+            raise ValueError(f"Catalogue record {r.get('id')} has a field that is not JSON: {e}")
+    arrays.append(pa.array(extra, type=pa.string()))
+    schema = SNAPSHOT_SCHEMA.append(pa.field(EXTRA_COLUMN, pa.string()))
+    return pa.Table.from_arrays(arrays, schema=schema.with_metadata({"fields": json.dumps(present)}))
+
+
+def snapshot_bytes(catalogue):
+    """Uncompressed Arrow IPC file of a catalogue (a list of records or a CatalogueSnapshot)."""
+    table = catalogue.table if isinstance(catalogue, CatalogueSnapshot) else catalogue_table(catalogue)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def write_snapshot(records, path):
+    """
+    Write records as an uncompressed Arrow IPC file (so it can be memory-mapped);
+    the file is replaced atomically.
+    """
+    LocalDirectoryBackend(os.path.dirname(os.path.abspath(path))).write(os.path.basename(path),
+                                                                        snapshot_bytes(records))
+    return path
+
+
+class CatalogueSnapshot:
+    """
+    A brand / publisher catalogue read from an Arrow IPC snapshot.
+
+    Opening memory-maps the file and parses nothing: columns are read straight
+    from the mapping, and lookups by id are one searchsorted over the sorted ids.
+
+    snapshot = CatalogueSnapshot.open("brands.arrow")
+    snapshot.names_of([123, 456])    # NumPy array of names (None for unknown ids)
+    snapshot.get(123)                # {"id": 123, "parent_id": ..., "name": ..., ...}
+
+    Iterating a snapshot yields the records as dicts, so it can stand in for the
+    API's list wherever a catalogue is only read. They are rebuilt on every pass,
+    ITER_BATCH_SIZE at a time, so no second copy of the catalogue is held.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        metadata = table.schema.metadata or {}
+        self.fields = (json.loads(metadata.get(b"fields", b"null"))
+                       or [name for name in table.column_names if name != EXTRA_COLUMN])
+        self.ids = table.column("id").to_numpy()
+        self._order = None
+        self._sorted_ids = None
+
+    @classmethod
+    def open(cls, path):
+        return cls(pa.ipc.open_file(pa.memory_map(path)).read_all())
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Snapshot over an in-memory IPC file (e.g. downloaded from a bucket). The
+        whole file is held in memory; use open() for a local file to memory-map it.
+        """
+        return cls(pa.ipc.open_file(pa.BufferReader(data)).read_all())
+
+    @classmethod
+    def from_records(cls, records):
+        return cls(catalogue_table(records))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        for batch in self.table.to_batches(max_chunksize=ITER_BATCH_SIZE):
+            yield from self._records(batch)
+
+    # ---------------- LOOKUP ----------------
+    def positions(self, ids):
+        """Row of each id (MISSING where the id is unknown or not an integer)."""
+        if self._sorted_ids is None:
+            # last row wins for duplicate ids, like return_lookup
+            order = np.argsort(self.ids, kind="stable")[::-1]
+            self._sorted_ids, first = np.unique(self.ids[order], return_index=True)
+            self._order = order[first]
+        ids, valid = _id_array(ids)
+        if not len(self._sorted_ids):
+            return np.full(len(ids), MISSING, dtype=np.int64)
+        pos = np.searchsorted(self._sorted_ids, ids)
+        pos = np.minimum(pos, len(self._sorted_ids) - 1)
+        found = valid & (self._sorted_ids[pos] == ids)
+        return np.where(found, self._order[pos], MISSING)
+
+    def _take(self, name, ids):
+        """Object array of one column at the rows of ids, gathered from the mapping (None for unknown ids)."""
+        pos = self.positions(ids)
+        values = np.empty(len(pos), dtype=object)
+        values[:] = pc.take(self.table.column(name), pa.array(pos, mask=pos == MISSING)).to_pylist()
+        return values
+
+    def names_of(self, ids):
+        """Name of each id (None for unknown ids)."""
+        return self._take("name", ids)
+
+    def parent_ids_of(self, ids):
+        """parent_id of each id (None for roots and unknown ids)."""
+        return self._take("parent_id", ids)
+
+    def get(self, record_id, default=None):
+        pos = self.positions([record_id])[0]
+        if pos == MISSING:
+            return default
+        return next(self._records(self.table.slice(int(pos), 1)))
+
+    # ---------------- RECORDS ----------------
+    def _records(self, rows):
+        """The records of a slice of the table (a RecordBatch or Table) as dicts."""
+        names = rows.schema.names
+        columns = {field: rows.column(names.index(field)).to_pylist()
+                   for field in self.fields if field in SNAPSHOT_SCHEMA.names}
+        extras = rows.column(names.index(EXTRA_COLUMN)).to_pylist() if EXTRA_COLUMN in names else None
+        for i in range(rows.num_rows):
+            extra = json.loads(extras[i]) if extras is not None and extras[i] is not None else {}
+            record = {}
+            for field in self.fields:
+                if field in columns:
+                    record[field] = columns[field][i]
+                elif field in extra:
+                    record[field] = extra[field]
+            yield record
+
+    def to_records(self):
+        """The catalogue as the API's list of dicts (the fields the source records had)."""
+        return list(self)
+
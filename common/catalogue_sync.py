@@ -0,0 +1,251 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from .reference_cache import LocalDirectoryBackend, ObjectStoreBackend
+
+# Records per probe page and number of probe pages spread over the catalogue
+DEFAULT_PROBE_SIZE = 100
+DEFAULT_PROBES = 8
+# Consecutive periods a catalogue may be carried over on probes alone before a full download
+DEFAULT_MAX_REUSE = 2
+
+
+def previous_period(period):
+    """'month_20250901' -> 'month_20250801'."""
+    prefix, _, date = period.rpartition("_")
+    day = datetime.strptime(date, "%Y%m%d")
+    year, month = (day.year - 1, 12) if day.month == 1 else (day.year, day.month - 1)
+    return f"{prefix}_{year:04d}{month:02d}01"
+
+
+def records_hash(records):
+    payload = json.dumps(records, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def diff_catalogues(old, new):
+    """
+    Changes between two versions of a catalogue, matched by id:
+    added / removed records, renamed (name changed), reparented (parent_id changed)
+    and changed (any other field). Renamed entries that are the parent of other
+    entries (brand owners) are flagged with "owner": True.
+    """
+    old_by_id = {r.get("id"): r for r in old}
+    new_by_id = {r.get("id"): r for r in new}
+    parents = {r.get("parent_id") for r in new if r.get("parent_id") is not None}
+    changes = {"added": [], "removed": [], "renamed": [], "reparented": [], "changed": []}
+
+    for record_id, record in new_by_id.items():
+        previous = old_by_id.get(record_id)
+        if previous is None:
+            changes["added"].append(record)
+            continue
+        if previous == record:
+            continue
+        if previous.get("name") != record.get("name"):
+            changes["renamed"].append({"id": record_id, "old": previous.get("name"), "new": record.get("name"),
+                                       "owner": record_id in parents})
+        if previous.get("parent_id") != record.get("parent_id"):
+            changes["reparented"].append({"id": record_id, "name": record.get("name"),
+                                          "old": previous.get("parent_id"), "new": record.get("parent_id")})
+        fields = sorted(k for k in set(previous) | set(record)
+                        if k not in ("name", "parent_id") and previous.get(k) != record.get(k))
+        if fields:
+            changes["changed"].append({"id": record_id, "fields": fields})
+    for record_id, record in old_by_id.items():
+        if record_id not in new_by_id:
+            changes["removed"].append(record)
+    return changes
+
+
+def summarize_changes(changes):
+    return ", ".join(f"{len(v)} {k}" for k, v in changes.items() if v) or "no changes"
+
+
+class CatalogueSync:
+    """
+    Versioned brand / publisher catalogues, one stored version per market, endpoint
+    and period, each with a changelog against the previous period.
+
+    By default every period downloads the full list and diffs it against the
+    previous one. With carry_over=True, a period is synced by probing instead
+    (the AdReal API has no change feed): the first page reports total_count, and
+    a few small pages spread over the list are compared with the same offsets of
+    the previous period's catalogue. If the count and every probed record match,
+    the previous catalogue is carried over without downloading it. A rename or
+    reparenting outside the probed records is missed until the next full download
+    (at least every max_reuse + 1 periods), so carry-over is opt-in.
+
+    Stored as "<market>/<endpoint>/<period>.json" (version, source, changelog and
+    records) on a LocalDirectoryBackend / ObjectStoreBackend.
+    """
+
+    def __init__(self, backend, probe_size=DEFAULT_PROBE_SIZE, probes=DEFAULT_PROBES, max_reuse=DEFAULT_MAX_REUSE,
+                 carry_over=False):
+        self.backend = backend
+        self.carry_over = carry_over
+        self.probe_size = probe_size
+        self.probes = probes
+        self.max_reuse = max_reuse
+
+    @staticmethod
+    def key(market, endpoint, period):
+        return f"{market}/{endpoint}/{period}.json"
+
+    # ---------------- STORAGE ----------------
+    def get(self, market, endpoint, period):
+        """The stored version of a period ({"version", "source", "changes", "records", ...}), or None."""
+        raw = self.backend.read(self.key(market, endpoint, period))
+        if raw is None:
+            return None
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            return None
+        if records_hash(entry.get("records", [])) != entry.get("sha256"):
+            print(f"Catalogue {market}/{endpoint}/{period} failed hash check, ignoring it.")
+            return None
+        return entry
+
+    def _put(self, market, endpoint, period, entry):
+        data = json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.backend.write(self.key(market, endpoint, period), data)
+
+    # ---------------- PROBE ----------------
+    def _probe_offsets(self, total_count):
+        """Offsets of the probe pages after the first one, spread evenly up to the end of the list."""
+        last = total_count - self.probe_size
+        if last <= 0 or self.probes <= 1:
+            return []
+        step = max(self.probe_size, last // (self.probes - 1))
+        return sorted(set(range(step, last, step)) | {last})
+
+    def _matches_previous(self, previous, first_page, fetch_page):
+        """True if total_count and every probed record equal the previous catalogue."""
+        records = previous["records"]
+        total_count = first_page.get("total_count", len(first_page.get("results", [])))
+        if total_count != len(records) or first_page.get("results", []) != records[:self.probe_size]:
+            return False
+        offsets = self._probe_offsets(total_count)
+        with ThreadPoolExecutor(max_workers=max(1, min(4, len(offsets)))) as executor:
+            pages = list(executor.map(lambda offset: fetch_page(offset, self.probe_size), offsets))
+        return all(page.get("results", []) == records[offset:offset + self.probe_size]
+                   for offset, page in zip(offsets, pages))
+
+    # ---------------- SYNC ----------------
+    def sync(self, market, endpoint, period, fetch_page, fetch_all):
+        """
+        This period's records for one catalogue endpoint.
+        fetch_page(offset, limit) returns one raw page ({"results", "total_count"}),
+        fetch_all(first_page) the full list, reusing first_page (the probed page at
+        offset 0, or None when nothing was probed).
+        """
+        stored = self.get(market, endpoint, period)
+        if stored is not None:
+            print(f"{endpoint} for {period}: version {stored['version']} already synced")
+            return stored["records"]
+
+        previous_key = previous_period(period)
+        previous = self.get(market, endpoint, previous_key)
+        reuse = self.carry_over and previous is not None and previous.get("reused", 0) < self.max_reuse
+        first_page = fetch_page(0, self.probe_size) if reuse else None
+        if reuse and self._matches_previous(previous, first_page, fetch_page):
+            entry = dict(previous, period=period, based_on=previous_key, source="probed",
+                         reused=previous.get("reused", 0) + 1, created_at=time.time(),
+                         changes=diff_catalogues([], []))
+            print(f"{endpoint} for {period}: unchanged on probes, carried over version {entry['version']} "
+                  f"from {previous_key} ({entry['count']} records)")
+            self._put(market, endpoint, period, entry)
+            return entry["records"]
+
+        records = fetch_all(first_page)
+        if previous is None:
+            version, changes = 1, None
+        else:
+            changes = diff_catalogues(previous["records"], records)
+            unchanged = not any(changes.values())
+            version = previous["version"] if unchanged else previous["version"] + 1
+            print(f"{endpoint} for {period} vs {previous_key}: {summarize_changes(changes)}")
+        entry = {
+            "market": market,
+            "endpoint": endpoint,
+            "period": period,
+            "version": version,
+            "based_on": previous_key if previous is not None else None,
+            "source": "fetched",
+            "reused": 0,
+            "created_at": time.time(),
+            "count": len(records),
+            "sha256": records_hash(records),
+            "changes": changes,
+            "records": records,
+        }
+        self._put(market, endpoint, period, entry)
+        return records
+
+    def changelog(self, market, endpoint, period):
+        """The stored changes of a period against the one before it (None if it was the first version)."""
+        entry = self.get(market, endpoint, period)
+        if entry is None:
+            raise ValueError(f"No synced {endpoint} catalogue for {market} {period}")
+        return entry["changes"]
+
+
+def catalogue_sync_from_env():
+    """
+    CatalogueSync configured for this process: ADREAL_CATALOGUE_BUCKET (GCS bucket
+    name) or ADREAL_CATALOGUE_DIR (local directory). Returns None when neither is set.
+    ADREAL_CATALOGUE_CARRY_OVER=1 enables carrying unchanged catalogues over on probes.
+    """
+    carry_over = os.environ.get("ADREAL_CATALOGUE_CARRY_OVER", "") in ("1", "true", "yes")
+
+    bucket_name = os.environ.get("ADREAL_CATALOGUE_BUCKET")
+    if bucket_name:
+        from google.cloud import storage
+        bucket = storage.Client().bucket(bucket_name)
+        return CatalogueSync(ObjectStoreBackend(bucket, prefix="adreal-catalogue"), carry_over=carry_over)
+
+    catalogue_dir = os.environ.get("ADREAL_CATALOGUE_DIR")
+    if catalogue_dir:
+        return CatalogueSync(LocalDirectoryBackend(catalogue_dir), carry_over=carry_over)
+    return None
+
+
+# ---------------- MAIN ----------------
+def main():
+    parser = argparse.ArgumentParser(description="Show what changed in a synced catalogue since the previous period.")
+    parser.add_argument("market", help="Market (e.g. ro)")
+    parser.add_argument("endpoint", choices=["brands", "publishers"])
+    parser.add_argument("period", help="AdReal period (e.g. month_20250901)")
+    args = parser.parse_args()
+
+    sync = catalogue_sync_from_env()
+    if sync is None:
+        raise RuntimeError("Set ADREAL_CATALOGUE_DIR or ADREAL_CATALOGUE_BUCKET")
+    entry = sync.get(args.market, args.endpoint, args.period)
+    if entry is None:
+        raise ValueError(f"No synced {args.endpoint} catalogue for {args.market} {args.period}")
+    print(f"{args.endpoint} {args.period}: version {entry['version']} ({entry['source']}, "
+          f"{entry['count']} records, based on {entry['based_on']})")
+    changes = entry["changes"]
+    if changes is None:
+        print("First synced version, nothing to compare with.")
+        return
+    print(summarize_changes(changes))
+    for change in changes["renamed"]:
+        print(f"  renamed{' owner' if change['owner'] else ''} {change['id']}: {change['old']!r} -> {change['new']!r}")
+    for change in changes["reparented"]:
+        print(f"  reparented {change['id']} {change['name']!r}: parent {change['old']} -> {change['new']}")
+    for record in changes["added"]:
+        print(f"  added {record.get('id')} {record.get('name')!r}")
+    for record in changes["removed"]:
+        print(f"  removed {record.get('id')} {record.get('name')!r}")
+
+
+if __name__ == "__main__":
+    main()
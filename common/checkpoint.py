@@ -0,0 +1,145 @@
+import hashlib
+import io
+import json
+import os
+import time
+
+from .reference_cache import LocalDirectoryBackend, ObjectStoreBackend
+
+# A rerun within this window resumes; older checkpoints are ignored and refetched
+DEFAULT_CHECKPOINT_TTL = 6 * 3600
+
+
+class RunCheckpoint:
+    """
+    Stage outputs of a pipeline run, stored under <period>/ on a cache backend
+    (LocalDirectoryBackend or ObjectStoreBackend):
+
+        reference/<market>/brands.arrow, publishers.arrow reference data (Arrow snapshots)
+        clients/<name>/stats/shard-<hash>.json             one sharded /stats/ fetch
+        clients/<name>/frame/part-NNNNN.parquet, _done     merged + cleaned batches
+        clients/<name>/load/_done                          BigQuery load finished
+
+    Every object starts with a one-line JSON header (created_at, ...); objects
+    older than ttl_seconds are treated as missing, so a rerun within the window
+    resumes from the last completed stage and a later run starts fresh.
+    """
+
+    def __init__(self, backend, period, ttl_seconds=DEFAULT_CHECKPOINT_TTL, prefix=""):
+        self.backend = backend
+        self.period = period
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def client(self, name):
+        """Checkpoint scoped to one client of this run."""
+        return RunCheckpoint(self.backend, self.period, self.ttl_seconds, prefix=f"{self.prefix}clients/{name}/")
+
+    def _key(self, name):
+        return f"{self.period}/{self.prefix}{name}"
+
+    # ---------------- RAW OBJECTS ----------------
+    def _read(self, name):
+        raw = self.backend.read(self._key(name))
+        if raw is None:
+            return None, None
+        header_line, _, payload = raw.partition(b"\n")
+        try:
+            header = json.loads(header_line)
+        except ValueError:
+            return None, None
+        if self.ttl_seconds is not None and time.time() - header.get("created_at", 0) > self.ttl_seconds:
+            return None, None
+        return header, payload
+
+    def _write(self, name, payload, **info):
+        header = dict(info, created_at=time.time())
+        self.backend.write(self._key(name), json.dumps(header).encode("utf-8") + b"\n" + payload)
+
+    # ---------------- JSON STAGES ----------------
+    def get_json(self, name):
+        header, payload = self._read(f"{name}.json")
+        return None if header is None else json.loads(payload)
+
+    def put_json(self, name, data):
+        payload = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self._write(f"{name}.json", payload)
+
+    # ---------------- SNAPSHOT STAGES ----------------
+    def get_snapshot(self, name):
+        """A saved catalogue as a CatalogueSnapshot, or None if it is missing / stale."""
+        header, payload = self._read(f"{name}.arrow")
+        if header is None:
+            return None
+        from .catalogue_snapshot import CatalogueSnapshot
+        return CatalogueSnapshot.from_bytes(payload)
+
+    def put_snapshot(self, name, catalogue):
+        from .catalogue_snapshot import snapshot_bytes
+        self._write(f"{name}.arrow", snapshot_bytes(catalogue), count=len(catalogue))
+
+    # ---------------- MARKERS ----------------
+    def done(self, stage):
+        header, _ = self._read(f"{stage}/_done")
+        return header
+
+    def mark_done(self, stage, **info):
+        self._write(f"{stage}/_done", b"", **info)
+
+    # ---------------- FRAME STAGES ----------------
+    def save_frames(self, stage, frames):
+        """
+        Pass DataFrame batches through, writing each one as a Parquet part;
+        the stage is marked done only once the input is exhausted.
+        """
+        parts = 0
+        rows = 0
+        for df in frames:
+            buf = io.BytesIO()
+            df.to_parquet(buf, index=False)
+            self._write(f"{stage}/part-{parts:05d}.parquet", buf.getvalue())
+            parts += 1
+            rows += len(df)
+            yield df
+        self.mark_done(stage, parts=parts, rows=rows)
+
+    def load_frames(self, stage):
+        """The saved batches of a completed stage, or None if it is missing / incomplete / stale."""
+        header = self.done(stage)
+        if header is None:
+            return None
+        import pandas as pd
+        frames = []
+        for part in range(header["parts"]):
+            part_header, payload = self._read(f"{stage}/part-{part:05d}.parquet")
+            if part_header is None:
+                return None
+            frames.append(pd.read_parquet(io.BytesIO(payload)))
+        return frames
+
+
+def shard_key(shard):
+    """Stable checkpoint name for one /stats/ shard (its brand ids / industries)."""
+    digest = hashlib.sha1(json.dumps(shard, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    return f"stats/shard-{digest}"
+
+
+def checkpoint_from_env(period):
+    """
+    Build the run checkpoint configured for this process:
+    ADREAL_CHECKPOINT_BUCKET (GCS bucket name) or ADREAL_CHECKPOINT_DIR (local directory).
+    Returns None when neither is set.
+    """
+    ttl = os.environ.get("ADREAL_CHECKPOINT_TTL")
+    ttl_seconds = int(ttl) if ttl else DEFAULT_CHECKPOINT_TTL
+
+    bucket_name = os.environ.get("ADREAL_CHECKPOINT_BUCKET")
+    if bucket_name:
+        from google.cloud import storage
+        bucket = storage.Client().bucket(bucket_name)
+        return RunCheckpoint(ObjectStoreBackend(bucket, prefix="adreal-runs"), period, ttl_seconds=ttl_seconds)
+
+    checkpoint_dir = os.environ.get("ADREAL_CHECKPOINT_DIR")
+    if checkpoint_dir:
+        return RunCheckpoint(LocalDirectoryBackend(checkpoint_dir), period, ttl_seconds=ttl_seconds)
+    return None
@@ -0,0 +1,71 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# (content type, website substrings) in priority order: the first matching rule wins
+DEFAULT_RULES = (
+    ("Search", ("google.", "bing.")),
+    ("Social", ("facebook", "instagram", "tiktok", "youtube")),
+)
+
+
+class ContentTypeClassifier:
+    """
+    Website name -> content type from a rule table of substrings.
+
+    Each rule is compiled into one regex and every distinct website is
+    classified once (memoized), so a column of websites costs one pass over
+    its distinct values plus an array take, not a scan per row.
+    """
+
+    def __init__(self, rules=DEFAULT_RULES, default="Standard", unknown="Unknown"):
+        if isinstance(rules, dict):
+            rules = list(rules.items())
+        self.rules = [(label, tuple(s.lower() for s in substrings)) for label, substrings in rules]
+        for label, substrings in self.rules:
+            if not substrings:
+                raise ValueError(f"Content type rule {label!r} has no substrings")
+        self._patterns = [(label, re.compile("|".join(map(re.escape, substrings))))
+                          for label, substrings in self.rules]
+        self.default = default
+        self.unknown = unknown
+        self._memo = {}
+
+    def classify(self, website):
+        """Content type of one website name."""
+        if not isinstance(website, str) or not website:
+            return self.unknown
+        content_type = self._memo.get(website)
+        if content_type is None:
+            content_type = self._match(website.lower())
+            self._memo[website] = content_type
+        return content_type
+
+    def _match(self, lowered):
+        for label, pattern in self._patterns:
+            if pattern.search(lowered):
+                return label
+        return self.default
+
+    def classify_many(self, websites):
+        """
+        Content types for a column of websites, as a Categorical aligned with it.
+        A categorical column is classified straight from its categories and codes.
+        """
+        if isinstance(getattr(websites, "dtype", None), pd.CategoricalDtype):
+            codes = np.asarray(websites.cat.codes if hasattr(websites, "cat") else websites.codes)
+            uniques = list(websites.dtype.categories) + [None]  # code -1 (missing) picks the trailing None
+        else:
+            codes, uniques = pd.factorize(np.asarray(websites, dtype=object), use_na_sentinel=False)
+        labels = [self.classify(website) for website in uniques]
+        label_codes, categories = pd.factorize(np.asarray(labels, dtype=object))
+        return pd.Categorical.from_codes(label_codes[codes], categories=categories)
+
+
+DEFAULT_CLASSIFIER = ContentTypeClassifier()
+
+
+def classifier_from_rules(rules=None):
+    """Classifier for a registry rule table ({"Search": [...], "Social": [...]}); None gives the default."""
+    return DEFAULT_CLASSIFIER if not rules else ContentTypeClassifier(rules)
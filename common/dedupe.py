@@ -0,0 +1,83 @@
+import json
+from collections import Counter
+
+
+def segment_key(segment, fields=None):
+    """
+    The segment part of a business key: every field of the segment as (field, value)
+    pairs, so any dimension requested through `segments=` (device, publisher, ...)
+    keeps its rows apart; only the given fields when `fields` is set.
+    """
+    if fields is None:
+        return tuple(sorted(segment.items()))
+    return tuple((field, segment.get(field)) for field in fields)
+
+
+def business_key(segment, stat, fields=None):
+    """(period, segment fields...) of one stat."""
+    return (stat.get("period"),) + segment_key(segment, fields)
+
+
+def _hashable_key(key):
+    try:
+        hash(key)
+    except TypeError:
+        # unhashable segment values (dict-shaped products) - use a canonical dump
+        return json.dumps(key, sort_keys=True, default=str)
+    return key
+
+
+class StatsDeduplicator:
+    """
+    Drops repeated stats by business key (the stat's period plus every segment
+    field of the result, or only `fields`) as the /stats/ entries stream in,
+    before they are merged into rows: the first stat for a key is kept, later
+    ones are discarded (overlapping shards / pages return the same segments).
+
+    Every kept key is remembered in full, so two different keys are never
+    mistaken for each other (a hash alone could collide); `dropped` counts the
+    discarded stats per key.
+    """
+
+    def __init__(self, fields=None):
+        self.fields = None if fields is None else tuple(fields)
+        self.kept = 0
+        self.dropped = Counter()
+        self._seen = set()
+
+    def filter_entries(self, entries):
+        """The entries with already-seen stats removed (entries left without stats are dropped)."""
+        unique = []
+        for entry in entries:
+            segment = segment_key(entry.get("segment", {}), self.fields)
+            stats = entry.get("stats", [])
+            kept = []
+            for stat in stats:
+                key = (stat.get("period"),) + segment
+                seen_key = _hashable_key(key)
+                if seen_key in self._seen:
+                    self.dropped[json.dumps(key, default=str)] += 1
+                    continue
+                self._seen.add(seen_key)
+                kept.append(stat)
+            self.kept += len(kept)
+            if len(kept) == len(stats):
+                unique.append(entry)
+            elif kept:
+                unique.append(dict(entry, stats=kept))
+        return unique
+
+    @property
+    def dropped_total(self):
+        return sum(self.dropped.values())
+
+    def report(self, label="", top=5):
+        """Print how many stats were dropped, and for which keys most often."""
+        prefix = f"[{label}] " if label else ""
+        if not self.dropped:
+            print(f"{prefix}Dedupe: {self.kept} stats, no duplicates")
+            return
+        print(f"{prefix}Dedupe: kept {self.kept} stats, dropped {self.dropped_total} duplicates "
+              f"across {len(self.dropped)} keys")
+        for key, count in self.dropped.most_common(top):
+            print(f"{prefix}  {count} x {key}")
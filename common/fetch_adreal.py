@@ -1,16 +1,25 @@
-import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from .adreal_session import AdRealSession
+from .checkpoint import shard_key
+from .retry import RETRY_EXCEPTIONS
+from .stats_stream import iter_stats_results
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import json
-import pandas as pd
 import time
 from urllib.parse import urlencode
 
+# Rows per /stats/ request; large enough to keep request count low, small enough to retry cheaply
+DEFAULT_PAGE_SIZE = 50000
+
 class AdRealFetcher:
     def __init__(self, username, password, market="ro",
                  period_range="20250801,20250831,month",
-                 brand_ids="", limit=10000, max_threads=5, target_metric="ad_cont,ru"):
-        self.BASE_URL = "https://adreal.gemius.com/api"
-        self.LOGIN_URL = f"{self.BASE_URL}/login/?next=/api/"
+                 brand_ids="", limit=10000, max_threads=5, target_metric="ad_cont,ru",
+                 session=None):
+        # One session (and one login) can be shared across all fetchers
+        self.session = session or AdRealSession(username, password, market)
+        self.BASE_URL = self.session.base_url
+        self.LOGIN_URL = self.session.login_url
         self.username = username
         self.password = password
         self.market = market
@@ -20,7 +29,6 @@ class AdRealFetcher:
         self.max_threads = max_threads
         self.target_metric = target_metric
 
-        self.session = requests.Session()
         self.platform_id = None
         self.all_results = []
 
@@ -40,20 +48,9 @@ class AdRealFetcher:
 
     # ---------------- LOGIN ----------------
     def login(self):
+        """Log in through the shared session (no-op if it is already authenticated)."""
         print('\nStarted getting Ad_conts metric.')
-        login_page = self.session.get(self.LOGIN_URL)
-        csrftoken = self.session.cookies.get("csrftoken")
-        payload = {
-            "username": self.username,
-            "password": self.password,
-            "csrfmiddlewaretoken": csrftoken
-        }
-        headers = {"Referer": f"{self.BASE_URL}/{self.market}/stats/", "X-CSRFToken": csrftoken}
-        resp = self.session.post(self.LOGIN_URL, data=payload, headers=headers)
-        resp.raise_for_status()
-        if "invalid" in resp.text.lower():
-            raise Exception("Login failed")
-        print("Login successful!")
+        self.session.login()
 
     # ---------------- FETCH OPTIONS ----------------
     def fetch_options(self, endpoint):
@@ -83,7 +80,7 @@ class AdRealFetcher:
 
     # ---------------- FETCH STATS (original multi-segment) ----------------
     def fetch_multi_segments(self):
-        params_base = {
+        params = {
             "metrics": self.target_metric,
             "platforms": self.platform_id,
             "periods_range": self.period_range,
@@ -91,71 +88,188 @@ class AdRealFetcher:
             "brands": self.brand_ids,
             "segments": self.combined_segments
         }
-
-        params = params_base.copy()
-        params["offset"] = 0
-
-        resp = self.session.get(f"{self.BASE_URL}/{self.market}/stats/", params=params, timeout=120)
-        resp.raise_for_status()
-        data = resp.json()
-        results = data.get("results", [])
-        total_count = data.get("total_count", len(results))
-        print(f"Multi-segment request: total_count={total_count}")
-
-        if total_count <= self.limit:
-            self.all_results = results
-            return
-
-        offsets = range(self.limit, total_count, self.limit)
-
-        def fetch_page(offset):
-            p = params.copy()
-            p["offset"] = offset
-            r = self.session.get(f"{self.BASE_URL}/{self.market}/stats/", params=p, timeout=120)
-            r.raise_for_status()
-            return r.json().get("results", [])
-
-        with ThreadPoolExecutor(max_workers=self.max_threads) as executor:
-            futures = [executor.submit(fetch_page, o) for o in offsets]
-            for future in as_completed(futures):
-                results.extend(future.result())
-
-        self.all_results = results
+        self.all_results = list(self.iter_stats_pages(params, page_size=self.limit))
 
     # ---------------- FETCH STATS (support-style simple brand) ----------------
     def fetch_data(self, brand_ids, platforms="pc", page_types="search,social,standard",
-                           metrics=None, segments="brand", limit=1000000):
+                           metrics=None, segments="brand", limit=DEFAULT_PAGE_SIZE, industries=None, stream=False):
         """
         Mimics the support code URL:
         /stats/?limit=1000000&brands=<ids>&format=json&metrics=ru,ad_cont,reach
                   &periods_range=<periods_range>&platforms=pc&page_types=search,social,standard&segments=brand
-        """
-        if isinstance(brand_ids, (list, tuple)):
-            brands_param = ",".join(map(str, brand_ids))
-        else:
-            brands_param = str(brand_ids)
 
+        `limit` is the page size: results beyond it are fetched as further
+        offset pages (see iter_stats_pages) instead of being truncated.
+
+        With stream=True, returns a generator that parses result items off the
+        socket one at a time instead of loading the whole response with r.json().
+        """
         if metrics is None:
             metrics = "ru,ad_cont,reach"
 
         params = {
             "limit": limit,
-            "brands": brands_param,
             "format": "json",
             "metrics": metrics,
             "periods_range": self.period_range,
             "platforms": platforms,
             "page_types": page_types,
-            "segments": segments
+            "segments": segments,
         }
 
+        # Only send brands param if you actually want to filter by brands
+        if brand_ids:
+            if isinstance(brand_ids, (list, tuple)):
+                params["brands"] = ",".join(map(str, brand_ids))
+            else:
+                params["brands"] = str(brand_ids)
+
+        # Add industries if provided
+        if industries:
+            params["industries"] = industries
+
         print("GET --->", f"{self.BASE_URL}/{self.market}/stats/?{urlencode(params)}")
-        r = self.session.get(f"{self.BASE_URL}/{self.market}/stats/", params=params, timeout=120)
+        if stream:
+            return self.iter_stats_pages(params, stream=True)
+        return list(self.iter_stats_pages(params))
+
+    # ---------------- FETCH STATS (sharded) ----------------
+    def fetch_data_sharded(self, brand_ids, shard_size=5, industries=None, max_workers=None, checkpoint=None,
+                           **kwargs):
+        """
+        Split the brand ids (or, with no brand ids, the industries) into groups of
+        shard_size and run one fetch_data per group concurrently, so the run waits
+        on the slowest shard rather than one giant query.
+
+        Results keep shard order; items whose segment appears in more than one
+        shard (shared segment-summary rows) are kept once.
+
+        With a RunCheckpoint, each finished shard is saved and a rerun only
+        fetches the shards that are missing.
+        """
+        if isinstance(brand_ids, str):
+            brand_ids = [b for b in brand_ids.split(",") if b]
+        brand_ids = list(brand_ids or [])
+        if isinstance(industries, (list, tuple)):
+            industries = ",".join(map(str, industries))
+
+        if brand_ids:
+            shards = [dict(brand_ids=brand_ids[i:i + shard_size], industries=industries)
+                      for i in range(0, len(brand_ids), shard_size)]
+        elif industries:
+            industry_ids = [i for i in str(industries).split(",") if i]
+            shards = [dict(brand_ids=[], industries=",".join(industry_ids[i:i + shard_size]))
+                      for i in range(0, len(industry_ids), shard_size)]
+        else:
+            shards = [dict(brand_ids=[], industries=None)]
+
+        kwargs.pop("stream", None)
+        print(f"Fetching stats in {len(shards)} shard(s) of up to {shard_size}")
+        def fetch_shard(shard):
+            if checkpoint is None:
+                return self.fetch_data(shard["brand_ids"], industries=shard["industries"], **kwargs)
+            key = shard_key(dict(shard, period_range=self.period_range, **kwargs))
+            results = checkpoint.get_json(key)
+            if results is None:
+                results = self.fetch_data(shard["brand_ids"], industries=shard["industries"], **kwargs)
+                checkpoint.put_json(key, results)
+            else:
+                print(f"Shard {shard['brand_ids'] or shard['industries']}: resumed {len(results)} items from checkpoint")
+            return results
+
+        with ThreadPoolExecutor(max_workers=max_workers or self.max_threads) as executor:
+            futures = [executor.submit(fetch_shard, shard) for shard in shards]
+            shard_results = [future.result() for future in futures]
+
+        results = []
+        seen_segments = set()
+        for shard in shard_results:
+            for item in shard:
+                key = json.dumps(item.get("segment", {}), sort_keys=True, default=str)
+                if key in seen_segments:
+                    continue
+                seen_segments.add(key)
+                results.append(item)
+        print(f"Sharded stats: {sum(len(r) for r in shard_results)} items from shards, {len(results)} after de-duplication")
+        return results
+
+    # ---------------- PAGINATION ----------------
+    def iter_stats_pages(self, params, page_size=None, stream=False):
+        """
+        Yield every /stats/ result item for `params`, one offset page at a time.
+
+        The first page gives total_count; the remaining offsets are fetched
+        concurrently (at most max_threads pages in flight) and yielded in offset
+        order. If the server caps pages below page_size, its page size is used
+        as the step. Raises RuntimeError if the item count does not match total_count.
+
+        Pages are retried by the session's RetryPolicy; a streamed first page that
+        breaks off mid-body is fetched again and resumed after the items already yielded.
+        """
+        page_size = page_size or params.get("limit") or DEFAULT_PAGE_SIZE
+        params = dict(params, limit=page_size)
+
+        meta = {}
+        if stream:
+            first_page = self._stream_stats(dict(params, offset=0), meta=meta)
+        else:
+            first_page, meta["total_count"] = self._fetch_stats_page(params, 0)
+
+        returned = 0
+        try:
+            for item in first_page:
+                returned += 1
+                yield item
+        except RETRY_EXCEPTIONS as e:
+            if not stream:
+                raise
+            # The connection broke mid-body: refetch the page and skip what was already yielded
+            print(f"Streamed stats page broke off after {returned} items ({type(e).__name__}), refetching it.")
+            results, meta["total_count"] = self._fetch_stats_page(params, 0)
+            for item in results[returned:]:
+                returned += 1
+                yield item
+
+        total_count = meta.get("total_count")
+        if total_count is None:
+            # No total_count: the server is not paginating, the first page is everything
+            total_count = returned
+        step = returned if 0 < returned < page_size else page_size
+        offsets = iter(range(step, total_count, step))
+        pages = 1
+
+        with ThreadPoolExecutor(max_workers=self.max_threads) as executor:
+            pending = deque(executor.submit(self._fetch_stats_page, params, o)
+                            for _, o in zip(range(self.max_threads), offsets))
+            while pending:
+                results, _ = pending.popleft().result()
+                offset = next(offsets, None)
+                if offset is not None:
+                    pending.append(executor.submit(self._fetch_stats_page, params, offset))
+                pages += 1
+                for item in results:
+                    returned += 1
+                    yield item
+
+        print(f"Stats: total_count={total_count}, pages={pages}, returned={returned}")
+        if returned != total_count:
+            raise RuntimeError(f"Stats pagination returned {returned} items but the server reported total_count={total_count}")
+
+    def _fetch_stats_page(self, params, offset):
+        """One offset page as (results, total_count)."""
+        r = self.session.get(f"{self.BASE_URL}/{self.market}/stats/", params=dict(params, offset=offset), timeout=120)
         r.raise_for_status()
         j = r.json()
         results = j.get("results", [])
-        print(f"Support-style stats: total_count={j.get('total_count', len(results))}, returned={len(results)}")
-        return results
+        return results, j.get("total_count")
+
+    def _stream_stats(self, params, meta=None, chunk_size=64 * 1024):
+        r = self.session.get(f"{self.BASE_URL}/{self.market}/stats/", params=params, timeout=120, stream=True)
+        try:
+            r.raise_for_status()
+            yield from iter_stats_results(r.iter_content(chunk_size=chunk_size), meta=meta)
+        finally:
+            r.close()
 
     # ---------------- SAVE ----------------
     def save_json(self, filename, data=None):
@@ -193,12 +307,14 @@ class AdRealFetcher:
                     row_copy[f"{k}_uncertainty"] = v
                 all_rows.append(row_copy)
 
+        import pandas as pd
         df = pd.DataFrame(all_rows)
         df.to_excel(filename, index=False)
         print(f"Saved {len(df)} rows to {filename}")
         return df
 
 # ---------------- MAIN DEMO ----------------
+# Run from the repository root as `python -m common.fetch_adreal` (the package uses relative imports)
 if __name__ == "__main__":
     start_time = time.time()
 
@@ -217,7 +333,7 @@ if __name__ == "__main__":
     brand_to_test = 13549
     support_results = fetcher.fetch_data([brand_to_test], platforms="pc",
                                                  page_types="search,social,standard",
-                                                 segments="brand,product,content_type,website", limit=1000000)
+                                                 segments="brand,product,content_type,website")
     #fetcher.save_json("support_results.json", support_results)
     #fetcher.flatten_to_excel("support_results.xlsx", results=support_results, filter_period=True)
 
@@ -1,7 +1,19 @@
-from brands_fetcher import BrandFetcher
-from websites_fetcher import PublisherFetcher
-from fetch_adreal import AdRealFetcher
+from .adreal_session import AdRealSession
+from .brand_hierarchy import MISSING, BrandHierarchy, load_brand_hierarchy
+from .content_type import DEFAULT_CLASSIFIER, classifier_from_rules
+from .dedupe import StatsDeduplicator
+from .brands_fetcher import BrandFetcher
+from .websites_fetcher import PublisherFetcher
+from .fetch_adreal import AdRealFetcher
+from .catalogue_snapshot import CatalogueSnapshot
+from .catalogue_sync import catalogue_sync_from_env
+from .reference_cache import reference_cache_from_env
+from .registry import OWNER_RESOLUTION
+import numpy as np
 import pandas as pd
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 def return_lookup(data):
@@ -28,60 +40,385 @@ def get_brand_owner(brand_id, brands_lookup):
     return parent_info["name"]
 
 
-def merge_data(stats_data, brands_data, websites_data):
-    """Merge stats + brand + websites lookups, filling Brand owner properly."""
+def get_owner_from_id(node_id, brands_lookup):
+    """
+    Climb parents from a given node_id until a root is found; return that root's name.
+    """
+    current_id = node_id
+    owner_name = None
+    while current_id:
+        info = brands_lookup.get(current_id)
+        if not info:
+            return owner_name
+        owner_name = info.get("name")
+        parent_id = info.get("parent_id")
+        if not parent_id:
+            return owner_name
+        current_id = parent_id
+    return owner_name
+
+
+def is_top_level_other(node_id, brands_lookup):
+    info = brands_lookup.get(node_id)
+    if not info:
+        return False
+    return (info.get("parent_id") is None) and (str(info.get("name", "")).strip().lower() == "other")
+
+
+def get_product_id(product_raw):
+    """The API sends product either as an id or as a dict with 'id' / 'value'."""
+    if isinstance(product_raw, dict):
+        return product_raw.get("id") or product_raw.get("value")
+    return product_raw
+
+
+def normalize_owner(brand_id, product_raw, brands_lookup):
+    """
+    1) Try brand lineage (as today).
+    2) If owner is 'Other' (top-level) or missing, try product lineage.
+    3) Return the best owner string.
+    """
+    owner = get_owner_from_id(brand_id, brands_lookup) if brand_id else None
+
+    # If owner is 'Other' at top-level (API bucket) or missing, try product lineage
+    if (owner is None) or (owner.strip().lower() == "other" and is_top_level_other(brand_id, brands_lookup)):
+        product_id = get_product_id(product_raw) if product_raw is not None else None
+        if product_id:
+            product_owner = get_owner_from_id(product_id, brands_lookup)
+            if product_owner:
+                return product_owner
+
+    return owner
+
+
+def resolve_owner(segment, brands_lookup, owner_resolution="parent"):
+    """
+    Brand owner name for one stats segment.
+
+    parent:    one level up from the brand (the original behaviour)
+    root:      walk up to the top of the hierarchy
+    normalize: prefer the API's brand_owner segment, else walk up from the brand
+               and fall back to the product lineage for top-level 'Other' buckets
+    """
+    brand_id = segment.get("brand")
+    if owner_resolution == "parent":
+        return get_brand_owner(brand_id, brands_lookup)
+    if owner_resolution == "root":
+        return get_owner_from_id(brand_id, brands_lookup)
+    if owner_resolution == "normalize":
+        owner_id = segment.get("brand_owner")
+        if owner_id in brands_lookup:
+            return brands_lookup[owner_id].get("name")
+        return normalize_owner(brand_id, segment.get("product"), brands_lookup)
+    raise ValueError(f"Unknown owner_resolution: {owner_resolution!r}")
+
+
+def resolve_product_name(product_raw, brands_lookup, product_fallback="id"):
+    """
+    Product name for a segment value (id or dict with label/name).
+    product_fallback="id" keeps the raw id when it is not in the lookup, "null" returns None.
+    """
+    if product_raw is None:
+        return None
+    if isinstance(product_raw, dict):
+        return product_raw.get("label", product_raw.get("name"))
+    product_info = brands_lookup.get(product_raw)
+    if product_info:
+        return product_info.get("name")
+    return product_raw if product_fallback == "id" else None
+
+
+def add_other_children(brands, start_id=10000000):
+    """
+    For each ROOT brand (parent_id is None), add a single child named 'Other'
+    IFF such a child doesn't already exist. IDs start at start_id and avoid collisions.
+    """
+    # Existing IDs (avoid collisions)
+    existing_ids = [b.get("id") for b in brands if "id" in b]
+    max_existing = max(existing_ids) if existing_ids else 0
+    next_id = max(start_id, max_existing + 1)
+
+    roots_with_other = {
+        b.get("parent_id") for b in brands
+        if b.get("parent_id") is not None and (b.get("name") or "").strip().lower() == "other"
+    }
+
+    new_entries = []
+    for root in sorted((b for b in brands if b.get("parent_id") is None), key=lambda x: x.get("id", 0)):
+        if root["id"] in roots_with_other:
+            continue
+        new_entries.append({
+            "id": next_id,
+            "encrypted_id": None,
+            "parent_id": root["id"],
+            "name": "Other",
+        })
+        next_id += 1
+
+    return brands + new_entries
+
+
+# Stats entries whose owners are resolved together in one BrandHierarchy gather
+MERGE_CHUNK_SIZE = 10000
+
+
+def _resolve_owners(segments, hierarchy, owner_resolution):
+    """Owner names for a chunk of segments (see BrandHierarchy.owner_names)."""
+    brand_ids = [segment.get("brand") for segment in segments]
+    if owner_resolution != "normalize":
+        return hierarchy.owner_names(brand_ids, owner_resolution)
+    product_ids = [get_product_id(segment.get("product")) for segment in segments]
+    owner_ids = [segment.get("brand_owner") for segment in segments]
+    return hierarchy.owner_names(brand_ids, owner_resolution, product_ids=product_ids, owner_ids=owner_ids)
+
+
+def iter_merged_rows(stats_data, brands_data, websites_data, owner_resolution="parent", product_fallback="id",
+                     hierarchy=None, classifier=None):
+    """
+    Yield one merged row dict per stat, consuming stats_data lazily (list or stream).
+    Owners are resolved MERGE_CHUNK_SIZE entries at a time through `hierarchy`
+    (a BrandHierarchy, built from brands_data when not given).
+    """
+    if owner_resolution not in OWNER_RESOLUTION:
+        raise ValueError(f"Unknown owner_resolution: {owner_resolution!r}")
     brands_lookup = return_lookup(brands_data)
     websites_lookup = return_lookup(websites_data)
+    if hierarchy is None:
+        hierarchy = BrandHierarchy(brands_data)
+    classifier = classifier or DEFAULT_CLASSIFIER
+
+    for entries in iter_row_batches(stats_data, MERGE_CHUNK_SIZE):
+        segments = [entry.get("segment", {}) for entry in entries]
+        owners = _resolve_owners(segments, hierarchy, owner_resolution)
+        for entry, segment, brand_owner_name in zip(entries, segments, owners):
+            yield from _merge_entry(entry, segment, brand_owner_name, brands_lookup, websites_lookup,
+                                    product_fallback, classifier)
+
+
+def _merge_entry(entry, segment, brand_owner_name, brands_lookup, websites_lookup, product_fallback, classifier):
+    """Merged row dicts (one per stat) for a single stats entry."""
+    stats_list = entry.get("stats", [])
+
+    brand_id = segment.get("brand")
+    brand_info = brands_lookup.get(brand_id, {})
+    brand_name = brand_info.get("name", brand_id)
+
+    product_name = resolve_product_name(segment.get("product"), brands_lookup, product_fallback)
+    website_name = websites_lookup.get(segment.get("website"), {}).get("name", segment.get("website"))
+
+    # Use API-provided content_type if available
+    content_type = segment.get("content_type")
+    if not content_type or content_type == "None":
+        content_type = classifier.classify(website_name)
+
+    for stat in stats_list:
+        row = {
+            "period": stat.get("period"),
+            "brand_owner_name": brand_owner_name,
+            "brand_name": brand_name,
+            "product": product_name,
+            "website_name": website_name,
+            "platform": segment.get("platform", None),
+            "content_type": content_type,
+        }
+        # add values
+        for k, v in stat.get("values", {}).items():
+            row[k] = v
+        # add uncertainty
+        for k, v in stat.get("uncertainty", {}).items():
+            row[f"{k}_uncertainty"] = v
+        yield row
+
+
+def merge_data(stats_data, brands_data, websites_data, owner_resolution="parent", product_fallback="id",
+               hierarchy=None):
+    """Merge stats + brand + websites lookups, filling Brand owner properly."""
+    return list(iter_merged_rows(stats_data, brands_data, websites_data, owner_resolution=owner_resolution,
+                                 product_fallback=product_fallback, hierarchy=hierarchy))
 
-    all_rows = []
-    for entry in stats_data:
-        segment = entry.get("segment", {})
-        stats_list = entry.get("stats", [])
-
-        brand_id = segment.get("brand")
-        brand_info = brands_lookup.get(brand_id, {})
-        brand_name = brand_info.get("name", brand_id)
-        brand_owner_name = get_brand_owner(brand_id, brands_lookup)
-
-        product_name = brands_lookup.get(segment.get("product"), {}).get("name", segment.get("product"))
-        website_name = websites_lookup.get(segment.get("website"), {}).get("name", segment.get("website"))
-
-        # Use API-provided content_type if available
-        content_type = segment.get("content_type")
-        if not content_type or content_type == "None":
-            content_type = decide_content_type(website_name)
-
-        for stat in stats_list:
-            row = {
-                "period": stat.get("period"),
-                "brand_owner_name": brand_owner_name,
-                "brand_name": brand_name,
-                "product": product_name,
-                "website_name": website_name,
-                "platform": segment.get("platform", None),
-                "content_type": content_type,
-            }
-            # add values
-            for k, v in stat.get("values", {}).items():
-                row[k] = v
-            # add uncertainty
-            for k, v in stat.get("uncertainty", {}).items():
-                row[f"{k}_uncertainty"] = v
-            all_rows.append(row)
-
-    return all_rows
+
+# ---------------- COLUMNAR MERGE ----------------
+def _object_array(values):
+    """1-D object array (np.array would try to broadcast lists / dicts)."""
+    arr = np.empty(len(values), dtype=object)
+    arr[:] = values
+    return arr
+
+
+def _lookup_names(values, records):
+    """
+    Map raw segment ids to catalogue names with one indexed join over the distinct
+    ids; ids not in the catalogue keep their raw value (like lookup.get(id, {}).get("name", id)).
+    """
+    values = _object_array(values)
+    if not len(values):
+        return values
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    uniques = _object_array(list(uniques))
+    if isinstance(records, CatalogueSnapshot):
+        # only the distinct ids are gathered from the snapshot; nothing is built per record
+        # (a record stored without a name resolves to None here, not to its id)
+        hits = records.positions(uniques)
+        names = records.names_of(uniques) if "name" in records.fields else uniques
+        return np.where(hits != MISSING, names, uniques)[codes]
+
+    table = {}
+    for record in records:
+        table[record["id"]] = record
+    index = pd.Index(list(table), dtype=object)
+    names = _object_array([record.get("name", record_id) for record_id, record in table.items()] + [None])
+    hits = index.get_indexer(uniques) if len(index) else np.full(len(uniques), MISSING)
+    resolved = np.where(hits != MISSING, names[hits], uniques)
+    return resolved[codes]
+
+
+def _product_names(products_raw, hierarchy, product_fallback):
+    """resolve_product_name over a whole column (dict-shaped products are rare and handled inline)."""
+    products = _object_array(products_raw)
+    is_dict = np.fromiter((isinstance(p, dict) for p in products), dtype=bool, count=len(products))
+    ids = np.where(is_dict, None, products)
+    pos = hierarchy.positions(ids)
+    fallback = ids if product_fallback == "id" else np.full(len(ids), None, dtype=object)
+    names = np.where(pos != MISSING, hierarchy.names[pos], fallback)
+    for i in np.flatnonzero(is_dict):
+        names[i] = products[i].get("label", products[i].get("name"))
+    return names
+
+
+def _content_types(segment_types, website_names, classifier):
+    """API content_type when given, else the classifier's (once per distinct website)."""
+    decided = classifier.classify_many(website_names)
+    given = _object_array(segment_types)
+    use_given = np.fromiter((bool(t) and t != "None" for t in given), dtype=bool, count=len(given))
+    return np.where(use_given, given, decided)
+
+
+# Columns every merged row has, ahead of its values / uncertainty columns
+MERGED_COLUMNS = ("period", "brand_owner_name", "brand_name", "product", "website_name", "platform", "content_type")
+
+# Low-cardinality text columns kept dictionary-encoded (pandas categorical) from merge to load
+CATEGORICAL_COLUMNS = ("BrandOwner", "Brand", "Product", "ContentType", "MediaOwner", "MediaChannel")
+
+
+def _repeat_categorical(values, counts):
+    """
+    np.repeat(values, counts) as a Categorical: the distinct values are stored once and
+    the rows only carry int codes. Unhashable values (dict-shaped segments) stay objects.
+    """
+    values = _object_array(list(values))
+    try:
+        codes, categories = pd.factorize(values)
+    except TypeError:
+        return np.repeat(values, counts)
+    return pd.Categorical.from_codes(np.repeat(codes, counts), categories=categories)
+
+
+def _text_categorical(column):
+    """
+    A column as a Categorical of strings (the STRING columns of the BigQuery tables):
+    raw ids left by the lookups (4000 next to "BrandA") become "4000", converted once
+    per category rather than with .astype(str) over every row. Missing stays missing.
+    """
+    if not isinstance(column.dtype, pd.CategoricalDtype):
+        column = column.astype(object).astype("category")
+    categories = column.cat.categories
+    if not all(isinstance(c, str) for c in categories):
+        # 4000 and "4000" may both be categories: re-code through the distinct strings
+        remap, text = pd.factorize(_object_array([str(c) for c in categories]))
+        codes = column.cat.codes.to_numpy()
+        codes = np.where(codes == MISSING, MISSING, remap[codes])
+        return pd.Series(pd.Categorical.from_codes(codes, categories=text), index=column.index)
+    return column
+
+
+def as_categorical(df, columns=CATEGORICAL_COLUMNS):
+    """Convert the given text columns of df to string categoricals (in place)."""
+    for column in columns:
+        if column in df.columns:
+            try:
+                df[column] = _text_categorical(df[column])
+            except TypeError:
+                pass  # unhashable values: leave the column as objects
+    return df
+
+
+def _stat_columns(stats, base_columns):
+    """
+    Per-stat columns: period, then every values / uncertainty key in the order
+    pd.DataFrame(list_of_row_dicts) would give them (first seen across rows).
+    """
+    values = [stat.get("values", {}) for stat in stats]
+    uncertainty = [stat.get("uncertainty", {}) for stat in stats]
+
+    order = dict.fromkeys(base_columns)
+    sources = {}
+    # distinct (values keys, uncertainty keys) layouts in first-seen order; usually just one
+    for value_keys, unc_keys in dict.fromkeys(zip(map(tuple, values), map(tuple, uncertainty))):
+        for k in value_keys:
+            order.setdefault(k)
+            sources.setdefault(k, (values, k))
+        for k in unc_keys:
+            order.setdefault(f"{k}_uncertainty")
+            sources.setdefault(f"{k}_uncertainty", (uncertainty, k))
+
+    columns = {"period": pd.Series(_object_array([stat.get("period") for stat in stats]))}
+    for column, (records, k) in sources.items():
+        columns[column] = pd.Series([record.get(k) for record in records])
+    return columns, list(order)
+
+
+def merge_frame(stats_entries, brands_data, websites_data, owner_resolution="parent", product_fallback="id",
+                hierarchy=None, classifier=None):
+    """
+    Columnar merge_data: the same rows and columns as pd.DataFrame(merge_data(...)).
+
+    Segment fields are resolved once per stats entry with array lookups (the
+    BrandHierarchy for owners / brands / products, an indexed join for websites)
+    and repeated across that entry's stats, instead of building a dict per stat.
+    """
+    if owner_resolution not in OWNER_RESOLUTION:
+        raise ValueError(f"Unknown owner_resolution: {owner_resolution!r}")
+    if hierarchy is None:
+        hierarchy = BrandHierarchy(brands_data)
+
+    entries = list(stats_entries)
+    segments = [entry.get("segment", {}) for entry in entries]
+    stats_lists = [entry.get("stats", []) for entry in entries]
+    counts = np.fromiter((len(stats) for stats in stats_lists), dtype=np.int64, count=len(entries))
+    stats = [stat for stats_list in stats_lists for stat in stats_list]
+    if not stats:
+        return pd.DataFrame()
+
+    # Entry-level columns
+    brand_ids = _object_array([segment.get("brand") for segment in segments])
+    brand_pos = hierarchy.positions(brand_ids)
+    brand_names = np.where(brand_pos != MISSING, hierarchy.names[brand_pos], brand_ids)
+    owners = _resolve_owners(segments, hierarchy, owner_resolution)
+    products = _product_names([segment.get("product") for segment in segments], hierarchy, product_fallback)
+    websites = _lookup_names([segment.get("website") for segment in segments], websites_data)
+    content_types = _content_types([segment.get("content_type") for segment in segments], websites,
+                                   classifier or DEFAULT_CLASSIFIER)
+    platforms = _object_array([segment.get("platform", None) for segment in segments])
+
+    stat_columns, column_order = _stat_columns(stats, MERGED_COLUMNS)
+    columns = {
+        "brand_owner_name": _repeat_categorical(owners, counts),
+        "brand_name": _repeat_categorical(brand_names, counts),
+        "product": _repeat_categorical(products, counts),
+        "website_name": _repeat_categorical(websites, counts),
+        "platform": np.repeat(platforms, counts),
+        "content_type": _repeat_categorical(content_types, counts),
+    }
+    # Segment columns are categorical or object, never inferred: all-int product ids must not turn into floats
+    merged = pd.DataFrame(columns)
+    for column, series in stat_columns.items():
+        merged[column] = series
+    return merged[column_order]
 
 
 def decide_content_type(website):
-    """Fallback if API doesn't provide content_type."""
-    if not isinstance(website, str) or not website:
-        return "Unknown"
-    lowered_website = website.lower()
-    if "google." in lowered_website or "bing." in lowered_website:
-        return "Search"
-    if any(social in lowered_website for social in ["facebook", "instagram", "tiktok", "youtube"]):
-        return "Social"
-    return "Standard"
+    """Fallback if API doesn't provide content_type (default rules, see common/content_type.py)."""
+    return DEFAULT_CLASSIFIER.classify(website)
 
 def get_previous_month_first_day():
     """Return the first day of the previous month as a string 'YYYY-MM-01'."""
@@ -92,26 +429,31 @@ def get_previous_month_first_day():
     return previous_month_first_day.strftime('%Y-%m-01')
 
 
-def clean_data(df):
-    """Clean merged DataFrame to match BigQuery schema."""
+def clean_data(df, include_product=False, classifier=None):
+    """
+    Clean merged DataFrame to match BigQuery schema (Product kept only if include_product).
+    ContentType is derived from MediaChannel with `classifier` (default rules if None).
+    """
     # Rename columns to match BQ schema
     df = df.rename(columns={
         "brand_owner_name": "BrandOwner",
         "brand_name": "Brand",
         "website_name": "MediaChannel",
         "ad_cont": "AdContacts",
-        "product": "Product",           # will drop it anyway
+        "product": "Product",
         "content_type": "ContentType",
         "Media owner": "MediaOwner",    # if you have this info
         "Brand owner": "BrandOwner"
     })
 
-    # Drop the Product column (not in BQ)
-    if "Product" in df.columns:
+    # Drop the Product column unless this client's table has it
+    if "Product" in df.columns and not include_product:
         df = df.drop("Product", axis=1)
 
     # Ensure all columns expected by BQ exist
     expected_columns = ["Date", "BrandOwner", "Brand", "ContentType", "MediaOwner", "MediaChannel", "AdContacts"]
+    if include_product:
+        expected_columns.insert(3, "Product")
     for col in expected_columns:
         if col not in df.columns:
             df[col] = None  # fill missing columns with None
@@ -122,12 +464,25 @@ def clean_data(df):
     # Set Date to previous month first day
     df['Date'] = get_previous_month_first_day()
 
+    # Force override of ContentType
+    df["ContentType"] = (classifier or DEFAULT_CLASSIFIER).classify_many(df["MediaChannel"])
     # Reorder columns to match BigQuery
     df = df.reindex(columns=expected_columns)
 
-    return df
+    return as_categorical(df)
 
 
+def get_previous_month_range():
+    """Return previous month in AdReal API range format (YYYYMM01,YYYYMMDD,month)."""
+    today = datetime.today()
+    first_of_current_month = datetime(today.year, today.month, 1)
+    previous_month_last_day = first_of_current_month - timedelta(days=1)
+    first_of_previous_month = datetime(previous_month_last_day.year, previous_month_last_day.month, 1)
+
+    start_str = first_of_previous_month.strftime("%Y%m%d")
+    end_str = previous_month_last_day.strftime("%Y%m%d")
+    return f"{start_str},{end_str},month"
+
 def get_correct_period():
     """Return the previous month in AdReal API period format."""
     today = datetime.today()
@@ -137,34 +492,339 @@ def get_correct_period():
     return period
 
 
-def run_adreal_pipeline(username, password, market="ro", parent_brand_ids=None):
-    """Fetch, merge, clean AdReal data and return a DataFrame."""
-    if parent_brand_ids is None:
-        parent_brand_ids = []
-
-    period = get_correct_period()
-
-    # Fetch brands & websites
-    brand_fetcher = BrandFetcher(username, password, market)
-    brand_fetcher.login()
-    brands_data = brand_fetcher.fetch_brands(period=period)
+def exclude_brands(df, excluded_brands):
+    """Drop rows whose Brand (or Product, when present) is in excluded_brands."""
+    if not excluded_brands:
+        return df
+    df = df[~df["Brand"].isin(excluded_brands)]
+    if "Product" in df.columns:
+        df = df[~df["Product"].isin(excluded_brands)]
+    return df
 
-    publisher_fetcher = PublisherFetcher(username, password, market)
-    publisher_fetcher.login()
-    websites_data = publisher_fetcher.fetch_publishers(period=period)
 
-    # Fetch stats
-    adreal_fetcher = AdRealFetcher(username=username, password=password, market=market)
+def run_legs(legs, foreground=None):
+    """
+    Run independent fetch legs ({name: callable}) at the same time and return
+    {name: result}. `foreground` legs ({name: callable}) are called on the calling
+    thread meanwhile with the {name: Future} of the background legs (see
+    prefetch_stream). Each leg's latency is printed next to the overall wall
+    time; an exception in any leg is raised once all of them have finished.
+    Foreground legs are labelled "(prefetch)": they return a stream, so their time
+    only covers what was read before returning (see timed_stream for the rest).
+    """
+    timings = {}
+
+    def timed(name, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            timings[name] = time.perf_counter() - start
+
+    foreground = foreground or {}
+    results = {}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, len(legs))) as executor:
+        futures = {name: executor.submit(timed, name, fn) for name, fn in legs.items()}
+        for name, fn in foreground.items():
+            results[name] = timed(name, fn, futures)
+    wall = time.perf_counter() - start
+    labels = {**{name: name for name in legs}, **{name: f"{name} (prefetch)" for name in foreground}}
+    print("Fetch legs: " + ", ".join(f"{labels[name]} {timings[name]:.1f}s" for name in labels)
+          + f" (wall {wall:.1f}s, sum {sum(timings.values()):.1f}s)")
+    results.update((name, future.result()) for name, future in futures.items())
+    return results
+
+
+def prefetch_stream(items, futures, max_buffered=None):
+    """
+    Start reading a stats stream while `futures` (the catalogue downloads) run:
+    up to max_buffered items (default: one merge batch) are read ahead and held,
+    then reading pauses until the downloads are done. Returns an iterator over
+    the read-ahead items followed by the rest of the stream, so no more than one
+    batch is held however long the catalogues take.
+    """
+    max_buffered = max_buffered or DEFAULT_BATCH_SIZE
+    items = iter(items)
+    buffered = []
+    while len(buffered) < max_buffered and not all(future.done() for future in futures.values()):
+        try:
+            buffered.append(next(items))
+        except StopIteration:
+            break
+    return itertools.chain(buffered, items)
+
+
+def timed_stream(items, name):
+    """Yield from `items`, then print how long it took from the first request to the last item."""
+    start = time.perf_counter()
+    count = 0
+    for item in items:
+        count += 1
+        yield item
+    print(f"{name} stream: {count} items in {time.perf_counter() - start:.1f}s (merge included)")
+
+
+def reference_legs(session, period, market="ro", cache=None, sync=None):
+    """The brands and publishers downloads for a period, as legs for run_legs (`sync`: a CatalogueSync)."""
+    def brands():
+        brand_fetcher = BrandFetcher(session.username, session.password, market, session=session, cache=cache,
+                                     sync=sync)
+        brand_fetcher.login()
+        return brand_fetcher.fetch_brands(period=period)
+
+    def publishers():
+        publisher_fetcher = PublisherFetcher(session.username, session.password, market, session=session,
+                                             cache=cache, sync=sync)
+        publisher_fetcher.login()
+        return publisher_fetcher.fetch_publishers(period=period)
+
+    return {"brands": brands, "publishers": publishers}
+
+
+def _resumed_reference_data(checkpoint, market):
+    if checkpoint is None:
+        return None
+    brands_data = checkpoint.get_snapshot(f"reference/{market}/brands")
+    websites_data = checkpoint.get_snapshot(f"reference/{market}/publishers")
+    if brands_data is None or websites_data is None:
+        return None
+    print(f"Reference data for {market}: resumed from checkpoint")
+    return brands_data, websites_data
+
+
+def _save_reference_data(checkpoint, market, brands_data, websites_data):
+    if checkpoint is not None:
+        checkpoint.put_snapshot(f"reference/{market}/brands", brands_data)
+        checkpoint.put_snapshot(f"reference/{market}/publishers", websites_data)
+
+
+def fetch_reference_data(session, period, market="ro", cache=None, checkpoint=None, sync=None):
+    """Fetch the brands and publishers catalogues for a period, concurrently (cache- and checkpoint-aware)."""
+    resumed = _resumed_reference_data(checkpoint, market)
+    if resumed is not None:
+        return resumed
+
+    results = run_legs(reference_legs(session, period, market=market, cache=cache, sync=sync))
+    _save_reference_data(checkpoint, market, results["brands"], results["publishers"])
+    return results["brands"], results["publishers"]
+
+
+def fetch_stats(session, period_range, parent_brand_ids=None, industries=None, market="ro",
+                segments="brand,product,content_type,website", stream=True, shard_size=None, shard_workers=None,
+                checkpoint=None):
+    """
+    Fetch the /stats/ results for one brand / industry selection.
+    Streams by default: the result is an iterator of items, parsed as they arrive.
+    With shard_size set, the selection is split into shards fetched concurrently
+    (see AdRealFetcher.fetch_data_sharded) and a list is returned instead;
+    finished shards are saved to `checkpoint` when one is given.
+    """
+    adreal_fetcher = AdRealFetcher(username=session.username, password=session.password, market=market,
+                                   period_range=period_range, session=session)
     adreal_fetcher.login()
-    stats_data = adreal_fetcher.fetch_data(
-        parent_brand_ids,
+    if shard_size:
+        return adreal_fetcher.fetch_data_sharded(
+            parent_brand_ids or [],
+            shard_size=shard_size,
+            industries=industries,
+            max_workers=shard_workers,
+            checkpoint=checkpoint,
+            platforms="pc",
+            page_types="search,social,standard",
+            segments=segments,
+        )
+    return adreal_fetcher.fetch_data(
+        parent_brand_ids or [],
         platforms="pc",
         page_types="search,social,standard",
-        segments="brand,product,content_type,website",
-        limit=1000000
+        segments=segments,
+        industries=industries,
+        stream=stream
     )
 
-    merged_rows = merge_data(stats_data, brands_data, websites_data)
-    df = pd.DataFrame(merged_rows).drop_duplicates()
-    df = clean_data(df)
+
+# Rows per DataFrame batch in the streaming merge -> clean pipeline
+DEFAULT_BATCH_SIZE = 50000
+
+
+def iter_row_batches(rows, batch_size=DEFAULT_BATCH_SIZE):
+    """Group an iterable of row dicts into lists of at most batch_size rows."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_frame_batches(stats_data, brands_data, websites_data, excluded_brands=None, owner_resolution="parent",
+                       include_product=False, product_fallback="id", add_other_brands=False,
+                       batch_size=DEFAULT_BATCH_SIZE, hierarchy=None, classifier=None, deduplicator=None):
+    """
+    Streaming de-duplicate -> merge -> clean -> exclude pipeline.
+    Stats entries are de-duplicated by business key (see common/dedupe.py) and
+    merged batch_size at a time with the columnar merge_frame, so memory is
+    bounded by one batch however many stats items come in.
+    Yields cleaned, BigQuery-shaped DataFrames. Pass a StatsDeduplicator to
+    read / report its counts yourself; otherwise a summary is printed at the end.
+    """
+    if add_other_brands:
+        brands_data = add_other_children(brands_data)
+    if hierarchy is None:
+        hierarchy = BrandHierarchy(brands_data)
+    report = deduplicator is None
+    if report:
+        deduplicator = StatsDeduplicator()
+    for entries in iter_row_batches(stats_data, batch_size):
+        entries = deduplicator.filter_entries(entries)
+        merged = merge_frame(entries, brands_data, websites_data, owner_resolution=owner_resolution,
+                             product_fallback=product_fallback, hierarchy=hierarchy, classifier=classifier)
+        if merged.empty:
+            continue
+        df = clean_data(merged, include_product=include_product, classifier=classifier)
+        yield exclude_brands(df, excluded_brands)
+    if report:
+        deduplicator.report()
+
+
+def build_frame(stats_data, brands_data, websites_data, excluded_brands=None, owner_resolution="parent",
+                include_product=False, product_fallback="id", add_other_brands=False,
+                batch_size=DEFAULT_BATCH_SIZE, hierarchy=None, classifier=None, deduplicator=None):
+    """De-duplicate, merge and clean stats into the BigQuery-shaped DataFrame."""
+    frames = iter_frame_batches(
+        stats_data, brands_data, websites_data,
+        excluded_brands=excluded_brands,
+        owner_resolution=owner_resolution,
+        include_product=include_product,
+        product_fallback=product_fallback,
+        add_other_brands=add_other_brands,
+        batch_size=batch_size,
+        hierarchy=hierarchy,
+        classifier=classifier,
+        deduplicator=deduplicator,
+    )
+    return concat_frames(frames, include_product=include_product)
+
+
+def concat_frames(frames, include_product=False):
+    """
+    Concatenate cleaned batches (an empty input gives the empty, correctly-shaped frame).
+    Categorical columns are given the union of the batches' categories first, so the
+    result stays categorical (pd.concat falls back to object when categories differ).
+    """
+    frames = list(frames)
+    if not frames:
+        return clean_data(pd.DataFrame(), include_product=include_product)
+    frames = [as_categorical(df.copy()) for df in frames]
+    for column in CATEGORICAL_COLUMNS:
+        if not all(column in df.columns and isinstance(df[column].dtype, pd.CategoricalDtype) for df in frames):
+            continue
+        categories = pd.Index(_object_array([]))
+        for df in frames:
+            categories = categories.append(df[column].cat.categories.astype(object))
+        categories = categories.unique()
+        for df in frames:
+            df[column] = df[column].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+def run_client(client, session, brands_data, websites_data, period_range, checkpoint=None, hierarchy=None):
+    """
+    Fetch and build one registry client's frame from already-fetched reference data
+    (`hierarchy` is the BrandHierarchy of brands_data, shared between clients).
+    With a client RunCheckpoint, a completed frame is reloaded instead of refetched
+    and a fresh one is saved batch by batch.
+    """
+    if checkpoint is not None:
+        frames = checkpoint.load_frames("frame")
+        if frames is not None:
+            df = concat_frames(frames, include_product=client["include_product"])
+            print(f"[{client['name']}] resumed {len(df)} rows from checkpoint")
+            return df
+
+    stats_data = fetch_stats(
+        session,
+        period_range,
+        parent_brand_ids=client["parent_brand_ids"],
+        industries=client["industries"],
+        market=client["market"],
+        segments=client["segments"],
+        shard_size=client.get("shard_size"),
+        shard_workers=client.get("shard_workers"),
+        checkpoint=checkpoint,
+    )
+    deduplicator = StatsDeduplicator()
+    frames = iter_frame_batches(
+        stats_data,
+        brands_data,
+        websites_data,
+        excluded_brands=client["excluded_brands"],
+        owner_resolution=client["owner_resolution"],
+        include_product=client["include_product"],
+        product_fallback=client["product_fallback"],
+        add_other_brands=client["add_other_brands"],
+        hierarchy=hierarchy,
+        classifier=classifier_from_rules(client.get("content_type_rules")),
+        deduplicator=deduplicator,
+    )
+    if checkpoint is not None:
+        frames = checkpoint.save_frames("frame", frames)
+    df = concat_frames(frames, include_product=client["include_product"])
+    deduplicator.report(client["name"])
     return df
+
+
+def run_adreal_pipeline(username, password, market="ro", parent_brand_ids=None, session=None, cache=None,
+                        industries=None, checkpoint=None, sync=None):
+    """
+    Fetch, merge, clean AdReal data and return a DataFrame.
+    Brands and publishers are fetched concurrently with the start of the /stats/
+    stream (see run_legs and prefetch_stream); /stats/ stays streamed.
+    Brands and publishers are read from `cache` (default: reference_cache_from_env())
+    when another run already downloaded them for this market and period.
+    With a RunCheckpoint, completed stages (reference data, frame) are resumed.
+    With a CatalogueSync (default: catalogue_sync_from_env()), catalogues are versioned
+    with a changelog (and, if it has carry_over, reused from the previous month when unchanged).
+    """
+    period = get_correct_period()
+
+    # One login shared by all three fetchers
+    if session is None:
+        session = AdRealSession(username, password, market)
+    if cache is None:
+        cache = reference_cache_from_env()
+    if sync is None:
+        sync = catalogue_sync_from_env()
+
+    if checkpoint is not None:
+        frames = checkpoint.load_frames("frame")
+        if frames is not None:
+            return concat_frames(frames)
+
+    # Brands, publishers and /stats/ are independent until the merge: the catalogues are
+    # downloaded in the background while the /stats/ stream is opened on this thread and
+    # read ahead by at most one batch; the rest is streamed straight into the merge.
+    resumed = _resumed_reference_data(checkpoint, market)
+    legs = {} if resumed is not None else reference_legs(session, period, market=market, cache=cache, sync=sync)
+
+    def stats(futures):
+        stream = fetch_stats(session, get_previous_month_range(), parent_brand_ids=parent_brand_ids,
+                             industries=industries, market=market)
+        return prefetch_stream(timed_stream(stream, "stats"), futures)
+
+    results = run_legs(legs, foreground={"stats": stats})
+    if resumed is not None:
+        brands_data, websites_data = resumed
+    else:
+        brands_data, websites_data = results["brands"], results["publishers"]
+        _save_reference_data(checkpoint, market, brands_data, websites_data)
+    stats_data = results["stats"]
+
+    hierarchy = load_brand_hierarchy(brands_data, market, period, cache)
+    frames = iter_frame_batches(stats_data, brands_data, websites_data, hierarchy=hierarchy)
+    if checkpoint is not None:
+        frames = checkpoint.save_frames("frame", frames)
+    return concat_frames(frames)
@@ -0,0 +1,242 @@
+import itertools
+import json
+import os
+import re
+import shutil
+
+from google.api_core.exceptions import BadRequest, Conflict, NotFound
+from google.cloud import bigquery
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# BigQuery type -> Arrow types a Parquet column may have for it
+ARROW_TYPES = {
+    "DATE": (pa.date32(),),
+    "STRING": (pa.string(), pa.large_string()),
+    "INTEGER": (pa.int64(),),
+    "INT64": (pa.int64(),),
+    "FLOAT": (pa.float64(),),
+    "FLOAT64": (pa.float64(),),
+    "BOOLEAN": (pa.bool_(),),
+    "BOOL": (pa.bool_(),),
+    "NUMERIC": (pa.decimal128(38, 9),),
+    "BYTES": (pa.binary(), pa.large_binary()),
+    "TIMESTAMP": (pa.timestamp("us", tz="UTC"),),
+    "DATETIME": (pa.timestamp("us"),),
+}
+
+UNPARTITIONED = "__UNPARTITIONED__"
+
+MERGE_MONTHS = re.compile(
+    r"MERGE `(?P<table>[^`]+)` T\s+USING `(?P<staging>[^`]+)` S\s+ON FALSE\s+"
+    r"WHEN NOT MATCHED BY SOURCE AND DATE_TRUNC\(T\.Date, MONTH\) IN \((?P<months>[^)]*)\) THEN DELETE\s+"
+    r"WHEN NOT MATCHED THEN INSERT ROW\s*$"
+)
+MERGE_MONTH = re.compile(r"DATE '(\d{4})-(\d{2})-01'")
+
+
+class LocalTable:
+    """What get_table returns: the parts of bigquery.Table the loader reads."""
+
+    def __init__(self, table_id, schema, time_partitioning=None, clustering_fields=None):
+        self.table_id = table_id
+        self.schema = schema
+        self.time_partitioning = time_partitioning
+        self.clustering_fields = clustering_fields
+
+
+_job_ids = itertools.count(1)
+
+
+class LocalJob:
+    """A finished job (everything runs synchronously)."""
+
+    def __init__(self, kind, destination, rows=0):
+        self.job_id = f"local_{kind}_{next(_job_ids)}"
+        self.kind = kind
+        self.destination = destination
+        self.rows = rows
+
+    def result(self):
+        return self
+
+
+class LocalBigQueryClient:
+    """
+    Stand-in for bigquery.Client that keeps tables as Parquet files under a directory:
+
+        <directory>/<table_id>/_table.json                    schema, partitioning, clustering
+        <directory>/<table_id>/<partition>/part-NNNNN.parquet  rows (partition YYYYMM / YYYYMMDD)
+
+    It implements what bigquery_loader uses (get_table, create_table,
+    delete_table, Parquet load_table_from_file with partition decorators and
+    write dispositions, and the month-replacing MERGE from a staging table) and
+    checks loads against the table schema the way BigQuery does, so the load
+    path can run and be tested without a project.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.jobs = []
+
+    # ---------------- TABLES ----------------
+    def _table_dir(self, table_id):
+        return os.path.join(self.directory, table_id.split("$", 1)[0])
+
+    def get_table(self, table_id):
+        path = os.path.join(self._table_dir(table_id), "_table.json")
+        if not os.path.exists(path):
+            raise NotFound(f"Not found: Table {table_id}")
+        with open(path) as f:
+            meta = json.load(f)
+        partitioning = None
+        if meta["time_partitioning"]:
+            partitioning = bigquery.TimePartitioning(type_=meta["time_partitioning"]["type"],
+                                                     field=meta["time_partitioning"]["field"])
+        schema = [bigquery.SchemaField(*field) for field in meta["schema"]]
+        return LocalTable(table_id, schema, partitioning, meta["clustering_fields"])
+
+    def create_table(self, table, exists_ok=False):
+        table_id = f"{table.project}.{table.dataset_id}.{table.table_id}"
+        table_dir = self._table_dir(table_id)
+        if os.path.exists(os.path.join(table_dir, "_table.json")):
+            if exists_ok:
+                return self.get_table(table_id)
+            raise Conflict(f"Already Exists: Table {table_id}")
+        partitioning = table.time_partitioning
+        meta = {
+            "schema": [[field.name, field.field_type, field.mode] for field in table.schema],
+            "time_partitioning": None if partitioning is None else {"type": partitioning.type_,
+                                                                    "field": partitioning.field},
+            "clustering_fields": table.clustering_fields,
+        }
+        os.makedirs(table_dir, exist_ok=True)
+        with open(os.path.join(table_dir, "_table.json"), "w") as f:
+            json.dump(meta, f)
+        return self.get_table(table_id)
+
+    def delete_table(self, table_id, not_found_ok=False):
+        table_dir = self._table_dir(table_id)
+        if not os.path.exists(os.path.join(table_dir, "_table.json")):
+            if not_found_ok:
+                return
+            raise NotFound(f"Not found: Table {table_id}")
+        shutil.rmtree(table_dir)
+
+    def read_table(self, table_id):
+        """All rows of a table as one Arrow table (partitions in order)."""
+        table = self.get_table(table_id)
+        schema = _arrow_schema(table.schema)
+        parts = []
+        for partition in self._partitions(table_id):
+            parts.extend(self._read_partition(table_id, partition))
+        if not parts:
+            return schema.empty_table()
+        return pa.concat_tables(parts)
+
+    # ---------------- STORAGE ----------------
+    def _partitions(self, table_id):
+        table_dir = self._table_dir(table_id)
+        return sorted(name for name in os.listdir(table_dir) if os.path.isdir(os.path.join(table_dir, name)))
+
+    def _read_partition(self, table_id, partition):
+        partition_dir = os.path.join(self._table_dir(table_id), partition)
+        if not os.path.isdir(partition_dir):
+            return []
+        return [pq.read_table(os.path.join(partition_dir, name)) for name in sorted(os.listdir(partition_dir))]
+
+    def _write_partition(self, table_id, partition, rows, truncate):
+        partition_dir = os.path.join(self._table_dir(table_id), partition)
+        if truncate and os.path.isdir(partition_dir):
+            shutil.rmtree(partition_dir)
+        os.makedirs(partition_dir, exist_ok=True)
+        part = len(os.listdir(partition_dir))
+        pq.write_table(rows, os.path.join(partition_dir, f"part-{part:05d}.parquet"))
+
+    def _split(self, table, rows):
+        """{partition: rows} for rows of table (one UNPARTITIONED entry if it is not partitioned)."""
+        partitioning = table.time_partitioning
+        if partitioning is None:
+            return {UNPARTITIONED: rows}
+        dates = rows.column(partitioning.field)
+        if dates.null_count:
+            raise BadRequest(f"{dates.null_count} rows have a NULL partitioning field {partitioning.field}")
+        keys = pc.strftime(dates, format="%Y%m" if partitioning.type_ == "MONTH" else "%Y%m%d")
+        return {key: rows.filter(pc.equal(keys, key)) for key in sorted(set(keys.to_pylist()))}
+
+    # ---------------- JOBS ----------------
+    def load_table_from_file(self, file_obj, destination, job_config=None):
+        job_config = job_config or bigquery.LoadJobConfig()
+        if job_config.source_format != bigquery.SourceFormat.PARQUET:
+            raise BadRequest(f"LocalBigQueryClient only loads Parquet, got {job_config.source_format}")
+        table_id, _, decorator = destination.partition("$")
+        table = self.get_table(table_id)
+        rows = pq.read_table(file_obj)
+        _check_schema(rows.schema, table.schema, job_config.schema)
+
+        truncate = job_config.write_disposition == bigquery.WriteDisposition.WRITE_TRUNCATE
+        split = self._split(table, rows)
+        if decorator:
+            if table.time_partitioning is None:
+                raise BadRequest(f"Partition decorator on unpartitioned table {table_id}")
+            if set(split) - {decorator}:
+                raise BadRequest(f"Rows outside partition {decorator} loaded into {destination}")
+            split = {decorator: split.get(decorator, rows.slice(0, 0))}
+        elif truncate:
+            for partition in self._partitions(table_id):
+                shutil.rmtree(os.path.join(self._table_dir(table_id), partition))
+        for partition, part in split.items():
+            self._write_partition(table_id, partition, part, truncate)
+
+        job = LocalJob("load", destination, rows.num_rows)
+        self.jobs.append(job)
+        return job
+
+    def query(self, sql):
+        """Only the loader's month-replacing MERGE is understood (atomic here because nothing runs alongside)."""
+        match = MERGE_MONTHS.match(sql.strip())
+        if match is None:
+            raise NotImplementedError(f"LocalBigQueryClient cannot run: {sql.strip()}")
+        table_id = match["table"]
+        table = self.get_table(table_id)
+        staged = self.read_table(match["staging"])
+        months = [(int(year), int(month)) for year, month in MERGE_MONTH.findall(match["months"])]
+        for partition in self._partitions(table_id):
+            parts = self._read_partition(table_id, partition)
+            shutil.rmtree(os.path.join(self._table_dir(table_id), partition))
+            for rows in parts:
+                dates = rows.column("Date")
+                in_months = pa.array([False] * rows.num_rows)
+                for year, month in months:
+                    in_month = pc.and_(pc.equal(pc.year(dates), year), pc.equal(pc.month(dates), month))
+                    in_months = pc.or_(in_months, pc.fill_null(in_month, False))
+                kept = rows.filter(pc.invert(in_months))
+                if kept.num_rows:
+                    self._write_partition(table_id, partition, kept, truncate=False)
+        for partition, part in self._split(table, staged).items():
+            self._write_partition(table_id, partition, part, truncate=False)
+        job = LocalJob("query", table_id, staged.num_rows)
+        self.jobs.append(job)
+        return job
+
+
+# ---------------- SCHEMA ----------------
+def _arrow_schema(bq_schema):
+    return pa.schema([pa.field(field.name, ARROW_TYPES[field.field_type][0]) for field in bq_schema])
+
+
+def _check_schema(arrow_schema, table_schema, job_schema=None):
+    """Raise BadRequest like BigQuery when a Parquet file does not match the table (or the job's schema)."""
+    expected = [(field.name, field.field_type) for field in table_schema]
+    if job_schema is not None:
+        given = [(field.name, field.field_type) for field in job_schema]
+        if given != expected:
+            raise BadRequest(f"Provided schema {given} does not match table schema {expected}")
+    if arrow_schema.names != [name for name, _ in expected]:
+        raise BadRequest(f"Parquet columns {arrow_schema.names} do not match table columns "
+                         f"{[name for name, _ in expected]}")
+    for (name, field_type), field in zip(expected, arrow_schema):
+        arrow_type = field.type.value_type if pa.types.is_dictionary(field.type) else field.type
+        if arrow_type not in ARROW_TYPES[field_type]:
+            raise BadRequest(f"Column {name}: Parquet type {field.type} cannot be loaded as {field_type}")
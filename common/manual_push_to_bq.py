@@ -0,0 +1,165 @@
+# common/manual_push_to_bq.py
+
+import argparse
+import hashlib
+import json
+from datetime import datetime, timedelta
+import pandas as pd
+import traceback
+import sys
+
+from . import gather_all
+from .bigquery_loader import push_to_bigquery
+from .checkpoint import checkpoint_from_env
+from .registry import get_client
+from .run_pipeline import access_secret
+
+
+def get_month_range(year, month):
+    """Return (start_date, end_date) in YYYYMMDD format for a given month."""
+    start_date = datetime(year, month, 1)
+    next_month = start_date.replace(day=28) + timedelta(days=4)  # always in next month
+    end_date = next_month - timedelta(days=next_month.day)
+    return start_date.strftime("%Y%m%d"), end_date.strftime("%Y%m%d")
+
+def get_manual_period_info(year, month):
+    """Return AdReal period string and date string for a manual month."""
+    start_date, _ = get_month_range(year, month)
+    adreal_period = f"month_{start_date}"
+    date_string = datetime(year, month, 1).strftime('%Y-%m-01')
+    return adreal_period, date_string
+
+def clean_manual_data(df, date_string):
+    """Force the manual month's date onto a cleaned DataFrame."""
+    df['Date'] = date_string
+    if "AdContacts" in df.columns:
+        df["AdContacts"] = pd.to_numeric(df["AdContacts"], errors="coerce").fillna(0).astype(int)
+    return df
+
+def manual_checkpoint(checkpoint, client, parent_brand_ids=None, industries=None):
+    """
+    Client-scoped checkpoint for a manual run. Runs with overridden filters get
+    their own scope so they never resume another selection's frame.
+    """
+    if checkpoint is None:
+        return None
+    if parent_brand_ids is None and industries is None:
+        return checkpoint.client(client["name"])
+    overrides = json.dumps([parent_brand_ids, industries]).encode("utf-8")
+    return checkpoint.client(f"{client['name']}-{hashlib.sha1(overrides).hexdigest()[:8]}")
+
+
+def fetch_adreal_manual(username, password, year, month, client, parent_brand_ids=None, industries=None,
+                        cache=None, checkpoint=None, sync=None):
+    """
+    Fetch, merge, clean AdReal data for a manual month.
+    `client` is a registry entry; parent_brand_ids / industries override its own filters.
+    `checkpoint` is the run-level RunCheckpoint for this month (default: checkpoint_from_env()).
+    """
+    adreal_period, date_string = get_manual_period_info(year, month)
+    if checkpoint is None:
+        checkpoint = checkpoint_from_env(adreal_period)
+    client_checkpoint = manual_checkpoint(checkpoint, client, parent_brand_ids, industries)
+
+    client = dict(client)
+    if parent_brand_ids is not None:
+        client["parent_brand_ids"] = parent_brand_ids
+    if industries is not None:
+        client["industries"] = industries
+
+    print(f"Fetching data for period {adreal_period} ({date_string})")
+
+    # One login shared by all three fetchers
+    session = gather_all.AdRealSession(username, password, client["market"])
+    if cache is None:
+        cache = gather_all.reference_cache_from_env()
+    if sync is None:
+        sync = gather_all.catalogue_sync_from_env()
+
+    # Fetch brands & websites
+    brands_data, websites_data = gather_all.fetch_reference_data(session, adreal_period, market=client["market"],
+                                                                 cache=cache, checkpoint=checkpoint, sync=sync)
+
+    hierarchy = gather_all.load_brand_hierarchy(brands_data, client["market"], adreal_period, cache)
+
+    # Fetch stats, merge and clean with the client's own options
+    start, end = get_month_range(year, month)
+    df = gather_all.run_client(client, session, brands_data, websites_data, f"{start},{end},month",
+                               checkpoint=client_checkpoint, hierarchy=hierarchy)
+    return clean_manual_data(df, date_string)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fetch AdReal data for a specific month and push to BigQuery."
+    )
+    parser.add_argument("year", type=int, help="Year (e.g., 2025)")
+    parser.add_argument("month", type=int, help="Month (1-12)")
+    parser.add_argument("--client", required=True, help="Client name from clients.json (e.g. Mega)")
+    parser.add_argument(
+        "--industries",
+        type=str,
+        default=None,
+        help="Industry filter, e.g. '12' or '12,13,15' (AdReal industry IDs); overrides the registry"
+    )
+    parser.add_argument(
+        "--parent-brand-ids",
+        type=str,
+        default=None,
+        help="Optional comma-separated parent brand IDs; overrides the registry"
+    )
+
+    args = parser.parse_args()
+
+    try:
+        client = get_client(args.client)
+        username = access_secret("adreal-username")
+        password = access_secret("adreal-password")
+
+        # Parse optional parent_brand_ids if provided
+        parent_brand_ids = None
+        if args.parent_brand_ids:
+            parent_brand_ids = [p.strip() for p in args.parent_brand_ids.split(",") if p.strip()]
+
+        # Passing only --industries means "industries instead of the registry's brands"
+        if args.industries and parent_brand_ids is None:
+            parent_brand_ids = []
+
+        # Checkpoint (if configured) so a failed push can be retried without refetching
+        adreal_period, _ = get_manual_period_info(args.year, args.month)
+        checkpoint = checkpoint_from_env(adreal_period)
+        client_checkpoint = manual_checkpoint(checkpoint, client, parent_brand_ids, args.industries)
+        if client_checkpoint is not None and client_checkpoint.done("load") is not None:
+            print(f"{args.client} {args.year}-{args.month} was already loaded in an earlier attempt. Nothing to push.")
+            return
+
+        # Fetch AdReal data for the requested month
+        df = fetch_adreal_manual(
+            username,
+            password,
+            args.year,
+            args.month,
+            client,
+            parent_brand_ids=parent_brand_ids,
+            industries=args.industries,
+            checkpoint=checkpoint,
+        )
+
+        if df.empty:
+            print(f"No data for {args.year}-{args.month}. Nothing to push.")
+            return
+
+        print(f"Fetched data for {args.year}-{args.month}, shape: {df.shape}")
+        message = push_to_bigquery(df, client["table_id"])
+        if client_checkpoint is not None:
+            client_checkpoint.mark_done("load", message=message)
+        print(message)
+
+    except Exception as e:
+        print("FATAL ERROR:")
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
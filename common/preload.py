@@ -0,0 +1,26 @@
+import importlib
+import threading
+
+# What a batch run needs after its Secret Manager round trips: the pipeline
+# (pandas, numpy, pyarrow) and then the BigQuery loader (google-cloud-bigquery)
+PIPELINE_MODULES = ("google.cloud.secretmanager", "common.batch_runner", "common.bigquery_loader")
+
+
+def preload_modules(modules=PIPELINE_MODULES):
+    """
+    Import modules in order on a background thread, so their import time overlaps
+    the network calls the caller makes meanwhile (secrets, AdReal login and
+    fetches). Code that imports one of them while it is still loading waits for
+    it. An import that fails here is ignored; it fails again, with its error,
+    where the module is actually used.
+    """
+    def run():
+        for name in modules:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                pass
+
+    thread = threading.Thread(target=run, name="preload-modules", daemon=True)
+    thread.start()
+    return thread
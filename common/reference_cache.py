@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+DEFAULT_TTL_SECONDS = 24 * 3600
+
+
+# ---------------- BACKENDS ----------------
+class LocalDirectoryBackend:
+    """Stores cache entries as files under a local directory."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, key):
+        return os.path.join(self.root, *key.split("/"))
+
+    def read(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def write(self, key, data):
+        """Write to a temp file in the same directory, then rename over the target."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+class ObjectStoreBackend:
+    """
+    Stores cache entries as objects in a GCS-style bucket: anything exposing
+    bucket.blob(name) with exists(), download_as_bytes() and upload_from_string().
+    Object uploads replace the whole object, so writes are atomic.
+    """
+
+    def __init__(self, bucket, prefix="adreal-reference"):
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+
+    def _name(self, key):
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def read(self, key):
+        blob = self.bucket.blob(self._name(key))
+        if not blob.exists():
+            return None
+        return blob.download_as_bytes()
+
+    def write(self, key, data):
+        self.bucket.blob(self._name(key)).upload_from_string(data, content_type="application/octet-stream")
+
+
+class FilesystemBlob:
+    def __init__(self, path):
+        self.path = path
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def download_as_bytes(self):
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def upload_from_string(self, data, content_type=None):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        LocalDirectoryBackend(os.path.dirname(self.path)).write(os.path.basename(self.path), data)
+
+
+class FilesystemBucket:
+    """Local stand-in for a google.cloud.storage Bucket (tests, local runs)."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def blob(self, name):
+        return FilesystemBlob(os.path.join(self.root, *name.split("/")))
+
+
+# ---------------- CACHE ----------------
+# Catalogues stored as Arrow snapshots (see common/catalogue_snapshot.py); other entries are JSON
+SNAPSHOT_ENDPOINTS = ("brands", "publishers")
+
+
+class ReferenceCache:
+    """
+    Brand / publisher catalogues keyed by (market, period, endpoint).
+
+    Each entry is a one-line JSON header (created_at, sha256, count, format)
+    followed by the payload. Entries older than ttl_seconds, or whose payload
+    does not match the stored hash, are treated as misses.
+
+    Brands and publishers are stored as Arrow IPC snapshots and returned as a
+    CatalogueSnapshot (read in place, nothing parsed; iterating it gives the
+    records); other entries (e.g. the brand hierarchy) are JSON.
+    """
+
+    def __init__(self, backend, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def key(market, period, endpoint):
+        extension = "arrow" if endpoint in SNAPSHOT_ENDPOINTS else "json"
+        return f"{market}/{period}/{endpoint}.{extension}"
+
+    def get(self, market, period, endpoint):
+        """Return the cached records, or None on a miss / stale / corrupt entry."""
+        raw = self.backend.read(self.key(market, period, endpoint))
+        if raw is None:
+            return None
+        header_line, _, payload = raw.partition(b"\n")
+        try:
+            header = json.loads(header_line)
+        except ValueError:
+            return None
+        if self.ttl_seconds is not None and time.time() - header.get("created_at", 0) > self.ttl_seconds:
+            return None
+        if hashlib.sha256(payload).hexdigest() != header.get("sha256"):
+            print(f"Cache entry {market}/{period}/{endpoint} failed hash check, ignoring it.")
+            return None
+        if header.get("format") == "arrow":
+            from .catalogue_snapshot import CatalogueSnapshot
+            return CatalogueSnapshot.from_bytes(payload)
+        return json.loads(payload)
+
+    def put(self, market, period, endpoint, records):
+        if endpoint in SNAPSHOT_ENDPOINTS:
+            from .catalogue_snapshot import snapshot_bytes
+            try:
+                payload = snapshot_bytes(records)
+            except ValueError as e:
+                print(f"Not caching {market}/{period}/{endpoint}: {e}")
+                return
+            payload_format = "arrow"
+        else:
+            payload = json.dumps(records, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            payload_format = "json"
+        header = {
+            "market": market,
+            "period": period,
+            "endpoint": endpoint,
+            "created_at": time.time(),
+            "sha256": hashlib.sha256(payload).hexdigest(),
+            "count": len(records),
+            "format": payload_format,
+        }
+        self.backend.write(self.key(market, period, endpoint), json.dumps(header).encode("utf-8") + b"\n" + payload)
+
+
+def reference_cache_from_env():
+    """
+    Build the cache configured for this process:
+    ADREAL_CACHE_BUCKET (GCS bucket name) or ADREAL_CACHE_DIR (local directory).
+    Returns None when neither is set.
+    """
+    ttl = os.environ.get("ADREAL_CACHE_TTL")
+    ttl_seconds = int(ttl) if ttl else DEFAULT_TTL_SECONDS
+
+    bucket_name = os.environ.get("ADREAL_CACHE_BUCKET")
+    if bucket_name:
+        from google.cloud import storage
+        bucket = storage.Client().bucket(bucket_name)
+        return ReferenceCache(ObjectStoreBackend(bucket), ttl_seconds=ttl_seconds)
+
+    cache_dir = os.environ.get("ADREAL_CACHE_DIR")
+    if cache_dir:
+        return ReferenceCache(LocalDirectoryBackend(cache_dir), ttl_seconds=ttl_seconds)
+    return None
@@ -0,0 +1,89 @@
+import json
+import os
+
+# clients.json lives at the repository root, next to the Cloud Function main.py
+DEFAULT_REGISTRY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "clients.json")
+
+# Owner resolution strategies and product fallbacks selectable per client
+OWNER_RESOLUTION = ("parent", "root", "normalize")
+PRODUCT_FALLBACK = ("id", "null")
+
+
+def _flatten_ids(value):
+    """
+    Ids may be written as a flat list, a comma-separated string, or a dict of
+    {"label": [ids]} groups (so the registry can keep notes like "Braun").
+    """
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(",") if v.strip()]
+    if isinstance(value, dict):
+        return [str(v) for group in value.values() for v in group]
+    return [str(v) for v in value]
+
+
+def normalize_client(client, defaults):
+    """Merge a client entry over the registry defaults and validate it."""
+    merged = dict(defaults)
+    merged.update(client)
+
+    name = merged.get("name")
+    if not name:
+        raise ValueError(f"Registry client without a name: {client!r}")
+    if not merged.get("table_id"):
+        raise ValueError(f"Registry client {name!r} has no table_id")
+    if merged["owner_resolution"] not in OWNER_RESOLUTION:
+        raise ValueError(f"Registry client {name!r}: owner_resolution must be one of {OWNER_RESOLUTION}")
+    if merged["product_fallback"] not in PRODUCT_FALLBACK:
+        raise ValueError(f"Registry client {name!r}: product_fallback must be one of {PRODUCT_FALLBACK}")
+
+    # "Dataset.Table" is qualified with the registry's project id
+    if merged["table_id"].count(".") == 1:
+        merged["table_id"] = f"{merged['project_id']}.{merged['table_id']}"
+
+    merged["parent_brand_ids"] = _flatten_ids(merged.get("parent_brand_ids"))
+    industries = _flatten_ids(merged.get("industries"))
+    merged["industries"] = ",".join(industries) if industries else None
+    merged["excluded_brands"] = list(merged.get("excluded_brands") or [])
+
+    rules = merged.get("content_type_rules")
+    if rules is not None and (not isinstance(rules, dict)
+                              or not all(isinstance(v, list) and v for v in rules.values())):
+        raise ValueError(f"Registry client {name!r}: content_type_rules must map a content type to website substrings")
+
+    for option in ("shard_size", "shard_workers"):
+        value = merged.get(option)
+        if value is not None and (not isinstance(value, int) or value < 1):
+            raise ValueError(f"Registry client {name!r}: {option} must be a positive integer or null")
+
+    if not merged["parent_brand_ids"] and not merged["industries"]:
+        raise ValueError(f"Registry client {name!r} needs parent_brand_ids or industries")
+    return merged
+
+
+def load_registry(path=None, include_disabled=False):
+    """Load clients.json and return the normalized client dicts, in file order."""
+    path = path or os.environ.get("ADREAL_CLIENTS_FILE") or DEFAULT_REGISTRY_PATH
+    with open(path, encoding="utf-8") as f:
+        registry = json.load(f)
+
+    defaults = registry.get("defaults", {})
+    clients = [normalize_client(client, defaults) for client in registry.get("clients", [])]
+
+    names = [client["name"] for client in clients]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate client names in registry: {duplicates}")
+
+    if not include_disabled:
+        clients = [client for client in clients if client["enabled"]]
+    return clients
+
+
+def get_client(name, path=None):
+    """Return one client by name (disabled clients included, for manual runs)."""
+    for client in load_registry(path, include_disabled=True):
+        if client["name"] == name:
+            return client
+    raise KeyError(f"Unknown client {name!r}; check clients.json")
@@ -0,0 +1,137 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+
+# Transient statuses worth another attempt (rate limit + gateway / server hiccups)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Only these are replayed; a POST (login) is sent once
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+RETRY_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+# ---------------- BACKOFF ----------------
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter: attempt n waits a random time in
+    [0, min(backoff_max, backoff_base * 2**n)]. A Retry-After header on the
+    response (seconds or HTTP date) takes precedence, capped at backoff_max.
+    The first `quiet_retries` retries of a request are not printed: one blip
+    is routine, repeated failures are worth a line each.
+    """
+
+    def __init__(self, max_attempts=5, backoff_base=1.0, backoff_max=60.0,
+                 retry_statuses=RETRY_STATUSES, methods=IDEMPOTENT_METHODS, quiet_retries=1):
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = tuple(retry_statuses)
+        self.methods = tuple(m.upper() for m in methods)
+        self.quiet_retries = quiet_retries
+        self.sleep = time.sleep
+
+    def retries_method(self, method):
+        return method.upper() in self.methods
+
+    def should_retry_response(self, method, resp, attempt):
+        return (attempt < self.max_attempts and self.retries_method(method)
+                and resp.status_code in self.retry_statuses)
+
+    def should_retry_exception(self, method, attempt):
+        return attempt < self.max_attempts and self.retries_method(method)
+
+    def delay(self, attempt, resp=None):
+        """Seconds to wait before attempt + 1 (attempts count from 1)."""
+        retry_after = _retry_after_seconds(resp) if resp is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def log_retry(self, attempt, message):
+        if attempt > self.quiet_retries:
+            print(message)
+
+
+def _retry_after_seconds(resp):
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+# ---------------- CONCURRENCY ----------------
+class HostLimiter:
+    """Caps the number of in-flight requests per host across all threads."""
+
+    def __init__(self, max_per_host=8):
+        self.max_per_host = max_per_host
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, host):
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._semaphores[host]
+
+    @contextmanager
+    def slot(self, url):
+        if not self.max_per_host:
+            yield
+            return
+        semaphore = self._semaphore(urlsplit(url).netloc)
+        with semaphore:
+            yield
+
+
+# ---------------- SEND ----------------
+def send_with_retry(send, method, url, policy, limiter=None, **kwargs):
+    """
+    Call send(method, url, **kwargs) until it returns a non-retryable response,
+    retrying transient statuses and connection / read errors per `policy`.
+    The last response is returned as-is (callers still raise_for_status);
+    the last exception is re-raised.
+    """
+    attempt = 1
+    while True:
+        try:
+            if limiter is not None:
+                with limiter.slot(url):
+                    resp = send(method, url, **kwargs)
+            else:
+                resp = send(method, url, **kwargs)
+        except RETRY_EXCEPTIONS as e:
+            if not policy.should_retry_exception(method, attempt):
+                raise
+            wait = policy.delay(attempt)
+            policy.log_retry(attempt, f"{method} {url} failed ({type(e).__name__}), "
+                                      f"retry {attempt}/{policy.max_attempts - 1} in {wait:.1f}s")
+        else:
+            if not policy.should_retry_response(method, resp, attempt):
+                return resp
+            wait = policy.delay(attempt, resp)
+            policy.log_retry(attempt, f"{method} {url} returned {resp.status_code}, "
+                                      f"retry {attempt}/{policy.max_attempts - 1} in {wait:.1f}s")
+            resp.close()
+        policy.sleep(wait)
+        attempt += 1
@@ -1,24 +1,34 @@
-from gather_all import run_adreal_pipeline, get_correct_period
-from google.cloud import secretmanager
+import argparse
+
+PROJECT_ID = "ums-adreal-471711"
 
 def access_secret(secret_id, version_id="latest"):
+    from google.cloud import secretmanager
     client = secretmanager.SecretManagerServiceClient()
-    project_id = "ums-adreal-471711"  # your actual project id
-    name = f"projects/{project_id}/secrets/{secret_id}/versions/{version_id}"
+    name = f"projects/{PROJECT_ID}/secrets/{secret_id}/versions/{version_id}"
     response = client.access_secret_version(name=name)
     return response.payload.data.decode("UTF-8")
 
 def main():
+    from .batch_runner import run_batch
+    from .gather_all import get_correct_period
+    from .registry import get_client
+
+    parser = argparse.ArgumentParser(description="Run one client's pipeline locally and save it as CSV.")
+    parser.add_argument("client", help="Client name from clients.json (e.g. Mega)")
+    args = parser.parse_args()
+
     username = access_secret("adreal-username")
     password = access_secret("adreal-password")
-    # Mega Competitors
-    parent_brand_ids = ["13549","93773","10566","49673","695","12968","16238","701","688","8196","89922","704","97637","93160"]
 
-    df = run_adreal_pipeline(username, password, parent_brand_ids=parent_brand_ids)
+    result = run_batch(username, password, [get_client(args.client)])[args.client]
+    if result["error"] is not None:
+        raise result["error"]
+    df = result["df"]
     print(f"Data fetched: {len(df)} rows")
 
     period = get_correct_period()
-    df.to_csv(f"{period}_Adreal.csv", index=False)
+    df.to_csv(f"{args.client}_{period}_Adreal.csv", index=False)
 
 if __name__ == "__main__":
     main()
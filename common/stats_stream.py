@@ -0,0 +1,111 @@
+import codecs
+import json
+
+_WHITESPACE = " \t\n\r"
+# What may follow a complete scalar
+_DELIMITERS = _WHITESPACE + ",:]}"
+_decoder = json.JSONDecoder()
+
+# Drop consumed text from the buffer once this much has been parsed
+_COMPACT_AT = 1 << 20
+
+
+class _StreamReader:
+    """Text buffer over an iterable of byte chunks, refilled on demand."""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Append the next chunk; returns False once the input is exhausted."""
+        if self.eof:
+            return False
+        if self.pos > _COMPACT_AT:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        for chunk in self.chunks:
+            if chunk:
+                self.buf += self.decoder.decode(chunk)
+                return True
+        self.buf += self.decoder.decode(b"", final=True)
+        self.eof = True
+        return False
+
+    def peek(self):
+        """Next non-whitespace character (not consumed), or '' at end of input."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Malformed stats response: expected {char!r}, got {found!r} at offset {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        """Decode one complete JSON value starting at the current position."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A scalar is only complete once a delimiter follows it: the buffer may end
+            # inside one and still decode as a shorter number (12|34, 0.|0015, 1e|-05)
+            if (self.buf[self.pos] not in '{["' and not self.eof
+                    and (end == len(self.buf) or self.buf[end] not in _DELIMITERS)):
+                self.fill()
+                continue
+            self.pos = end
+            return obj
+
+
+def iter_stats_results(chunks, meta=None):
+    """
+    Incrementally parse a /stats/ response body and yield the items of its
+    top-level "results" array one at a time.
+
+    Only one item is held in memory at a time. Other top-level keys
+    (total_count, next, ...) are stored in `meta` when a dict is passed; keys
+    that come after "results" are only available once the generator is exhausted.
+    """
+    reader = _StreamReader(chunks)
+    reader.expect("{")
+    while True:
+        char = reader.peek()
+        if char == "}":
+            return
+        if char == ",":
+            reader.pos += 1
+            continue
+        key = reader.value()
+        reader.expect(":")
+        if key != "results":
+            value = reader.value()
+            if meta is not None:
+                meta[key] = value
+            continue
+
+        reader.expect("[")
+        while True:
+            char = reader.peek()
+            if char == "]":
+                reader.pos += 1
+                break
+            if char == ",":
+                reader.pos += 1
+                continue
+            if char == "":
+                raise ValueError("Malformed stats response: results array is not terminated")
+            yield reader.value()
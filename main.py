@@ -0,0 +1,64 @@
+import os
+import traceback
+from datetime import datetime
+
+from common.preload import preload_modules
+from common.registry import get_client, load_registry
+
+# Only light modules are imported here: Secret Manager, pandas and BigQuery are
+# loaded on first use, in the background while the secrets are fetched (see _run_and_push).
+PROJECT_ID = "ums-adreal-471711"
+
+
+def access_secret(secret_id, version_id="latest"):
+    """Fetch a secret from Secret Manager."""
+    from google.cloud import secretmanager
+    client = secretmanager.SecretManagerServiceClient()
+    name = f"projects/{PROJECT_ID}/secrets/{secret_id}/versions/{version_id}"
+    response = client.access_secret_version(name=name)
+    return response.payload.data.decode("UTF-8")
+
+
+def _run_and_push(load_clients):
+    # The pipeline and BigQuery modules import while Secret Manager answers
+    preload_modules()
+    username = access_secret("adreal-username")
+    password = access_secret("adreal-password")
+
+    from common.batch_runner import push_batch_results, run_batch
+    from common.gather_all import get_correct_period
+
+    results = run_batch(username, password, load_clients())
+    messages = push_batch_results(results)
+
+    # Determine reporting period for logs
+    period_date = datetime.strptime(get_correct_period()[-8:], "%Y%m%d").strftime("%Y-%m-01")
+    lines = [f"{name}: {message}" for name, message in messages.items()]
+    return f"Data fetched for period {period_date}:\n" + "\n".join(lines)
+
+
+def fetch_adreal_data(request):
+    """
+    Cloud Function entry point for a single client.
+    The client comes from the ?client= query parameter or the ADREAL_CLIENT env var.
+    """
+    try:
+        name = request.args.get("client") if request is not None else None
+        name = name or os.environ["ADREAL_CLIENT"]
+        return _run_and_push(lambda: [get_client(name)])
+
+    except Exception as e:
+        print("Error occurred:")
+        traceback.print_exc()
+        return f"Error: {str(e)}\n{traceback.format_exc()}"
+
+
+def fetch_adreal_batch(request):
+    """Cloud Function entry point running every enabled client in clients.json."""
+    try:
+        return _run_and_push(load_registry)
+
+    except Exception as e:
+        print("Error occurred:")
+        traceback.print_exc()
+        return f"Error: {str(e)}\n{traceback.format_exc()}"
@@ -0,0 +1,72 @@
+import pytest
+
+from benchmarks.fake_adreal import FakeAdRealConfig, FakeAdRealServer
+from common.async_client import AdRealClient
+
+PERIOD_RANGE = "20250801,20250831,month"
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(**config):
+        server = FakeAdRealServer(FakeAdRealConfig(**config))
+        server.start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def client_for(server):
+    return AdRealClient("user", "password", base_url=server.base_url, http2=False)
+
+
+@pytest.mark.parametrize("login_redirect", [False, True])
+def test_login(serve, login_redirect):
+    server = serve(login_redirect=login_redirect)
+    with client_for(server) as client:
+        brands = client.fetch_brands("month_20250801")
+    assert len(brands) == len(server.catalogue.brands)
+    assert server.counters["logins"] == 1
+
+
+def test_login_fails_on_invalid_credentials(serve):
+    server = serve(username="user", password="secret")
+    with client_for(server) as client:
+        with pytest.raises(Exception, match="Login failed"):
+            client.login()
+
+
+def test_relogin_on_expired_session(serve):
+    server = serve(session_ttl=2, login_redirect=True)
+    with client_for(server) as client:
+        for _ in range(3):
+            assert client.fetch_platforms()
+    assert server.counters["expired_sessions"] == 1
+    assert server.counters["logins"] == 2
+
+
+def test_fetch_pages_steps_by_the_server_page_size(serve):
+    server = serve(publishers=501, max_page_size=300)
+    with client_for(server) as client:
+        publishers = client.fetch_publishers("month_20250801", limit=1000)
+    assert publishers == server.catalogue.publishers
+    assert server.counters["publishers"] == 2
+
+
+def test_fetch_stats_sharded_keeps_repeated_items_once(serve):
+    server = serve(websites_per_brand=5)
+    catalogue = server.catalogue
+    owner = next(b["id"] for b in catalogue.brands if b["parent_id"] is None and catalogue.children.get(b["id"]))
+    brand = catalogue.children[owner][0]
+    with client_for(server) as client:
+        # the owner expands to its brands, so the second shard repeats the first
+        items = client.fetch_stats_sharded(PERIOD_RANGE, [brand, owner], shard_size=1, segments="brand,website")
+        owner_items = client.fetch_stats(PERIOD_RANGE, brand_ids=[owner], segments="brand,website")
+    segments = [item["segment"] for item in items]
+    assert len(segments) == len({tuple(sorted(s.items())) for s in segments})
+    assert sorted(map(str, segments)) == sorted(str(item["segment"]) for item in owner_items)
@@ -0,0 +1,180 @@
+import os
+
+import pandas as pd
+import pytest
+from google.cloud import bigquery
+
+from common.batch_runner import push_batch_results
+from common.bigquery_loader import BigQuerySink, push_to_bigquery
+from common.checkpoint import RunCheckpoint
+from common.local_bigquery import LocalBigQueryClient
+from common.reference_cache import LocalDirectoryBackend
+
+TABLE_ID = "project.Muller.DataImport"
+
+COLUMNS = [("Date", "DATE"), ("BrandOwner", "STRING"), ("Brand", "STRING"), ("Product", "STRING"),
+           ("ContentType", "STRING"), ("MediaChannel", "STRING"), ("AdContacts", "INTEGER")]
+
+
+def create_table(client, columns=COLUMNS, required=(), partitioned=True):
+    table = bigquery.Table(TABLE_ID, schema=[
+        bigquery.SchemaField(name, field_type, mode="REQUIRED" if name in required else "NULLABLE")
+        for name, field_type in columns])
+    if partitioned:
+        table.time_partitioning = bigquery.TimePartitioning(type_=bigquery.TimePartitioningType.MONTH, field="Date")
+    client.create_table(table)
+
+
+def frame(date, contacts, product=None):
+    df = pd.DataFrame({
+        "Date": [date] * len(contacts),
+        "BrandOwner": ["Owner"] * len(contacts),
+        "Brand": [f"Brand {i}" for i in range(len(contacts))],
+        "ContentType": ["Standard"] * len(contacts),
+        "MediaOwner": [None] * len(contacts),
+        "MediaChannel": ["example.ro"] * len(contacts),
+        "AdContacts": contacts,
+    })
+    if product is not None:
+        df.insert(3, "Product", product)
+    return df
+
+
+@pytest.fixture
+def client(tmp_path):
+    return LocalBigQueryClient(str(tmp_path))
+
+
+def test_frame_without_product_loads_null_product(client):
+    create_table(client)
+    push_to_bigquery(frame("2025-09-01", [1, 2]), TABLE_ID, client=client)
+
+    rows = client.read_table(TABLE_ID).to_pydict()
+    assert rows["AdContacts"] == [1, 2]
+    assert rows["Product"] == [None, None]
+
+
+def test_product_column_is_kept(client):
+    create_table(client)
+    push_to_bigquery(frame("2025-09-01", [5], product=["Yogurt"]), TABLE_ID, client=client)
+
+    assert client.read_table(TABLE_ID).to_pydict()["Product"] == ["Yogurt"]
+
+
+def test_column_missing_from_table_raises_before_truncating(client):
+    create_table(client, columns=[column for column in COLUMNS if column[0] != "Product"])
+    push_to_bigquery(frame("2025-09-01", [1]), TABLE_ID, client=client)
+
+    with pytest.raises(ValueError, match="Product is not a column of the table"):
+        push_to_bigquery(frame("2025-09-01", [7], product=["Yogurt"]), TABLE_ID, client=client)
+    assert client.read_table(TABLE_ID).to_pydict()["AdContacts"] == [1]
+
+
+def test_missing_required_column_raises(client):
+    create_table(client, required=("Product",))
+
+    with pytest.raises(ValueError, match="REQUIRED column Product"):
+        push_to_bigquery(frame("2025-09-01", [1]), TABLE_ID, client=client)
+    assert client.jobs == []
+
+
+@pytest.mark.parametrize("partitioned", [True, False])
+@pytest.mark.parametrize("with_product", [False, True])
+def test_reload_replaces_only_its_month(client, with_product, partitioned):
+    create_table(client, partitioned=partitioned)
+    push_to_bigquery(frame("2025-08-01", [1, 1], product=["August"] * 2 if with_product else None),
+                     TABLE_ID, client=client)
+    push_to_bigquery(frame("2025-09-01", [2, 2], product=["September"] * 2 if with_product else None),
+                     TABLE_ID, client=client)
+
+    push_to_bigquery(frame("2025-09-01", [3], product=["Reloaded"] if with_product else None),
+                     TABLE_ID, client=client)
+
+    rows = client.read_table(TABLE_ID).to_pydict()
+    assert [str(date) for date in rows["Date"]] == ["2025-08-01", "2025-08-01", "2025-09-01"]
+    assert rows["AdContacts"] == [1, 1, 3]
+    assert rows["Product"] == (["August", "August", "Reloaded"] if with_product else [None, None, None])
+
+
+def test_unpartitioned_table_is_replaced_through_a_dropped_staging_table(client, tmp_path):
+    create_table(client, partitioned=False)
+    push_to_bigquery(frame("2025-09-01", [1]), TABLE_ID, client=client)
+
+    assert [job.kind for job in client.jobs] == ["load", "query"]
+    assert client.jobs[0].destination.startswith(f"{TABLE_ID}_staging_")
+    assert os.listdir(tmp_path) == [TABLE_ID]
+
+
+def test_table_columns_the_frame_lacks_load_as_null(client):
+    create_table(client, columns=COLUMNS + [("Spend", "FLOAT"), ("Checked", "BOOLEAN")])
+    push_to_bigquery(frame("2025-09-01", [1]), TABLE_ID, client=client)
+
+    rows = client.read_table(TABLE_ID).to_pydict()
+    assert rows["Spend"] == [None]
+    assert rows["Checked"] == [None]
+
+
+def test_table_column_that_cannot_be_null_filled_raises(client):
+    create_table(client, columns=COLUMNS + [("Area", "GEOGRAPHY")])
+
+    with pytest.raises(ValueError, match="GEOGRAPHY columns cannot be loaded as NULL"):
+        push_to_bigquery(frame("2025-09-01", [1]), TABLE_ID, client=client)
+
+
+def test_new_table_is_created_partitioned_without_product(client):
+    push_to_bigquery(frame("2025-09-01", [4]), TABLE_ID, client=client)
+
+    table = client.get_table(TABLE_ID)
+    assert [field.name for field in table.schema] == ["Date", "BrandOwner", "Brand", "ContentType",
+                                                      "MediaChannel", "AdContacts"]
+    assert table.time_partitioning.type_ == bigquery.TimePartitioningType.MONTH
+    assert client.read_table(TABLE_ID).to_pydict()["AdContacts"] == [4]
+
+
+# ---------------- MULTI-CLIENT SINK ----------------
+def test_sink_loads_clients_sharing_a_table_one_after_the_other(client):
+    create_table(client)
+    sink = BigQuerySink(client=client)
+    sink.add("Muller August", frame("2025-08-01", [1]), TABLE_ID)
+    sink.add("Muller September", frame("2025-09-01", [2, 2]), TABLE_ID)
+
+    results = sink.run()
+    assert [results[name]["error"] for name in results] == [None, None]
+    assert client.read_table(TABLE_ID).to_pydict()["AdContacts"] == [1, 2, 2]
+    assert [job.destination for job in client.jobs] == [f"{TABLE_ID}$202508", f"{TABLE_ID}$202509"]
+
+
+def test_sink_surfaces_a_failed_load_without_stopping_the_others(client):
+    create_table(client, columns=[column for column in COLUMNS if column[0] != "Product"])
+    other_table = "project.Mega.DataImport"
+    sink = BigQuerySink(client=client)
+    sink.add("Muller", frame("2025-09-01", [1], product=["Yogurt"]), TABLE_ID)
+    sink.add("Mega", frame("2025-09-01", [5]), other_table)
+
+    results = sink.run()
+    assert isinstance(results["Muller"]["error"], ValueError)
+    assert results["Muller"]["message"] is None
+    assert results["Mega"]["error"] is None
+    assert client.read_table(other_table).to_pydict()["AdContacts"] == [5]
+
+
+def test_push_batch_results_skips_checkpointed_loads(client, tmp_path):
+    checkpoint = RunCheckpoint(LocalDirectoryBackend(str(tmp_path / "checkpoint")), "month_20250901")
+    create_table(client)
+    results = {
+        name: {"table_id": f"project.{name}.DataImport", "df": frame("2025-09-01", [contacts]), "error": None,
+               "checkpoint": checkpoint.client(name)}
+        for name, contacts in (("Mega", 1), ("Muller", 2))
+    }
+    results["Muller"]["table_id"] = TABLE_ID
+    checkpoint.client("Mega").mark_done("load", message="Loaded 1 rows into project.Mega.DataImport")
+
+    messages = push_batch_results(results, bq_client=client)
+    assert messages["Mega"].startswith("Already loaded")
+    assert messages["Muller"].startswith(f"Loaded 1 rows into {TABLE_ID}")
+    assert checkpoint.client("Muller").done("load")["job_ids"] == [client.jobs[0].job_id]
+    assert [job.destination for job in client.jobs] == [f"{TABLE_ID}$202509"]
+
+    # a rerun loads nothing
+    push_batch_results(results, bq_client=client)
+    assert len(client.jobs) == 1
@@ -0,0 +1,40 @@
+import pytest
+
+from benchmarks.fake_adreal import FakeAdRealConfig, FakeAdRealServer
+from common.adreal_session import AdRealSession
+from common.brands_fetcher import BrandFetcher
+from common.websites_fetcher import PublisherFetcher
+
+PERIOD = "month_20250801"
+
+
+@pytest.fixture
+def server():
+    # 501 publishers (500 websites plus the summary row) at a server cap of 300 per page
+    with FakeAdRealServer(FakeAdRealConfig(publishers=500, max_page_size=300)) as server:
+        yield server
+
+
+def session_for(server):
+    return AdRealSession("user", "password", base_url=server.base_url)
+
+
+def test_fetch_publishers_steps_by_the_server_page_size(server):
+    fetcher = PublisherFetcher("user", "password", session=session_for(server), limit=1000)
+    assert fetcher.fetch_publishers(PERIOD) == server.catalogue.publishers
+    # page 0 is reused, not downloaded again
+    assert server.counters["publishers"] == 2
+
+
+def test_fetch_brands_steps_by_the_server_page_size(server):
+    fetcher = BrandFetcher("user", "password", session=session_for(server), limit=1000)
+    assert fetcher.fetch_brands(PERIOD) == server.catalogue.brands
+
+
+def test_fetch_all_raises_on_total_count_mismatch():
+    fetcher = PublisherFetcher("user", "password", session=AdRealSession("user", "password"), limit=2)
+    pages = {0: {"results": [1, 2], "total_count": 5}, 2: {"results": [3, 4], "total_count": 5},
+             4: {"results": [], "total_count": 5}}
+    fetcher._fetch_page = lambda period, offset, limit: pages[offset]
+    with pytest.raises(RuntimeError, match="returned 4 items but the server reported total_count=5"):
+        fetcher._fetch_all(PERIOD)
@@ -0,0 +1,36 @@
+from common.catalogue_snapshot import CatalogueSnapshot, snapshot_bytes, write_snapshot
+
+BRANDS = [
+    {"id": 1, "parent_id": None, "name": "Owner", "industry": 7, "tags": ["dairy"]},
+    {"id": 2, "parent_id": 1, "name": "Brand"},
+    {"id": 3, "parent_id": 2, "name": "Product", "encrypted_id": "abc", "industry": None},
+]
+
+
+def test_round_trip_keeps_fields_outside_the_schema(tmp_path):
+    path = write_snapshot(BRANDS, str(tmp_path / "brands.arrow"))
+    snapshot = CatalogueSnapshot.open(path)
+
+    # schema columns come back on every record (None where a record lacked them), other fields as given
+    assert snapshot.to_records() == [
+        {"id": 1, "parent_id": None, "name": "Owner", "encrypted_id": None, "industry": 7, "tags": ["dairy"]},
+        {"id": 2, "parent_id": 1, "name": "Brand", "encrypted_id": None},
+        {"id": 3, "parent_id": 2, "name": "Product", "encrypted_id": "abc", "industry": None},
+    ]
+    assert snapshot.get(1)["tags"] == ["dairy"]
+    assert CatalogueSnapshot.from_bytes(snapshot_bytes(snapshot)).to_records() == snapshot.to_records()
+
+
+def test_iteration_is_lazy_and_repeatable():
+    snapshot = CatalogueSnapshot.from_records(BRANDS)
+    records = iter(snapshot)
+    assert next(records)["name"] == "Owner"
+    assert [r["id"] for r in snapshot] == [1, 2, 3]
+    assert [r["id"] for r in snapshot] == [1, 2, 3]
+
+
+def test_lookups_by_id():
+    snapshot = CatalogueSnapshot.from_records(BRANDS)
+    assert list(snapshot.names_of([3, 99, 1])) == ["Product", None, "Owner"]
+    assert list(snapshot.parent_ids_of([2, 1])) == [1, None]
+    assert snapshot.get(99) is None
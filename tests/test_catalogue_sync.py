@@ -0,0 +1,108 @@
+import pytest
+
+from benchmarks.fake_adreal import FakeAdRealConfig, FakeAdRealServer
+from common.adreal_session import AdRealSession
+from common.catalogue_sync import CatalogueSync, catalogue_sync_from_env, diff_catalogues
+from common.reference_cache import LocalDirectoryBackend
+from common.websites_fetcher import PublisherFetcher
+
+AUGUST = "month_20250801"
+SEPTEMBER = "month_20250901"
+
+
+def catalogue(n, renamed=None):
+    return [{"id": i, "parent_id": None, "name": renamed if i == 500 and renamed else f"Brand {i}"}
+            for i in range(n)]
+
+
+class Endpoint:
+    """fetch_page / fetch_all over a list of records, counting what was downloaded."""
+
+    def __init__(self, records):
+        self.records = records
+        self.pages = []
+        self.first_pages = []
+
+    def fetch_page(self, offset, limit):
+        self.pages.append(offset)
+        return {"total_count": len(self.records), "results": self.records[offset:offset + limit]}
+
+    def fetch_all(self, first_page=None):
+        self.first_pages.append(first_page)
+        return list(self.records)
+
+    def sync(self, sync, period):
+        return sync.sync("ro", "brands", period, self.fetch_page, self.fetch_all)
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return LocalDirectoryBackend(str(tmp_path))
+
+
+def test_every_period_is_downloaded_by_default(backend):
+    sync = CatalogueSync(backend)
+    Endpoint(catalogue(1000)).sync(sync, AUGUST)
+
+    september = Endpoint(catalogue(1000, renamed="Renamed"))
+    assert september.sync(sync, SEPTEMBER)[500]["name"] == "Renamed"
+    assert september.pages == [] and september.first_pages == [None]
+    assert sync.changelog("ro", "brands", SEPTEMBER)["renamed"] == [
+        {"id": 500, "old": "Brand 500", "new": "Renamed", "owner": False}]
+    assert sync.get("ro", "brands", SEPTEMBER)["version"] == 2
+
+
+def test_carry_over_reuses_an_unchanged_catalogue(backend):
+    sync = CatalogueSync(backend, carry_over=True)
+    Endpoint(catalogue(1000)).sync(sync, AUGUST)
+
+    september = Endpoint(catalogue(1000))
+    assert september.sync(sync, SEPTEMBER) == catalogue(1000)
+    assert september.first_pages == []
+    assert sync.get("ro", "brands", SEPTEMBER)["source"] == "probed"
+
+
+def test_carry_over_misses_changes_between_probes(backend):
+    # the documented trade-off of carry-over: record 500 is not on a probe page
+    sync = CatalogueSync(backend, probes=2, carry_over=True)
+    Endpoint(catalogue(1000)).sync(sync, AUGUST)
+    assert Endpoint(catalogue(1000, renamed="Renamed")).sync(sync, SEPTEMBER)[500]["name"] == "Brand 500"
+
+
+def test_changed_count_downloads_with_the_probed_first_page(backend):
+    sync = CatalogueSync(backend, carry_over=True)
+    Endpoint(catalogue(1000)).sync(sync, AUGUST)
+
+    september = Endpoint(catalogue(1001))
+    assert len(september.sync(sync, SEPTEMBER)) == 1001
+    assert september.pages == [0]
+    assert september.first_pages[0]["results"] == catalogue(100)
+    assert len(sync.changelog("ro", "brands", SEPTEMBER)["added"]) == 1
+
+
+def test_carry_over_is_opt_in_from_env(monkeypatch, tmp_path):
+    monkeypatch.delenv("ADREAL_CATALOGUE_BUCKET", raising=False)
+    monkeypatch.setenv("ADREAL_CATALOGUE_DIR", str(tmp_path))
+    assert catalogue_sync_from_env().carry_over is False
+    monkeypatch.setenv("ADREAL_CATALOGUE_CARRY_OVER", "1")
+    assert catalogue_sync_from_env().carry_over is True
+
+
+def test_diff_catalogues_reports_reparented_and_changed():
+    old = [{"id": 1, "parent_id": None, "name": "A"}, {"id": 2, "parent_id": 1, "name": "B", "x": 1}]
+    new = [{"id": 1, "parent_id": None, "name": "A"}, {"id": 2, "parent_id": None, "name": "B", "x": 2}]
+    changes = diff_catalogues(old, new)
+    assert changes["reparented"] == [{"id": 2, "name": "B", "old": 1, "new": None}]
+    assert changes["changed"] == [{"id": 2, "fields": ["x"]}]
+
+
+def test_fetcher_does_not_download_the_probed_page_again():
+    with FakeAdRealServer(FakeAdRealConfig(publishers=500, max_page_size=300)) as server:
+        fetcher = PublisherFetcher("user", "password", limit=1000,
+                                   session=AdRealSession("user", "password", base_url=server.base_url))
+        probe = fetcher._fetch_page(AUGUST, 0, 100)
+        requests_before = server.counters["publishers"]
+
+        assert fetcher._fetch_all(AUGUST, first_page=probe) == server.catalogue.publishers
+        # offset 100 (300 items, the server's cap) and offset 400 (the last 101)
+        assert server.counters["publishers"] - requests_before == 2
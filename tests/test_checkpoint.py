@@ -0,0 +1,110 @@
+import sys
+import time
+
+import pandas as pd
+import pytest
+
+from common import batch_runner, manual_push_to_bq
+from common.adreal_session import AdRealSession
+from common.checkpoint import RunCheckpoint, shard_key
+from common.fetch_adreal import AdRealFetcher
+from common.reference_cache import LocalDirectoryBackend
+
+PERIOD = "month_20250801"
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    return RunCheckpoint(LocalDirectoryBackend(str(tmp_path)), PERIOD)
+
+
+def test_json_stage_round_trip_and_ttl(checkpoint, monkeypatch):
+    checkpoint.put_json("stats/shard-1", [{"segment": {"brand": 1}}])
+    assert checkpoint.get_json("stats/shard-1") == [{"segment": {"brand": 1}}]
+
+    later = time.time() + checkpoint.ttl_seconds + 1
+    monkeypatch.setattr("common.checkpoint.time.time", lambda: later)
+    assert checkpoint.get_json("stats/shard-1") is None
+
+
+def test_save_frames_and_load_frames_round_trip(checkpoint):
+    frames = [pd.DataFrame({"Brand": ["A", "B"], "AdContacts": [1, 2]}),
+              pd.DataFrame({"Brand": ["C"], "AdContacts": [3]})]
+    passed = list(checkpoint.save_frames("frame", iter(frames)))
+
+    assert [len(df) for df in passed] == [2, 1]
+    assert checkpoint.done("frame")["rows"] == 3
+    loaded = checkpoint.load_frames("frame")
+    assert len(loaded) == 2
+    for saved, original in zip(loaded, frames):
+        pd.testing.assert_frame_equal(saved, original)
+
+
+def test_unfinished_frame_stage_is_not_resumed(checkpoint):
+    frames = checkpoint.save_frames("frame", iter([pd.DataFrame({"a": [1]}), pd.DataFrame({"a": [2]})]))
+    next(frames)
+    assert checkpoint.load_frames("frame") is None
+
+
+def test_client_checkpoints_are_separate(checkpoint):
+    checkpoint.client("Mega").mark_done("load", message="ok")
+    assert checkpoint.client("Mega").done("load")["message"] == "ok"
+    assert checkpoint.client("Muller").done("load") is None
+
+
+def test_shard_key_is_stable():
+    shard = {"brand_ids": ["1", "2"], "industries": None, "period_range": "20250801,20250831,month"}
+    reordered = {"period_range": "20250801,20250831,month", "industries": None, "brand_ids": ["1", "2"]}
+    assert shard_key(shard) == shard_key(reordered)
+    # the same name in every process (checkpoints outlive the run that wrote them)
+    assert shard_key(shard) == "stats/shard-948722418cf9443b"
+    assert shard_key(shard) != shard_key(dict(shard, brand_ids=["1", "3"]))
+
+
+def test_sharded_fetch_resumes_saved_shards(checkpoint):
+    fetcher = AdRealFetcher("user", "password", session=AdRealSession("user", "password"))
+    fetched = []
+
+    def fetch_data(brand_ids, industries=None, **kwargs):
+        fetched.append(list(brand_ids))
+        return [{"segment": {"brand": int(b)}, "stats": []} for b in brand_ids]
+
+    fetcher.fetch_data = fetch_data
+    first = fetcher.fetch_data_sharded(["1", "2", "3"], shard_size=2, checkpoint=checkpoint)
+    assert fetched == [["1", "2"], ["3"]]
+
+    fetcher.fetch_data = lambda *args, **kwargs: pytest.fail("a saved shard was fetched again")
+    assert fetcher.fetch_data_sharded(["1", "2", "3"], shard_size=2, checkpoint=checkpoint) == first
+
+
+# ---------------- LOAD MARKERS ----------------
+def test_push_batch_results_skips_clients_already_loaded(checkpoint):
+    client_checkpoint = checkpoint.client("Mega")
+    client_checkpoint.mark_done("load", message="Loaded 3 rows")
+    results = {"Mega": {"table_id": "project.Mega.DataImport", "df": None, "error": None,
+                        "checkpoint": client_checkpoint}}
+
+    messages = batch_runner.push_batch_results(results, bq_client=object())
+    assert messages == {"Mega": "Already loaded: Loaded 3 rows"}
+
+
+def run_manual_push(monkeypatch, checkpoint, pushed):
+    monkeypatch.setattr(sys, "argv", ["manual_push_to_bq", "2025", "8", "--client", "Mega"])
+    monkeypatch.setattr(manual_push_to_bq, "get_client", lambda name: {"name": name, "table_id": "p.Mega.DataImport"})
+    monkeypatch.setattr(manual_push_to_bq, "access_secret", lambda name: "secret")
+    monkeypatch.setattr(manual_push_to_bq, "checkpoint_from_env", lambda period: checkpoint)
+    monkeypatch.setattr(manual_push_to_bq, "fetch_adreal_manual",
+                        lambda *args, **kwargs: pd.DataFrame({"Date": ["2025-08-01"], "AdContacts": [1]}))
+    monkeypatch.setattr(manual_push_to_bq, "push_to_bigquery",
+                        lambda df, table_id: pushed.append(table_id) or "Loaded 1 rows")
+    manual_push_to_bq.main()
+
+
+def test_manual_push_marks_the_load_done_and_skips_it_on_rerun(monkeypatch, checkpoint):
+    pushed = []
+    run_manual_push(monkeypatch, checkpoint, pushed)
+    assert pushed == ["p.Mega.DataImport"]
+    assert checkpoint.client("Mega").done("load")["message"] == "Loaded 1 rows"
+
+    run_manual_push(monkeypatch, checkpoint, pushed)
+    assert pushed == ["p.Mega.DataImport"]
@@ -0,0 +1,86 @@
+from common.dedupe import StatsDeduplicator
+
+
+def entry(brand, website, *periods, **segment):
+    return {
+        "segment": dict(segment, brand=brand, website=website),
+        "stats": [{"period": period, "values": {"ad_cont": 1}} for period in periods],
+    }
+
+
+def test_repeated_stats_are_dropped_across_batches():
+    deduplicator = StatsDeduplicator()
+    first = deduplicator.filter_entries([entry(1, 100, "month_20250901"), entry(1, 101, "month_20250901")])
+    second = deduplicator.filter_entries([entry(1, 100, "month_20250901"), entry(2, 100, "month_20250901")])
+
+    assert [e["segment"]["brand"] for e in first] == [1, 1]
+    assert [e["segment"]["brand"] for e in second] == [2]
+    assert deduplicator.kept == 3
+    assert deduplicator.dropped_total == 1
+
+
+def test_only_the_repeated_stats_of_an_entry_are_dropped():
+    deduplicator = StatsDeduplicator()
+    deduplicator.filter_entries([entry(1, 100, "month_20250801")])
+    kept = deduplicator.filter_entries([entry(1, 100, "month_20250801", "month_20250901")])
+
+    assert [stat["period"] for stat in kept[0]["stats"]] == ["month_20250901"]
+
+
+def test_platforms_are_not_collapsed():
+    deduplicator = StatsDeduplicator()
+    kept = deduplicator.filter_entries([
+        entry(1, 100, "month_20250901", platform="pc"),
+        entry(1, 100, "month_20250901", platform="mobile"),
+    ])
+    assert len(kept) == 2
+
+
+def test_unhashable_products_are_keyed():
+    deduplicator = StatsDeduplicator()
+    kept = deduplicator.filter_entries([
+        entry(1, 100, "month_20250901", product={"label": "A"}),
+        entry(1, 100, "month_20250901", product={"label": "A"}),
+        entry(1, 100, "month_20250901", product={"label": "B"}),
+    ])
+    assert [e["segment"]["product"]["label"] for e in kept] == ["A", "B"]
+
+
+def test_every_segment_field_is_part_of_the_key():
+    deduplicator = StatsDeduplicator()
+    kept = deduplicator.filter_entries([
+        entry(1, 100, "month_20250901", device="desktop", publisher=7),
+        entry(1, 100, "month_20250901", device="mobile", publisher=7),
+        entry(1, 100, "month_20250901", device="mobile", publisher=8),
+        entry(1, 100, "month_20250901", publisher=8, device="mobile"),
+    ])
+    assert [(e["segment"]["device"], e["segment"]["publisher"]) for e in kept] == [
+        ("desktop", 7), ("mobile", 7), ("mobile", 8)]
+    assert deduplicator.dropped_total == 1
+
+
+def test_fields_restrict_the_key():
+    deduplicator = StatsDeduplicator(fields=("brand", "website"))
+    kept = deduplicator.filter_entries([
+        entry(1, 100, "month_20250901", device="desktop"),
+        entry(1, 100, "month_20250901", device="mobile"),
+    ])
+    assert len(kept) == 1
+
+
+class SameHash(int):
+    """An id whose hash collides with every other one."""
+
+    def __hash__(self):
+        return 0
+
+
+def test_keys_with_colliding_hashes_are_kept_apart():
+    deduplicator = StatsDeduplicator()
+    kept = deduplicator.filter_entries([
+        entry(SameHash(1), 100, "month_20250901"),
+        entry(SameHash(2), 100, "month_20250901"),
+        entry(SameHash(1), 100, "month_20250901"),
+    ])
+    assert [e["segment"]["brand"] for e in kept] == [1, 2]
+    assert deduplicator.dropped_total == 1
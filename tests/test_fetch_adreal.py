@@ -0,0 +1,28 @@
+import pytest
+
+from common.adreal_session import AdRealSession
+from common.fetch_adreal import AdRealFetcher
+
+
+def fetcher_with_pages(pages):
+    """An AdRealFetcher whose /stats/ offset pages come from `pages` ({offset: (results, total_count)})."""
+    fetcher = AdRealFetcher("user", "password", session=AdRealSession("user", "password"))
+    fetcher._fetch_stats_page = lambda params, offset: pages[offset]
+    return fetcher
+
+
+def test_iter_stats_pages_follows_offsets():
+    fetcher = fetcher_with_pages({0: ([1, 2], 5), 2: ([3, 4], 5), 4: ([5], 5)})
+    assert list(fetcher.iter_stats_pages({"limit": 2})) == [1, 2, 3, 4, 5]
+
+
+def test_iter_stats_pages_uses_the_server_page_size():
+    # the server caps pages at 2 items although 10 were asked for
+    fetcher = fetcher_with_pages({0: ([1, 2], 5), 2: ([3, 4], 5), 4: ([5], 5)})
+    assert list(fetcher.iter_stats_pages({"limit": 10})) == [1, 2, 3, 4, 5]
+
+
+def test_iter_stats_pages_raises_on_total_count_mismatch():
+    fetcher = fetcher_with_pages({0: ([1, 2], 5), 2: ([3, 4], 5), 4: ([], 5)})
+    with pytest.raises(RuntimeError, match="returned 4 items but the server reported total_count=5"):
+        list(fetcher.iter_stats_pages({"limit": 2}))
@@ -0,0 +1,117 @@
+import random
+from concurrent.futures import Future
+
+import pandas as pd
+import pytest
+
+from common.catalogue_snapshot import CatalogueSnapshot
+from common.gather_all import merge_data, merge_frame, prefetch_stream, run_legs, timed_stream
+
+
+def test_prefetch_stream_reads_ahead_at_most_max_buffered():
+    consumed = []
+
+    def stream():
+        for i in range(10):
+            consumed.append(i)
+            yield i
+
+    pending = {"brands": Future()}
+    items = prefetch_stream(stream(), pending, max_buffered=3)
+    assert consumed == [0, 1, 2]
+    assert list(items) == list(range(10))
+
+
+def test_prefetch_stream_stops_once_the_downloads_are_done():
+    done = Future()
+    done.set_result([])
+    items = prefetch_stream(iter(range(5)), {"brands": done})
+    assert list(items) == list(range(5))
+
+
+def test_timed_stream_reports_once_exhausted(capsys):
+    items = timed_stream(iter(range(3)), "stats")
+    assert list(items) == [0, 1, 2]
+    assert "stats stream: 3 items in" in capsys.readouterr().out
+
+
+def test_run_legs_labels_foreground_legs_as_prefetch(capsys):
+    results = run_legs({"brands": lambda: [1]}, foreground={"stats": lambda futures: "stream"})
+    assert results == {"brands": [1], "stats": "stream"}
+    assert "stats (prefetch)" in capsys.readouterr().out
+
+
+# ---------------- MERGE ----------------
+BRANDS = [
+    {"id": 1, "parent_id": None, "name": "Owner"},
+    {"id": 2, "parent_id": 1, "name": "Brand"},
+    {"id": 3, "parent_id": 2, "name": "Product"},
+    {"id": 4, "parent_id": None, "name": "Other"},
+    {"id": 5, "parent_id": 4, "name": "Other brand"},
+]
+PUBLISHERS = [{"id": 100, "name": "facebook.com"}, {"id": 101, "name": "ziare.ro"}, {"id": 102}]
+
+
+def as_rows(df):
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def random_entries(rnd, brands):
+    ids = [brand["id"] for brand in brands] + [0, 99, None, "7", {"label": "Label"}]
+    entries = []
+    for _ in range(rnd.randint(0, 30)):
+        segment = {
+            "brand": rnd.choice(ids[:-1]),
+            "product": rnd.choice(ids),
+            "website": rnd.choice([100, 101, 102, 105, None, "x"]),
+            "content_type": rnd.choice([None, "None", "", "Display"]),
+            "brand_owner": rnd.choice([None] + ids[:3]),
+        }
+        if rnd.random() < 0.3:
+            segment["platform"] = rnd.choice(["pc", None])
+        stats = []
+        for _ in range(rnd.randint(0, 3)):
+            stat = {"period": rnd.choice(["month_20250901", None])}
+            metrics = rnd.sample(["ad_cont", "ru", "reach"], rnd.randint(0, 3))
+            stat["values"] = {metric: rnd.randint(0, 9) for metric in metrics}
+            if rnd.random() < 0.5:
+                stat["uncertainty"] = {metric: rnd.random() for metric in rnd.sample(["ru", "reach"], 1)}
+            stats.append(stat)
+        entries.append({"segment": segment, "stats": stats})
+    return entries
+
+
+@pytest.mark.parametrize("owner_resolution", ["parent", "root", "normalize"])
+@pytest.mark.parametrize("product_fallback", ["id", "null"])
+def test_merge_frame_matches_row_merge(owner_resolution, product_fallback):
+    rnd = random.Random(f"{owner_resolution}-{product_fallback}")
+    for _ in range(25):
+        entries = random_entries(rnd, BRANDS)
+        expected = pd.DataFrame(merge_data(entries, BRANDS, PUBLISHERS, owner_resolution, product_fallback))
+        merged = merge_frame(entries, BRANDS, PUBLISHERS, owner_resolution, product_fallback)
+        assert list(merged.columns) == list(expected.columns)
+        assert as_rows(merged) == as_rows(expected)
+
+
+def test_merge_frame_with_catalogue_snapshots():
+    # a snapshot stores a missing name as null, so every publisher here has one
+    publishers = PUBLISHERS[:2]
+    entries = random_entries(random.Random(7), BRANDS)
+    expected = merge_frame(entries, BRANDS, publishers)
+    merged = merge_frame(entries, CatalogueSnapshot.from_records(BRANDS), CatalogueSnapshot.from_records(publishers))
+    assert as_rows(merged) == as_rows(expected)
+
+
+def test_merge_frame_resolves_names():
+    entries = [{
+        "segment": {"brand": 2, "product": 3, "website": 100, "content_type": None},
+        "stats": [{"period": "month_20250901", "values": {"ad_cont": 5}}],
+    }]
+    row = as_rows(merge_frame(entries, BRANDS, PUBLISHERS))[0]
+    assert row["brand_owner_name"] == "Owner"
+    assert row["brand_name"] == "Brand"
+    assert row["product"] == "Product"
+    assert row["website_name"] == "facebook.com"
+    assert row["content_type"] == "Social"
+    assert row["ad_cont"] == 5
+
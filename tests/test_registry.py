@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from common.registry import get_client, load_registry, normalize_client
+
+DEFAULTS = {
+    "project_id": "project",
+    "owner_resolution": "parent",
+    "product_fallback": "id",
+    "enabled": True,
+}
+
+
+def client(**overrides):
+    return dict({"name": "Mega", "table_id": "Mega.DataImport", "parent_brand_ids": [1]}, **overrides)
+
+
+def write_registry(tmp_path, clients):
+    path = tmp_path / "clients.json"
+    path.write_text(json.dumps({"defaults": DEFAULTS, "clients": clients}))
+    return str(path)
+
+
+def test_normalize_client_applies_defaults_and_qualifies_the_table():
+    merged = normalize_client(client(parent_brand_ids={"Braun": [1, 2], "Oral-B": [3]}, industries="12, 13"),
+                              DEFAULTS)
+    assert merged["table_id"] == "project.Mega.DataImport"
+    assert merged["parent_brand_ids"] == ["1", "2", "3"]
+    assert merged["industries"] == "12,13"
+    assert merged["excluded_brands"] == []
+    assert merged["owner_resolution"] == "parent"
+
+
+@pytest.mark.parametrize("overrides, message", [
+    ({"name": ""}, "without a name"),
+    ({"table_id": None}, "has no table_id"),
+    ({"owner_resolution": "grandparent"}, "owner_resolution must be one of"),
+    ({"product_fallback": "name"}, "product_fallback must be one of"),
+    ({"content_type_rules": {"Social": []}}, "content_type_rules must map"),
+    ({"shard_size": 0}, "shard_size must be a positive integer"),
+    ({"shard_workers": "4"}, "shard_workers must be a positive integer"),
+    ({"parent_brand_ids": [], "industries": None}, "needs parent_brand_ids or industries"),
+])
+def test_normalize_client_rejects_invalid_entries(overrides, message):
+    with pytest.raises(ValueError, match=message):
+        normalize_client(client(**overrides), DEFAULTS)
+
+
+def test_load_registry_skips_disabled_clients(tmp_path):
+    path = write_registry(tmp_path, [client(), client(name="Muller", enabled=False)])
+    assert [c["name"] for c in load_registry(path)] == ["Mega"]
+    assert [c["name"] for c in load_registry(path, include_disabled=True)] == ["Mega", "Muller"]
+    assert get_client("Muller", path)["enabled"] is False
+    with pytest.raises(KeyError):
+        get_client("Unknown", path)
+
+
+def test_load_registry_rejects_duplicate_names(tmp_path):
+    path = write_registry(tmp_path, [client(), client()])
+    with pytest.raises(ValueError, match="Duplicate client names"):
+        load_registry(path)
+
+
+def test_repository_registry_is_valid():
+    assert load_registry(include_disabled=True)
+
+
+def test_registry_import_does_not_load_pandas():
+    code = "import sys, common.registry; print('pandas' in sys.modules)"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=root).stdout
+    assert out.strip() == "False"
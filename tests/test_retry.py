@@ -0,0 +1,133 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+import requests
+
+from common.retry import HostLimiter, RetryPolicy, send_with_retry
+
+
+class Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def close(self):
+        pass
+
+
+def policy(**kwargs):
+    retry = RetryPolicy(**kwargs)
+    retry.waits = []
+    retry.sleep = retry.waits.append
+    return retry
+
+
+def sender(*outcomes):
+    """send() returning (or raising) the outcomes in turn, recording each call."""
+    calls = []
+
+    def send(method, url, **kwargs):
+        outcome = outcomes[len(calls)]
+        calls.append(method)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return send, calls
+
+
+# ---------------- BACKOFF ----------------
+def test_retry_after_in_seconds():
+    assert RetryPolicy().delay(1, Response(429, {"Retry-After": "7"})) == 7
+
+
+def test_retry_after_as_http_date():
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    delay = RetryPolicy().delay(1, Response(503, {"Retry-After": format_datetime(when, usegmt=True)}))
+    assert 28 <= delay <= 30
+
+
+def test_retry_after_is_capped_at_backoff_max():
+    assert RetryPolicy(backoff_max=60).delay(1, Response(429, {"Retry-After": "600"})) == 60
+
+
+def test_backoff_is_capped_at_backoff_max():
+    retry = RetryPolicy(backoff_base=1, backoff_max=5)
+    assert all(0 <= retry.delay(attempt) <= 5 for attempt in range(1, 20) for _ in range(20))
+    assert all(retry.delay(1) <= 1 for _ in range(20))
+
+
+# ---------------- SEND ----------------
+def test_get_is_retried_until_it_succeeds():
+    retry = policy(backoff_base=0.5)
+    send, calls = sender(Response(503), Response(503, {"Retry-After": "2"}), Response(200))
+    assert send_with_retry(send, "GET", "http://adreal/ro/stats/", retry).status_code == 200
+    assert len(calls) == 3
+    assert retry.waits[1] == 2
+
+
+def test_last_response_is_returned_after_max_attempts():
+    retry = policy(max_attempts=3)
+    send, calls = sender(*[Response(502)] * 3)
+    assert send_with_retry(send, "GET", "http://adreal/ro/stats/", retry).status_code == 502
+    assert len(calls) == 3
+
+
+def test_post_is_not_retried_on_a_transient_status():
+    send, calls = sender(Response(503), Response(200))
+    assert send_with_retry(send, "POST", "http://adreal/login/", policy()).status_code == 503
+    assert calls == ["POST"]
+
+
+def test_post_is_not_retried_on_a_connection_error():
+    send, calls = sender(requests.exceptions.ConnectionError("reset"), Response(200))
+    with pytest.raises(requests.exceptions.ConnectionError):
+        send_with_retry(send, "POST", "http://adreal/login/", policy())
+    assert calls == ["POST"]
+
+
+def test_connection_errors_are_retried_then_raised():
+    retry = policy(max_attempts=2)
+    send, calls = sender(requests.exceptions.ConnectionError("reset"), requests.exceptions.Timeout("slow"))
+    with pytest.raises(requests.exceptions.Timeout):
+        send_with_retry(send, "GET", "http://adreal/ro/brands/", retry)
+    assert len(calls) == 2
+
+
+def test_first_retry_is_quiet(capsys):
+    send, _ = sender(Response(503), Response(200))
+    send_with_retry(send, "GET", "http://adreal/ro/stats/", policy())
+    assert capsys.readouterr().out == ""
+
+    send, _ = sender(Response(503), Response(503), Response(200))
+    send_with_retry(send, "GET", "http://adreal/ro/stats/", policy())
+    assert capsys.readouterr().out.count("retry 2/4") == 1
+
+
+# ---------------- CONCURRENCY ----------------
+def test_host_limiter_bounds_requests_per_host():
+    limiter = HostLimiter(max_per_host=2)
+    in_flight = {"a": 0, "b": 0}
+    peak = {"a": 0, "b": 0}
+    lock = threading.Lock()
+
+    def send(method, url, **kwargs):
+        host = url.split("/")[2]
+        with lock:
+            in_flight[host] += 1
+            peak[host] = max(peak[host], in_flight[host])
+        time.sleep(0.01)
+        with lock:
+            in_flight[host] -= 1
+        return Response(200)
+
+    threads = [threading.Thread(target=send_with_retry, args=(send, "GET", f"http://{host}/x", RetryPolicy(), limiter))
+               for host in "ab" * 8]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak == {"a": 2, "b": 2}
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from common.stats_stream import iter_stats_results
+
+BODY = json.dumps({
+    "total_count": 3,
+    "next": None,
+    "results": [
+        {"segment": {"brand": 12345, "website": 678, "product": None},
+         "stats": [{"period": "month_20250801", "values": {"ru": 0.0015, "ad_cont": 98304, "reach": 1e-05},
+                    "uncertainty": {"ru": -2.5e+30}}]},
+        {"segment": {"brand": 1, "content_type": "Social"},
+         "stats": [{"period": "month_20250801", "values": {"ru": 10, "ad_cont": 0, "reach": 0.9172},
+                    "uncertainty": {}}]},
+        {"segment": {"brand": "Zürich Ärzte €", "platform": "pc"}, "stats": [], "valid": True},
+    ],
+    "page_types": ["search", "social"],
+}, indent=1).encode("utf-8")
+
+
+def parse(chunks):
+    meta = {}
+    items = list(iter_stats_results(chunks, meta))
+    return items, meta
+
+
+def test_matches_json_loads_split_at_every_offset():
+    expected = json.loads(BODY)
+    expected_meta = {key: value for key, value in expected.items() if key != "results"}
+    for offset in range(len(BODY) + 1):
+        items, meta = parse([BODY[:offset], BODY[offset:]])
+        assert items == expected["results"], f"split at byte {offset}"
+        assert meta == expected_meta, f"split at byte {offset}"
+
+
+def test_matches_json_loads_one_byte_at_a_time():
+    items, meta = parse(BODY[i:i + 1] for i in range(len(BODY)))
+    assert items == json.loads(BODY)["results"]
+    assert meta["page_types"] == ["search", "social"]
+
+
+@pytest.mark.parametrize("number", ["0.0015", "1e-05", "-12.5E+3", "1234567"])
+def test_number_split_anywhere_is_parsed_whole(number):
+    body = ('{"total_count": ' + number + ', "results": [' + number + ']}').encode()
+    for offset in range(len(body) + 1):
+        items, meta = parse([body[:offset], body[offset:]])
+        assert items == [json.loads(number)]
+        assert meta["total_count"] == json.loads(number)
+
+
+def test_unterminated_results_raise():
+    with pytest.raises(ValueError):
+        parse([b'{"results": [1, 2'])